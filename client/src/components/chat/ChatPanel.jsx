@@ -50,6 +50,7 @@ export function ChatPanel({ documentId, onCitationClick, className }) {
         content: data.answer,
         citations: data.sources?.map((source, idx) => ({
           page: source.page,
+          endPage: source.end_page,
           text: `Source ${idx + 1}`,
         })) || [],
       };
@@ -66,6 +66,7 @@ export function LawChatPanel({ lawSlug, lawTitle, onCitationClick, className })
         citations:
           data.sources?.map((source, idx) => ({
             page: source.page,
+            endPage: source.end_page,
             text: `Source ${idx + 1}`,
           })) || [],
       };
@@ -16,7 +16,7 @@ export function MessageBubble({ role, content, citations, onCitationClick, class
         </div>
         
         {citations && citations.length > 0 && (<div className="mt-2 flex flex-wrap gap-1.5 pt-2 border-t border-border/50">
-            {citations.map((citation, idx) => (<CitationTag key={idx} page={citation.page} onClick={() => onCitationClick?.(citation.page)}/>))}
+            {citations.map((citation, idx) => (<CitationTag key={idx} page={citation.page} endPage={citation.endPage} onClick={() => onCitationClick?.(citation.page)}/>))}
           </div>)}
       </div>
     </motion.div>);
@@ -35,6 +35,7 @@ export const SESSION_ENDPOINTS = {
 
 export const LAW_ENDPOINTS = {
     LIST: '/ai/laws/',
+    STATUS: '/ai/laws/status/',
     DETAIL: (slug) => `/ai/laws/${slug}/`,
     CHAT: (slug) => `/ai/laws/${slug}/chat/`,
     CLAUSES: (slug) => `/ai/laws/${slug}/clauses/`,
@@ -24,7 +24,8 @@ export default function EgyptianLaw() {
         // Fetch laws
         const lawsData = await lawService.list();
         const laws = Array.isArray(lawsData) ? lawsData : lawsData.results || lawsData;
-        setReadyLaws(laws.map(law => law.slug));
+        // The list includes laws that are still being seeded
+        setReadyLaws(laws.filter(law => law.status === "ready").map(law => law.slug));
 
         // Fetch subscription
         try {
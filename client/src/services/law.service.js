@@ -14,6 +14,14 @@ export const lawService = {
         return response.data;
     },
 
+    /**
+     * Seeding status and progress of every law
+     */
+    status: async () => {
+        const response = await axiosInstance.get(LAW_ENDPOINTS.STATUS);
+        return response.data;
+    },
+
     /**
      * Get a single law by slug
      */
@@ -2,6 +2,9 @@
 Custom permissions and decorators for plan limits
 """
 from functools import wraps
+from inspect import iscoroutinefunction
+
+from asgiref.sync import sync_to_async
 from rest_framework import status
 from rest_framework.response import Response
 from .models_billing import UsageTracking
@@ -62,60 +65,93 @@ def check_document_limit(view_func):
     return wrapper
 
 
+def _message_limit_response(request):
+    """
+    Enforce the daily message limit for the request's user.
+    Returns an error Response if the request must be rejected, otherwise
+    counts the message and returns None.
+    """
+    user = request.user
+
+    if not user.is_authenticated:
+        return Response(
+            {'error': 'Authentication required'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+
+    subscription = user.subscription
+    plan = subscription.plan
+
+    # Get today's usage
+    usage = UsageTracking.get_or_create_today(user)
+
+    # Check limit (None means unlimited)
+    if plan.max_messages_per_day is not None:
+        if usage.messages_count >= plan.max_messages_per_day:
+            return Response({
+                'error': 'Daily message limit reached',
+                'detail': f'Your {plan.display_name} plan allows {plan.max_messages_per_day} messages per day',
+                'current_count': usage.messages_count,
+                'limit': plan.max_messages_per_day,
+                'upgrade_required': True,
+                'resets_at': 'midnight UTC'
+            }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+
+    # Increment message count
+    usage.increment_messages()
+    return None
+
+
 def check_message_limit(view_func):
     """
     Decorator to check if user can send more messages today
     Based on their subscription plan
-    Works with both function-based and class-based views
+    Works with both function-based and class-based views, sync or async
     """
-    @wraps(view_func)
-    def wrapper(self_or_request, *args, **kwargs):
+    def get_request(self_or_request, args, kwargs):
         # Handle both class-based views (self, request) and function-based views (request)
         if hasattr(self_or_request, 'user'):
             # Function-based view: first arg is request
-            request = self_or_request
-        else:
-            # Class-based view: first arg is self, second is request
-            request = args[0] if args else kwargs.get('request')
+            return self_or_request
+        # Class-based view: first arg is self, second is request
+        return args[0] if args else kwargs.get('request')
 
-        user = request.user
+    def error_response(e):
+        return Response(
+            {'error': 'Failed to check message limit', 'detail': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
 
-        if not user.is_authenticated:
-            return Response(
-                {'error': 'Authentication required'},
-                status=status.HTTP_401_UNAUTHORIZED
-            )
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(self_or_request, *args, **kwargs):
+            request = get_request(self_or_request, args, kwargs)
+            try:
+                denied = await sync_to_async(_message_limit_response)(request)
+                if denied is not None:
+                    return denied
 
-        try:
-            subscription = user.subscription
-            plan = subscription.plan
+                # Continue with the view
+                return await view_func(self_or_request, *args, **kwargs)
 
-            # Get today's usage
-            usage = UsageTracking.get_or_create_today(user)
+            except Exception as e:
+                return error_response(e)
 
-            # Check limit (None means unlimited)
-            if plan.max_messages_per_day is not None:
-                if usage.messages_count >= plan.max_messages_per_day:
-                    return Response({
-                        'error': 'Daily message limit reached',
-                        'detail': f'Your {plan.display_name} plan allows {plan.max_messages_per_day} messages per day',
-                        'current_count': usage.messages_count,
-                        'limit': plan.max_messages_per_day,
-                        'upgrade_required': True,
-                        'resets_at': 'midnight UTC'
-                    }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        return async_wrapper
 
-            # Increment message count
-            usage.increment_messages()
+    @wraps(view_func)
+    def wrapper(self_or_request, *args, **kwargs):
+        request = get_request(self_or_request, args, kwargs)
+        try:
+            denied = _message_limit_response(request)
+            if denied is not None:
+                return denied
 
             # Continue with the view
             return view_func(self_or_request, *args, **kwargs)
 
         except Exception as e:
-            return Response(
-                {'error': 'Failed to check message limit', 'detail': str(e)},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+            return error_response(e)
 
     return wrapper
 
@@ -209,6 +245,32 @@ def has_egyptian_law_access(user, law_slug=None):
         return False, f'Failed to check law access: {str(e)}'
 
 
+def accessible_egyptian_law_slugs(user):
+    """
+    Helper function listing the Egyptian laws a user's plan gives access to
+    Premium: all laws, Standard: selected laws, Free: none
+    Returns (slugs, error_message)
+    """
+    from ai_api.models import EgyptianLaw
+
+    has_access, error_msg = has_egyptian_law_access(user)
+    if not has_access:
+        return [], error_msg
+
+    plan = user.subscription.plan
+    if plan.max_egyptian_laws is None:
+        return list(EgyptianLaw.objects.values_list('slug', flat=True)), None
+
+    from .models_billing import EgyptianLawSelection
+    slugs = list(
+        EgyptianLawSelection.objects.filter(subscription=user.subscription)
+        .values_list('law__slug', flat=True)
+    )
+    if not slugs:
+        return [], f'Select up to {plan.max_egyptian_laws} laws in your law selections to search them'
+    return slugs, None
+
+
 def increment_document_count(user):
     """
     Helper function to increment user's total document count
@@ -1,7 +1,8 @@
 from django.contrib import admin
 from .models import (
     Document, DocumentChunk, ChatSession, ChatMessage,
-    EgyptianLaw, EgyptianLawChunk, LawChatSession, LawChatMessage
+    EgyptianLaw, EgyptianLawChunk, LawArticle, LawChatSession, LawChatMessage,
+    AnalysisArtifact, LawAnswerCache
 )
 
 
@@ -56,6 +57,13 @@ class EgyptianLawChunkAdmin(admin.ModelAdmin):
     search_fields = ['content']
 
 
+@admin.register(LawArticle)
+class LawArticleAdmin(admin.ModelAdmin):
+    list_display = ['law', 'number', 'start_page', 'end_page']
+    list_filter = ['law']
+    search_fields = ['content']
+
+
 @admin.register(LawChatSession)
 class LawChatSessionAdmin(admin.ModelAdmin):
     list_display = ['title', 'user', 'law', 'created_at', 'updated_at']
@@ -72,3 +80,20 @@ class LawChatMessageAdmin(admin.ModelAdmin):
     def short_content(self, obj):
         return obj.content[:50] + "..." if len(obj.content) > 50 else obj.content
     short_content.short_description = 'Content'
+
+
+@admin.register(AnalysisArtifact)
+class AnalysisArtifactAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'document', 'law', 'prompt_version', 'model', 'created_at']
+    list_filter = ['kind', 'law', 'prompt_version', 'model']
+    search_fields = ['document__title', 'law__title_en']
+    readonly_fields = ['created_at']
+
+
+@admin.register(LawAnswerCache)
+class LawAnswerCacheAdmin(admin.ModelAdmin):
+    list_display = ['law', 'query', 'hit_count', 'created_at', 'last_used_at']
+    list_filter = ['law', 'model']
+    search_fields = ['query']
+    exclude = ['embedding']
+    readonly_fields = ['created_at', 'last_used_at']
@@ -0,0 +1,146 @@
+"""
+Stored summary and clause analyses for documents and Egyptian laws.
+
+An analysis depends only on the source content, the prompt and the model,
+so it is generated once and served from AnalysisArtifact on repeat calls.
+Artifacts are deleted when a document is reprocessed or a law is reseeded.
+"""
+from asgiref.sync import sync_to_async
+
+from .models import AnalysisArtifact
+from .langchain_config import (
+    CHAT_MODEL,
+    PROMPT_VERSIONS,
+    get_document_vector_store,
+    get_law_vector_store,
+    get_clause_detection_chain,
+    get_summary_chain,
+    get_arabic_summary_chain,
+    get_arabic_clauses_chain,
+)
+
+# Chain kind and query used for each (source type, analysis kind)
+DOCUMENT_ANALYSES = {
+    "summary": (
+        "summary",
+        get_summary_chain,
+        "Generate a comprehensive executive summary of this legal document.",
+    ),
+    "clauses": (
+        "clause_detection",
+        get_clause_detection_chain,
+        "Identify and analyze all key legal clauses in this document. "
+        "Include termination, confidentiality, liability, indemnity, "
+        "payment terms, jurisdiction, and any other important clauses.",
+    ),
+}
+
+LAW_ANALYSES = {
+    "summary": (
+        "arabic_summary",
+        get_arabic_summary_chain,
+        "Generate a comprehensive executive summary of this Egyptian law.",
+    ),
+    "clauses": (
+        "arabic_clauses",
+        get_arabic_clauses_chain,
+        "Identify and analyze all key legal provisions in this law. "
+        "Include articles related to rights, obligations, penalties, "
+        "procedures, and any other important provisions.",
+    ),
+}
+
+
+def _artifact_key(kind, chain_kind, **source):
+    """Lookup fields identifying a stored analysis."""
+    return {
+        **source,
+        "kind": kind,
+        "prompt_version": PROMPT_VERSIONS[chain_kind],
+        "model": CHAT_MODEL,
+    }
+
+
+async def _aget_or_generate(key, build_chain, refresh):
+    """Serve a stored artifact, or run the chain and store its output."""
+    if not refresh:
+        artifact = await AnalysisArtifact.objects.filter(**key).afirst()
+        if artifact is not None:
+            return artifact.content, True
+
+    # Vector store lookup is blocking; keep it off the event loop
+    chain, chain_input = await sync_to_async(
+        build_chain, thread_sensitive=False
+    )()
+    content = await chain.ainvoke(chain_input)
+
+    await AnalysisArtifact.objects.aupdate_or_create(
+        **key, defaults={"content": content}
+    )
+    return content, False
+
+
+async def aget_document_analysis(document, kind, refresh=False):
+    """
+    Get a document's summary or clause analysis.
+
+    Returns:
+        (content, cached) where cached is True if served from storage
+    """
+    chain_kind, get_chain, query = DOCUMENT_ANALYSES[kind]
+    key = _artifact_key(kind, chain_kind, document=document)
+
+    def build_chain():
+        return get_chain(get_document_vector_store(document.id)), query
+
+    return await _aget_or_generate(key, build_chain, refresh)
+
+
+async def aget_law_analysis(law, kind, refresh=False):
+    """
+    Get an Egyptian law's summary or clause analysis.
+
+    Returns:
+        (content, cached) where cached is True if served from storage
+    """
+    chain_kind, get_chain, query = LAW_ANALYSES[kind]
+    key = _artifact_key(kind, chain_kind, law=law)
+
+    def build_chain():
+        # Arabic chains take the law title alongside the query
+        chain = get_chain(get_law_vector_store(law.slug))
+        return chain, {"input": query, "title": law.title_ar}
+
+    return await _aget_or_generate(key, build_chain, refresh)
+
+
+def generate_law_analysis(law, kind, force=False):
+    """
+    Generate and store a law analysis synchronously (used at seed time).
+
+    Returns:
+        (content, created) where created is False if an artifact already existed
+    """
+    chain_kind, get_chain, query = LAW_ANALYSES[kind]
+    key = _artifact_key(kind, chain_kind, law=law)
+
+    if not force:
+        artifact = AnalysisArtifact.objects.filter(**key).first()
+        if artifact is not None:
+            return artifact.content, False
+
+    chain = get_chain(get_law_vector_store(law.slug))
+    content = chain.invoke({"input": query, "title": law.title_ar})
+
+    AnalysisArtifact.objects.update_or_create(**key, defaults={"content": content})
+    return content, True
+
+
+def invalidate_document_analyses(document):
+    """Delete stored analyses for a document (call when it is reprocessed)."""
+    AnalysisArtifact.objects.filter(document=document).delete()
+
+
+def invalidate_law_analyses(law):
+    """Delete stored analyses for a law (call when it is reseeded)."""
+    AnalysisArtifact.objects.filter(law=law).delete()
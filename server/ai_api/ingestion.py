@@ -0,0 +1,227 @@
+"""
+Embedding ingestion pipeline for document and law chunks.
+
+The pipeline is a chain of generators: PDF pages are loaded one at a
+time, sanitized and split, and the chunks are grouped into token-budgeted
+batches that a bounded pool of threads embeds (backing off when the API
+rate limits us) and writes with one bulk insert per batch. Only the
+batches in flight are held in memory, whatever the document size.
+Used by PDF processing and law seeding.
+"""
+import logging
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+
+import openai
+import pymupdf
+import tiktoken
+from django.conf import settings
+from langchain_core.documents import Document
+from pypdf import PdfReader
+
+from .langchain_config import (
+    EMBEDDING_MODEL,
+    EMBEDDING_BATCH_TOKENS,
+    EMBEDDING_BATCH_MAX_CHUNKS,
+    EMBEDDING_CONCURRENCY,
+    EMBEDDING_MAX_RETRIES,
+)
+
+logger = logging.getLogger(__name__)
+
+# Errors worth retrying: rate limits and transient API/network failures
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """Tokenizer of the embedding model, or None if it cannot be loaded."""
+    try:
+        return tiktoken.encoding_for_model(EMBEDDING_MODEL)
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Token count of a chunk (estimated from length if tiktoken is unavailable)."""
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 2 + 1  # Arabic runs close to 2 characters per token
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def iter_pdf_pages(path, engine="pymupdf"):
+    """
+    Yield one LangChain Document per PDF page, loading pages lazily.
+
+    Args:
+        path: PDF file path
+        engine: "pymupdf" (falls back to pypdf if the file cannot be
+            opened) or "pypdf"
+
+    Yields:
+        Documents with "source", "page" (0-indexed) and "total_pages" metadata
+    """
+    if engine == "pymupdf":
+        try:
+            pdf = pymupdf.open(path)
+        except Exception as e:
+            logger.warning("PyMuPDF failed to open %s, trying pypdf: %s", path, e)
+        else:
+            with pdf:
+                for number, page in enumerate(pdf):
+                    yield Document(
+                        page_content=page.get_text().strip(),
+                        metadata={"source": str(path), "page": number, "total_pages": pdf.page_count},
+                    )
+            return
+
+    reader = PdfReader(path)
+    total_pages = len(reader.pages)
+    for number, page in enumerate(reader.pages):
+        yield Document(
+            page_content=page.extract_text(),
+            metadata={"source": str(path), "page": number, "total_pages": total_pages},
+        )
+
+
+def iter_chunks(pages, text_splitter):
+    """
+    Split a stream of pages. Splitters with `split_pages` (the legal
+    splitter) let chunks continue across page breaks; others split pages
+    one at a time.
+    """
+    if hasattr(text_splitter, "split_pages"):
+        yield from text_splitter.split_pages(pages)
+        return
+    for page in pages:
+        yield from text_splitter.split_documents([page])
+
+
+def token_batches(chunks, max_tokens=EMBEDDING_BATCH_TOKENS, max_chunks=EMBEDDING_BATCH_MAX_CHUNKS):
+    """
+    Group chunks into batches that stay under a token and size budget.
+
+    Args:
+        chunks: Iterable of LangChain Documents to embed
+        max_tokens: Max total tokens per embedding request
+        max_chunks: Max chunks per embedding request
+
+    Yields:
+        Batches, each a list of chunks
+    """
+    batch, batch_tokens = [], 0
+    for chunk in chunks:
+        tokens = count_tokens(chunk.page_content)
+        if batch and (batch_tokens + tokens > max_tokens or len(batch) >= max_chunks):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(chunk)
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+def embed_with_backoff(embeddings, texts, max_retries=EMBEDDING_MAX_RETRIES):
+    """Embed texts, retrying with exponential backoff and jitter on rate limits."""
+    for attempt in range(max_retries + 1):
+        try:
+            return embeddings.embed_documents(texts)
+        except RETRYABLE_ERRORS:
+            if attempt == max_retries:
+                raise
+            time.sleep(min(2 ** attempt, 60) + random.uniform(0, 1))
+
+
+def ingest_chunks(
+    vector_store,
+    chunks,
+    vector_id=None,
+    concurrency=EMBEDDING_CONCURRENCY,
+    on_batch=None,
+    deadline=None,
+):
+    """
+    Embed chunks and write them to a vector store.
+
+    Chunks are consumed lazily: a batch is only built when a thread is
+    free, so at most `concurrency` batches are in memory. Each batch is
+    written with a single bulk insert; with stable ids the insert is an
+    upsert, so re-running a batch is harmless. Unless
+    VECTOR_STORE_CHUNK_TEXT is set, chunks whose metadata links them to a
+    chunk row ("chunk_id") are stored without their text.
+
+    Args:
+        vector_store: Target PGVector store
+        chunks: Iterable of LangChain Documents with their metadata
+        vector_id: Optional function returning the vector id of a chunk
+        concurrency: Max batches embedded at the same time
+        on_batch: Called with the chunks of each batch once it is written
+            (used to checkpoint progress)
+        deadline: time.monotonic() value after which no new batch starts
+
+    Returns:
+        dict: chunk and batch counts, elapsed seconds, chunks/s and whether
+        every batch was written before the deadline
+    """
+    started = time.monotonic()
+    concurrency = max(1, concurrency)
+
+    def process(batch):
+        texts = [chunk.page_content for chunk in batch]
+        vectors = embed_with_backoff(vector_store.embeddings, texts)
+        vector_store.add_embeddings(
+            texts=[
+                chunk.page_content
+                if settings.VECTOR_STORE_CHUNK_TEXT or "chunk_id" not in chunk.metadata
+                else ""
+                for chunk in batch
+            ],
+            embeddings=vectors,
+            metadatas=[chunk.metadata for chunk in batch],
+            ids=[vector_id(chunk) for chunk in batch] if vector_id else None,
+        )
+        return batch
+
+    written = 0
+    submitted = 0
+    exhausted = False
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        in_flight = set()
+        batches = token_batches(chunks)
+        while True:
+            # Keep up to `concurrency` batches running until the deadline
+            while not exhausted and len(in_flight) < concurrency:
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                batch = next(batches, None)
+                if batch is None:
+                    exhausted = True
+                    break
+                in_flight.add(pool.submit(process, batch))
+                submitted += 1
+            if not in_flight:
+                break
+
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = future.result()
+                if on_batch is not None:
+                    on_batch(batch)
+                written += len(batch)
+
+    elapsed = time.monotonic() - started
+    return {
+        "chunks": written,
+        "batches": submitted,
+        "seconds": round(elapsed, 2),
+        "chunks_per_second": round(written / elapsed, 1) if elapsed else float(written),
+        "complete": exhausted,
+    }
@@ -6,24 +6,175 @@ Provides centralized configuration for:
 - Vector store (PGVector with PostgreSQL)
 - Text splitting and document processing
 - RAG chain with legal document-focused prompts
+- Per-process client registry (shared DB engine, HTTP client, models)
+- Redis-backed embedding cache
 """
+import asyncio
+import hashlib
+import json
 import os
-
+import threading
+import time
+import unicodedata
+import uuid
+import weakref
+from array import array
+from collections import OrderedDict
+from collections.abc import Callable
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+
+import httpx
+import redis
+import redis.asyncio
+import tiktoken
 from django.conf import settings
+from sqlalchemy import cast, create_engine, text
+from sqlalchemy.engine import Engine
 
+from langchain_core.documents import Document as LCDocument
+from langchain_core.embeddings import Embeddings
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 from langchain_postgres import PGVector
+from langchain_postgres.vectorstores import DistanceStrategy
+from pgvector.sqlalchemy import HALFVEC
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnableLambda, RunnableParallel, RunnablePassthrough
+from langchain_core.runnables.config import run_in_executor
+
+from .models import DocumentChunk, EgyptianLawChunk
+from .text_normalization import SEARCH_TEXT_FUNCTION, search_terms
+from .text_splitters import LegalTextSplitter, strip_overlap
 
 # Constants
 EMBEDDING_MODEL = "text-embedding-3-large"  # Upgraded for better Arabic support
+EMBEDDING_DIMENSIONS = settings.EMBEDDING_DIMENSIONS  # Shortened via the API `dimensions` parameter
 CHAT_MODEL = "gpt-4o-mini"
-CHUNK_SIZE = 1000
+CHUNK_SIZE = 1000  # Characters (character splitter, kept for comparison)
 CHUNK_OVERLAP = 200
+CHUNK_TOKENS = 512  # Max embedding tokens per chunk (legal-structure splitter)
+CHUNK_OVERLAP_TOKENS = 64  # Only inside articles longer than CHUNK_TOKENS
 RETRIEVAL_K = 15  # Increased for better coverage
+MESSAGE_OVERHEAD_TOKENS = 3  # Chat format tokens per prompt message (and for the reply priming)
+
+# Hybrid retrieval (dense + full-text, fused by reciprocal rank)
+HYBRID_RETRIEVAL_K = 8  # Exact term / article matches rank near the top, so fewer chunks are needed
+HYBRID_FETCH_K = 30  # Candidates taken from each ranking
+RRF_K = 60  # Reciprocal rank fusion constant (score = sum of 1 / (RRF_K + rank))
+
+# Prompt versions per chain kind.
+# Bump a version whenever its prompt changes so stored analyses (and, for
+# the law chat chain, cached answers) are regenerated.
+PROMPT_VERSIONS = {
+    "clause_detection": "1",
+    "summary": "1",
+    "arabic_summary": "1",
+    "arabic_clauses": "1",
+    "egyptian_law_rag": "1",
+}
+
+# Client registry limits (per worker process)
+DB_POOL_SIZE = 5
+DB_MAX_OVERFLOW = 10
+DB_POOL_RECYCLE = 30 * 60  # Recycle connections every 30 minutes
+VECTOR_STORE_CACHE_SIZE = 256  # Collection-scoped views kept per process
+
+# Compiled chain cache (per worker process)
+CHAIN_CACHE_MAX_SIZE = 128
+CHAIN_CACHE_TTL = 60 * 60  # Rebuild chains after 1 hour
+
+# Ingestion embedding batches
+EMBEDDING_BATCH_TOKENS = 50_000  # Tokens per embedding request (API max is 300k)
+EMBEDDING_BATCH_MAX_CHUNKS = 256  # Chunks per embedding request
+EMBEDDING_CONCURRENCY = 4  # Embedding requests in flight per ingestion
+EMBEDDING_MAX_RETRIES = 6  # Retries on rate limits / transient API errors
+CHUNK_WRITE_BATCH = 500  # Chunk rows written / read per database round trip
+INGESTION_TIME_MARGIN = 5 * 60  # Stop starting batches this long before the task time limit
+INGESTION_FANOUT_MIN_PAGES = 100  # Documents this large are embedded in parallel page ranges
+INGESTION_PAGE_RANGE = 50  # Pages per embedding subtask
+
+# HNSW index over langchain_pg_embedding (see `manage.py vector_index`).
+# pgvector only indexes `vector` up to 2000 dimensions, so the index is on
+# the embedding cast to halfvec (up to 4000), and searches use the same cast.
+VECTOR_INDEX_NAME = "langchain_pg_embedding_hnsw_idx"
+VECTOR_COLLECTION_INDEX_NAME = "langchain_pg_embedding_collection_idx"
+VECTOR_SCOPE_INDEX_NAMES = {
+    "law_slug": "langchain_pg_embedding_law_slug_idx",
+    "document_id": "langchain_pg_embedding_document_id_idx",
+}
+# Advisory lock key serializing index builds across processes
+VECTOR_INDEX_LOCK_KEY = 7_325_118_001
+
+# Unified corpus mode (VECTOR_CORPUS_MODE="unified"): one collection per
+# corpus type instead of one per law / document, scoped by metadata
+LAW_CORPUS_COLLECTION = "egyptian_laws"
+DOCUMENT_CORPUS_COLLECTION = "user_documents"
+
+# Embedding cache (shared across workers in Redis)
+EMBEDDING_CACHE_TTL = 30 * 24 * 60 * 60  # 30 days
+EMBEDDING_CACHE_TIMEOUT = 0.5  # Seconds; a slow cache falls back to the API
+
+
+# ============================================
+# Client Registry
+# ============================================
+# Embeddings, chat models, the SQLAlchemy engine and the HTTP clients are
+# expensive to build (new connection pool, TCP+TLS handshakes), so they are
+# created once per worker process and reused by every request.
+# The registry is dropped in forked children (Celery prefork, gunicorn)
+# so pooled sockets are never shared between processes.
+
+_registry_lock = threading.RLock()
+_registry = {
+    "pid": None,
+    "engine": None,
+    "http_client": None,
+    "async_http_client": None,
+    "embeddings": None,
+    "redis": None,
+    "async_redis": weakref.WeakKeyDictionary(),
+    "llms": {},
+    "vector_stores": OrderedDict(),
+    "chain_cache": None,
+}
+
+
+def _reset_registry():
+    """
+    Forget every cached client.
+    Runs in forked children: the parent's pooled connections are detached
+    (not closed) so the parent keeps using them safely.
+    """
+    engine = _registry["engine"]
+    if engine is not None:
+        engine.dispose(close=False)
+    _registry.update({
+        "pid": os.getpid(),
+        "engine": None,
+        "http_client": None,
+        "async_http_client": None,
+        "embeddings": None,
+        "redis": None,
+        "async_redis": weakref.WeakKeyDictionary(),
+        "llms": {},
+        "vector_stores": OrderedDict(),
+        "chain_cache": None,
+    })
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_registry)
+
+
+def _get_registry() -> dict:
+    """Return the registry for the current process, resetting it after a fork."""
+    if _registry["pid"] != os.getpid():
+        with _registry_lock:
+            if _registry["pid"] != os.getpid():
+                _reset_registry()
+    return _registry
 
 
 def get_connection_string() -> str:
@@ -53,18 +204,347 @@ def get_openai_api_key() -> str:
     return api_key
 
 
-def get_embeddings() -> OpenAIEmbeddings:
-    """Get configured OpenAI embeddings model."""
-    return OpenAIEmbeddings(
-        model=EMBEDDING_MODEL,
-        openai_api_key=get_openai_api_key()
+def get_engine() -> Engine:
+    """
+    Get the shared SQLAlchemy engine used by all vector stores.
+    One connection pool per worker process.
+    """
+    registry = _get_registry()
+    if registry["engine"] is None:
+        with _registry_lock:
+            if registry["engine"] is None:
+                registry["engine"] = create_engine(
+                    get_connection_string(),
+                    pool_size=DB_POOL_SIZE,
+                    max_overflow=DB_MAX_OVERFLOW,
+                    pool_recycle=DB_POOL_RECYCLE,
+                    pool_pre_ping=True,
+                    connect_args={"options": vector_search_options()},
+                )
+    return registry["engine"]
+
+
+def vector_search_options() -> str:
+    """
+    Session settings for vector searches, passed when connections open.
+
+    - hnsw.ef_search: HNSW candidate list size (recall vs latency)
+    - hnsw.iterative_scan: keep scanning the index until enough rows pass
+      the collection filter (pgvector 0.8+; ignored with a warning before)
+    - plan_cache_mode: plan each search for its own collection, so small
+      collections use the collection index instead of the HNSW index
+    """
+    return (
+        f"-c hnsw.ef_search={settings.VECTOR_INDEX_EF_SEARCH} "
+        "-c hnsw.iterative_scan=strict_order "
+        "-c plan_cache_mode=force_custom_plan"
     )
 
 
-def get_text_splitter() -> RecursiveCharacterTextSplitter:
+def get_http_client() -> httpx.Client:
+    """
+    Get the shared HTTP client used for OpenAI API calls.
+    Keeps TLS connections to the model API alive between requests.
+    """
+    registry = _get_registry()
+    if registry["http_client"] is None:
+        with _registry_lock:
+            if registry["http_client"] is None:
+                registry["http_client"] = httpx.Client(
+                    timeout=httpx.Timeout(60.0, connect=10.0),
+                    limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+                )
+    return registry["http_client"]
+
+
+class LoopLocalTransport(httpx.AsyncBaseTransport):
+    """
+    Async transport keeping one connection pool per event loop.
+
+    Under uvicorn every request runs on the worker's single loop, so this
+    is one pool per worker; callers driving async code from short-lived
+    loops (async_to_sync, tests) get a pool of their own instead of
+    sockets bound to a loop that is gone.
+    """
+
+    def __init__(self, **kwargs):
+        self._kwargs = kwargs
+        self._pools = weakref.WeakKeyDictionary()
+
+    async def handle_async_request(self, request):
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is None:
+            pool = self._pools[loop] = httpx.AsyncHTTPTransport(**self._kwargs)
+        return await pool.handle_async_request(request)
+
+    async def aclose(self):
+        pool = self._pools.pop(asyncio.get_running_loop(), None)
+        if pool is not None:
+            await pool.aclose()
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared async HTTP client used for OpenAI API calls made by the
+    async views (`ainvoke` / `astream` / `aembed_query`), so they reuse
+    kept-alive connections like the sync path.
+    """
+    registry = _get_registry()
+    if registry["async_http_client"] is None:
+        with _registry_lock:
+            if registry["async_http_client"] is None:
+                registry["async_http_client"] = httpx.AsyncClient(
+                    timeout=httpx.Timeout(60.0, connect=10.0),
+                    transport=LoopLocalTransport(
+                        limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+                    ),
+                )
+    return registry["async_http_client"]
+
+
+def get_redis_client() -> redis.Redis:
+    """Get the shared Redis client backing the embedding cache."""
+    registry = _get_registry()
+    if registry["redis"] is None:
+        with _registry_lock:
+            if registry["redis"] is None:
+                registry["redis"] = redis.Redis.from_url(
+                    settings.EMBEDDING_CACHE_URL,
+                    socket_timeout=EMBEDDING_CACHE_TIMEOUT,
+                    socket_connect_timeout=EMBEDDING_CACHE_TIMEOUT,
+                )
+    return registry["redis"]
+
+
+def get_async_redis_client() -> redis.asyncio.Redis:
+    """
+    Get the async Redis client of the running event loop, used by the
+    embedding cache on the async path. asyncio connections belong to the
+    loop that opened them, so like LoopLocalTransport there is one client
+    per loop: one per uvicorn worker, plus short-lived ones for
+    async_to_sync callers.
+    """
+    clients = _get_registry()["async_redis"]
+    loop = asyncio.get_running_loop()
+    with _registry_lock:
+        client = clients.get(loop)
+        if client is None:
+            client = clients[loop] = redis.asyncio.Redis.from_url(
+                settings.EMBEDDING_CACHE_URL,
+                socket_timeout=EMBEDDING_CACHE_TIMEOUT,
+                socket_connect_timeout=EMBEDDING_CACHE_TIMEOUT,
+            )
+    return client
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that caches vectors in Redis.
+
+    Keys are the model name and dimensions plus a SHA-256 of the
+    normalized text, and values are packed float32 bytes (about 12 KB for
+    3072 dimensions, a fraction of the JSON size). Repeated questions and re-uploaded
+    documents therefore skip the embedding API. Redis errors are treated
+    as cache misses so chat and ingestion keep working without it.
+
+    The async methods (used by the async views) go through
+    `async_client()`, the running loop's asyncio Redis client, and the
+    wrapped model's async API, so they never block the event loop.
+    """
+
+    def __init__(self, embeddings: Embeddings, model: str, dimensions: int, client: redis.Redis,
+                 async_client: Callable[[], redis.asyncio.Redis]):
+        self.embeddings = embeddings
+        self.model = model
+        self.dimensions = dimensions
+        self.client = client
+        self.async_client = async_client
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Unicode-normalize and collapse whitespace."""
+        return " ".join(unicodedata.normalize("NFKC", text).split())
+
+    def cache_key(self, text: str) -> str:
+        digest = hashlib.sha256(self.normalize(text).encode("utf-8")).hexdigest()
+        return f"embedding:{self.model}:{self.dimensions}:{digest}"
+
+    def _lookup(self, keys: list[str], cached: list) -> tuple[list, dict]:
+        """
+        Decode cached values and count hits and misses.
+
+        Returns:
+            (vectors with None for misses, {missing key: positions}),
+            listing each missing text once even if it repeats in the batch
+        """
+        vectors = [
+            array("f", value).tolist() if value is not None else None
+            for value in cached
+        ]
+        missing = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(keys[i], []).append(i)
+        self.hits += len(vectors) - sum(len(idx) for idx in missing.values())
+        self.misses += len(missing)
+        return vectors, missing
+
+    @staticmethod
+    def _fill(vectors: list, missing: dict, new_vectors: list) -> list:
+        for idx, vector in zip(missing.values(), new_vectors):
+            for i in idx:
+                vectors[i] = vector
+        return vectors
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+
+        keys = [self.cache_key(text) for text in texts]
+        try:
+            cached = self.client.mget(keys)
+        except redis.RedisError:
+            cached = [None] * len(keys)
+        vectors, missing = self._lookup(keys, cached)
+        if not missing:
+            return vectors
+
+        new_vectors = self.embeddings.embed_documents(
+            [texts[idx[0]] for idx in missing.values()]
+        )
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, vector in zip(missing, new_vectors):
+                pipe.set(key, array("f", vector).tobytes(), ex=EMBEDDING_CACHE_TTL)
+            pipe.execute()
+        except redis.RedisError:
+            pass
+        return self._fill(vectors, missing, new_vectors)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+
+        keys = [self.cache_key(text) for text in texts]
+        client = self.async_client()
+        try:
+            cached = await client.mget(keys)
+        except redis.RedisError:
+            cached = [None] * len(keys)
+        vectors, missing = self._lookup(keys, cached)
+        if not missing:
+            return vectors
+
+        new_vectors = await self.embeddings.aembed_documents(
+            [texts[idx[0]] for idx in missing.values()]
+        )
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for key, vector in zip(missing, new_vectors):
+                    pipe.set(key, array("f", vector).tobytes(), ex=EMBEDDING_CACHE_TTL)
+                await pipe.execute()
+        except redis.RedisError:
+            pass
+        return self._fill(vectors, missing, new_vectors)
+
+    def embed_query(self, text: str) -> list[float]:
+        key = self.cache_key(text)
+        try:
+            value = self.client.get(key)
+        except redis.RedisError:
+            value = None
+
+        if value is not None:
+            self.hits += 1
+            return array("f", value).tolist()
+
+        self.misses += 1
+        vector = self.embeddings.embed_query(text)
+        try:
+            self.client.set(key, array("f", vector).tobytes(), ex=EMBEDDING_CACHE_TTL)
+        except redis.RedisError:
+            pass
+        return vector
+
+    async def aembed_query(self, text: str) -> list[float]:
+        key = self.cache_key(text)
+        client = self.async_client()
+        try:
+            value = await client.get(key)
+        except redis.RedisError:
+            value = None
+
+        if value is not None:
+            self.hits += 1
+            return array("f", value).tolist()
+
+        self.misses += 1
+        vector = await self.embeddings.aembed_query(text)
+        try:
+            await client.set(key, array("f", vector).tobytes(), ex=EMBEDDING_CACHE_TTL)
+        except redis.RedisError:
+            pass
+        return vector
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "pid": os.getpid(),
+            "model": self.model,
+            "dimensions": self.dimensions,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def get_embeddings() -> CachedEmbeddings:
+    """
+    Get configured OpenAI embeddings model (shared per process).
+    Queries and document chunks both go through the Redis embedding cache.
+    """
+    registry = _get_registry()
+    if registry["embeddings"] is None:
+        with _registry_lock:
+            if registry["embeddings"] is None:
+                registry["embeddings"] = CachedEmbeddings(
+                    OpenAIEmbeddings(
+                        model=EMBEDDING_MODEL,
+                        dimensions=EMBEDDING_DIMENSIONS,
+                        openai_api_key=get_openai_api_key(),
+                        http_client=get_http_client(),
+                        http_async_client=get_async_http_client(),
+                    ),
+                    model=EMBEDDING_MODEL,
+                    dimensions=EMBEDDING_DIMENSIONS,
+                    client=get_redis_client(),
+                    async_client=get_async_redis_client,
+                )
+    return registry["embeddings"]
+
+
+def get_text_splitter() -> LegalTextSplitter:
     """
     Get configured text splitter optimized for legal documents.
-    Uses larger chunks to preserve context in legal clauses.
+    Cuts on article / chapter / clause boundaries and sizes chunks in
+    embedding tokens, so articles are not split mid-clause.
+    """
+    from .ingestion import count_tokens  # ingestion imports this module
+
+    return LegalTextSplitter(
+        chunk_size=CHUNK_TOKENS,
+        chunk_overlap=CHUNK_OVERLAP_TOKENS,
+        length_function=count_tokens,
+    )
+
+
+def get_character_splitter() -> RecursiveCharacterTextSplitter:
+    """
+    Fixed-size character splitter used before the legal-structure splitter
+    (kept for benchmarks).
     """
     return RecursiveCharacterTextSplitter(
         chunk_size=CHUNK_SIZE,
@@ -74,22 +554,154 @@ def get_text_splitter() -> RecursiveCharacterTextSplitter:
     )
 
 
+class PooledPGVector(PGVector):
+    """
+    PGVector view bound to the shared sync engine.
+
+    langchain_postgres only allows async search on an AsyncEngine, whose
+    pool is tied to one event loop. Async searches here run the pooled
+    sync query in a worker thread instead, so chains can be awaited
+    (`ainvoke` / `astream`) from ASGI views while sharing one pool.
+
+    `name` is the logical collection (`law_<slug>`, `document_<id>`). In
+    unified corpus mode the view sits on the shared corpus collection and
+    `scope` holds the metadata that selects its vectors; every search and
+    delete_collection() is restricted to it.
+    """
+    name = None
+    scope = {}
+
+    async def asimilarity_search(self, query, k=4, filter=None, **kwargs):
+        return await run_in_executor(
+            None, self.similarity_search, query, k, filter, **kwargs
+        )
+
+    async def asimilarity_search_with_score(self, query, k=4, filter=None):
+        return await run_in_executor(
+            None, self.similarity_search_with_score, query, k, filter
+        )
+
+    async def amax_marginal_relevance_search(
+        self, query, k=4, fetch_k=20, lambda_mult=0.5, filter=None, **kwargs
+    ):
+        return await run_in_executor(
+            None, self.max_marginal_relevance_search,
+            query, k, fetch_k, lambda_mult, filter, **kwargs
+        )
+
+    @property
+    def distance_strategy(self):
+        strategy = super().distance_strategy
+        if not settings.VECTOR_INDEX_ENABLED or self._distance_strategy != DistanceStrategy.COSINE:
+            return strategy
+        # Same expression as the HNSW index, so the planner can use it
+        column = cast(self.EmbeddingStore.embedding, HALFVEC(EMBEDDING_DIMENSIONS))
+        return lambda embedding: column.cosine_distance(
+            cast(embedding, HALFVEC(EMBEDDING_DIMENSIONS))
+        )
+
+    def scoped_filter(self, filter=None):
+        """Combine a search filter with the view's scope."""
+        if not self.scope:
+            return filter
+        scope = {key: {"$in": [str(value)]} for key, value in self.scope.items()}
+        return {"$and": [scope, filter]} if filter else scope
+
+    def similarity_search_with_score_by_vector(self, embedding, k=4, filter=None):
+        return super().similarity_search_with_score_by_vector(
+            embedding, k=k, filter=self.scoped_filter(filter)
+        )
+
+    def max_marginal_relevance_search_with_score_by_vector(
+        self, embedding, k=4, fetch_k=20, lambda_mult=0.5, filter=None, **kwargs
+    ):
+        return super().max_marginal_relevance_search_with_score_by_vector(
+            embedding, k=k, fetch_k=fetch_k, lambda_mult=lambda_mult,
+            filter=self.scoped_filter(filter), **kwargs
+        )
+
+    def delete_collection(self):
+        if not self.scope:
+            return super().delete_collection()
+        with get_engine().begin() as conn:
+            conn.execute(
+                text("""
+                    DELETE FROM langchain_pg_embedding e
+                    USING langchain_pg_collection c
+                    WHERE e.collection_id = c.uuid AND c.name = :collection
+                      AND e.cmetadata @> CAST(:scope AS jsonb)
+                """),
+                {"collection": self.collection_name, "scope": json.dumps(self.scope)},
+            )
+
+    def _results_to_docs_and_scores(self, results):
+        # Every search goes through here; fill in text that was not stored with the vector
+        docs_and_scores = super()._results_to_docs_and_scores(results)
+        hydrate_chunk_text([doc for doc, _ in docs_and_scores])
+        return docs_and_scores
+
+
+def corpus_collection(collection_name: str) -> tuple[str, dict]:
+    """
+    Physical collection and metadata scope of a logical collection name.
+
+    In unified corpus mode `law_<slug>` and `document_<id>` map to the
+    shared corpus collections, scoped by "law_slug" / "document_id"
+    metadata; otherwise every logical collection is its own collection.
+    """
+    if settings.VECTOR_CORPUS_MODE == "unified":
+        if collection_name.startswith("law_"):
+            return LAW_CORPUS_COLLECTION, {"law_slug": collection_name[len("law_"):]}
+        if collection_name.startswith("document_"):
+            return DOCUMENT_CORPUS_COLLECTION, {"document_id": int(collection_name[len("document_"):])}
+    return collection_name, {}
+
+
 def get_vector_store(collection_name: str = "documind_documents") -> PGVector:
     """
     Get or create PGVector store instance.
 
+    Stores are lightweight collection-scoped views over the shared engine
+    and embeddings, cached per process (LRU bounded) so the collection
+    lookup only happens the first time a collection is used. In unified
+    corpus mode the view is scoped to the logical collection's metadata.
+
     Args:
         collection_name: Name of the collection (use document_id for per-doc isolation)
 
     Returns:
         PGVector vector store instance
     """
-    return PGVector(
+    registry = _get_registry()
+    stores = registry["vector_stores"]
+    with _registry_lock:
+        store = stores.get(collection_name)
+        if store is not None:
+            stores.move_to_end(collection_name)
+            return store
+
+    physical_name, scope = corpus_collection(collection_name)
+    store = PooledPGVector(
         embeddings=get_embeddings(),
-        collection_name=collection_name,
-        connection=get_connection_string(),
+        collection_name=physical_name,
+        connection=get_engine(),
         use_jsonb=True,
     )
+    store.name = collection_name
+    store.scope = scope
+
+    with _registry_lock:
+        stores[collection_name] = store
+        stores.move_to_end(collection_name)
+        while len(stores) > VECTOR_STORE_CACHE_SIZE:
+            stores.popitem(last=False)
+    return store
+
+
+def evict_vector_store(collection_name: str):
+    """Drop a cached collection view (e.g. after its collection is deleted)."""
+    with _registry_lock:
+        _get_registry()["vector_stores"].pop(collection_name, None)
 
 
 def get_document_vector_store(document_id: int) -> PGVector:
@@ -115,35 +727,421 @@ def get_llm(temperature: float = 0) -> ChatOpenAI:
         temperature: Creativity level (0 for factual legal analysis)
 
     Returns:
-        ChatOpenAI instance
+        ChatOpenAI instance (shared per process for each temperature)
     """
-    return ChatOpenAI(
-        model=CHAT_MODEL,
-        temperature=temperature,
-        openai_api_key=get_openai_api_key()
-    )
+    registry = _get_registry()
+    llm = registry["llms"].get(temperature)
+    if llm is None:
+        with _registry_lock:
+            llm = registry["llms"].get(temperature)
+            if llm is None:
+                llm = ChatOpenAI(
+                    model=CHAT_MODEL,
+                    temperature=temperature,
+                    openai_api_key=get_openai_api_key(),
+                    http_client=get_http_client(),
+                    http_async_client=get_async_http_client(),
+                )
+                registry["llms"][temperature] = llm
+    return llm
+
+
+class ChainCache:
+    """
+    LRU cache of compiled LCEL chains with TTL eviction.
+
+    Keys are (chain kind, collection name, model, temperature), so hot
+    documents and the seeded laws reuse a prebuilt runnable instead of
+    rebuilding prompts, retrievers and graphs on every request.
+    """
+
+    def __init__(self, max_size: int = CHAIN_CACHE_MAX_SIZE, ttl: float = CHAIN_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (built_at, chain)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_build(self, key: tuple, build):
+        """Return the cached chain for key, building it on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+                self.evictions += 1
+            self.misses += 1
+
+        chain = build()
+
+        with self._lock:
+            self._entries[key] = (now, chain)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return chain
+
+    def invalidate(self, collection_name: str = None):
+        """Drop chains for one collection, or every chain if no name is given."""
+        with self._lock:
+            if collection_name is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[1] == collection_name]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        """Hit/miss counters for ops monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "pid": os.getpid(),
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def get_chain_cache() -> ChainCache:
+    """Get the compiled chain cache for the current process."""
+    registry = _get_registry()
+    if registry["chain_cache"] is None:
+        with _registry_lock:
+            if registry["chain_cache"] is None:
+                registry["chain_cache"] = ChainCache()
+    return registry["chain_cache"]
+
+
+def _cached_chain(kind: str, temperature: float = 0):
+    """
+    Decorator caching a chain builder by (kind, collection, model params).
+    The wrapped builder receives the vector store and the configured LLM.
+    """
+    def decorator(build):
+        @wraps(build)
+        def wrapper(vector_store: PGVector):
+            name = getattr(vector_store, "name", None) or vector_store.collection_name
+            key = (kind, name, CHAT_MODEL, temperature)
+            return get_chain_cache().get_or_build(
+                key, lambda: build(vector_store, get_llm(temperature=temperature))
+            )
+        return wrapper
+    return decorator
+
+
+@lru_cache(maxsize=1)
+def _get_chat_encoding():
+    """Tokenizer of the chat model, or None if it cannot be loaded."""
+    try:
+        return tiktoken.encoding_for_model(CHAT_MODEL)
+    except Exception:
+        return None
+
+
+def count_prompt_tokens(text: str) -> int:
+    """Chat model token count (estimated from length if tiktoken is unavailable)."""
+    encoding = _get_chat_encoding()
+    if encoding is None:
+        return len(text) // 2 + 1  # Arabic runs close to 2 characters per token
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages) -> int:
+    """Prompt tokens of a list of chat messages, including the chat format overhead."""
+    return sum(
+        count_prompt_tokens(message.content) + MESSAGE_OVERHEAD_TOKENS
+        for message in messages
+    ) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _chunk_source(doc):
+    """Law or document a chunk belongs to, for merging adjacent chunks."""
+    return doc.metadata.get("law_slug", doc.metadata.get("document_id"))
+
+
+def pack_context(docs, budget: int = None) -> list:
+    """
+    Select retrieved documents for a prompt, best first.
+
+    Documents repeating a chunk already selected (same chunk row, or text
+    contained in a selected chunk) are dropped, then documents are taken
+    in rank order while their tokens fit in `budget`
+    (settings.CONTEXT_TOKEN_BUDGET by default). Each document is charged at
+    its full length, so the merged context from format_docs never exceeds
+    the budget.
+
+    Returns:
+        Selected documents, in rank order
+    """
+    budget = budget or settings.CONTEXT_TOKEN_BUDGET
+    selected, chunk_ids, used = [], set(), 0
+    for doc in docs:
+        content = doc.page_content.strip()
+        chunk_id = doc.metadata.get("chunk_id")
+        if not content or chunk_id in chunk_ids:
+            continue
+        if any(content in other.page_content for other in selected):
+            continue
+        tokens = count_prompt_tokens(content)
+        if used + tokens > budget:
+            continue
+        selected.append(doc)
+        used += tokens
+        if chunk_id is not None:
+            chunk_ids.add(chunk_id)
+    return selected
 
 
 def format_docs(docs):
-    """Format retrieved documents for context."""
-    return "\n\n".join(doc.page_content for doc in docs)
+    """
+    Format retrieved documents for context.
+
+    Chunks of the same law / document with consecutive chunk_index are
+    merged into one passage without the text they repeat from each other;
+    passages keep the rank of their best chunk.
+    """
+    passages = []
+
+    def position(item):
+        rank, doc = item
+        index = doc.metadata.get("chunk_index")
+        return str(_chunk_source(doc)), index if isinstance(index, int) else -1, rank
+
+    for rank, doc in sorted(enumerate(docs), key=position):
+        index = doc.metadata.get("chunk_index")
+        content = doc.page_content.strip()
+        last = passages[-1] if passages else None
+        if (
+            last is not None
+            and isinstance(index, int)
+            and last["source"] == _chunk_source(doc)
+            and last["index"] == index - 1
+        ):
+            last["parts"].append(strip_overlap(last["previous"], content).strip())
+            last["rank"] = min(last["rank"], rank)
+        else:
+            passages.append({"source": _chunk_source(doc), "rank": rank, "parts": [content]})
+            last = passages[-1]
+        last["index"] = index if isinstance(index, int) else None
+        last["previous"] = content
+
+    passages.sort(key=lambda passage: passage["rank"])
+    return "\n\n".join(
+        " ".join(part for part in passage["parts"] if part) for passage in passages
+    )
+
+
+def query_retriever(vector_store: PGVector, search_type: str = "similarity", **search_kwargs):
+    """
+    Retriever accepting either a query string or {"input", "embedding"}.
+
+    Callers that already embedded the query (e.g. for the semantic answer
+    cache) pass the vector along so the search does not embed it again.
+    """
+    retriever = vector_store.as_retriever(
+        search_type=search_type, search_kwargs=search_kwargs
+    )
+
+    def search_by_vector(embedding):
+        if search_type == "mmr":
+            return vector_store.max_marginal_relevance_search_by_vector(
+                embedding, **search_kwargs
+            )
+        return vector_store.similarity_search_by_vector(embedding, **search_kwargs)
+
+    def retrieve(x):
+        if isinstance(x, dict):
+            return search_by_vector(x["embedding"])
+        return retriever.invoke(x)
+
+    async def aretrieve(x):
+        if isinstance(x, dict):
+            return await run_in_executor(None, search_by_vector, x["embedding"])
+        return await retriever.ainvoke(x)
+
+    return RunnableLambda(retrieve, afunc=aretrieve)
+
+
+def _query_text(x):
+    """Question text from a plain query or an {"input", "embedding"} payload."""
+    return x["input"] if isinstance(x, dict) else x
+
+
+# Chunk table, scope column and vector metadata key of a logical collection prefix
+LEXICAL_SCOPES = {
+    "law_": (EgyptianLawChunk._meta.db_table, "law_id", "law_slug"),
+    "document_": (DocumentChunk._meta.db_table, "document_id", "document_id"),
+}
+
+
+def lexical_search(collection_name: str, query: str, k: int = HYBRID_FETCH_K) -> list:
+    """
+    Full-text search over the chunk rows of a logical collection.
+
+    Chunk content and the query get the same normalization (see
+    text_normalization); any query term may match and chunks are ranked
+    by ts_rank_cd cover density. Collections without chunk rows return
+    nothing.
+
+    Returns:
+        Documents carrying the same metadata keys as the chunk vectors, best first
+    """
+    prefix = next((p for p in LEXICAL_SCOPES if collection_name.startswith(p)), None)
+    terms = search_terms(query)
+    if prefix is None or not terms:
+        return []
+    table, column, key = LEXICAL_SCOPES[prefix]
+    scope = collection_name[len(prefix):]
+    if key == "document_id":
+        scope = int(scope)
+    document = f"to_tsvector('simple', {SEARCH_TEXT_FUNCTION}(content))"
+
+    with get_engine().connect() as conn:
+        rows = conn.execute(
+            text(f"""
+                SELECT id, content, chunk_index, page_number, end_page_number,
+                       ts_rank_cd({document}, query, 1) AS rank
+                FROM {table}, to_tsquery('simple', :query) query
+                WHERE {column} = :scope AND {document} @@ query
+                ORDER BY rank DESC, chunk_index
+                LIMIT :k
+            """),
+            {"query": " | ".join(terms), "scope": scope, "k": k},
+        ).all()
+
+    return [
+        LCDocument(
+            page_content=row.content,
+            metadata={
+                key: scope,
+                "chunk_id": row.id,
+                "chunk_index": row.chunk_index,
+                "page_number": row.page_number,
+                "end_page_number": row.end_page_number,
+            },
+        )
+        for row in rows
+    ]
+
+
+def reciprocal_rank_fusion(rankings, k: int, rrf_k: int = RRF_K) -> list:
+    """
+    Merge ranked document lists: each document scores the sum of
+    1 / (rrf_k + rank) over the lists it appears in. Documents are matched
+    by law / document and chunk_index, which vectors written before chunk
+    rows were linked ("chunk_id") also carry; documents without a
+    chunk_index fall back to the chunk row, then the vector id.
+
+    Returns:
+        Top k documents, best first
+    """
+    scores, docs = {}, {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            index = doc.metadata.get("chunk_index")
+            if index is not None:
+                key = (_chunk_source(doc), index)
+            else:
+                key = doc.metadata.get("chunk_id") or doc.id
+            scores[key] = scores.get(key, 0) + 1 / (rrf_k + rank)
+            docs.setdefault(key, doc)
+    return [docs[key] for key in sorted(scores, key=scores.get, reverse=True)[:k]]
+
+
+def hybrid_retriever(vector_store: PGVector, k: int = HYBRID_RETRIEVAL_K, fetch_k: int = HYBRID_FETCH_K):
+    """
+    Retriever fusing dense similarity and full-text search by reciprocal rank.
+
+    Catches what embeddings miss (article numbers such as "مادة 52", exact
+    legal terms) without raising k. Accepts a query string or
+    {"input", "embedding"} like query_retriever; async calls run both
+    searches concurrently.
+    """
+    name = getattr(vector_store, "name", None) or vector_store.collection_name
+
+    def dense(x):
+        if isinstance(x, dict):
+            return vector_store.similarity_search_by_vector(x["embedding"], k=fetch_k)
+        return vector_store.similarity_search(x, k=fetch_k)
+
+    def retrieve(x):
+        rankings = [dense(x), lexical_search(name, _query_text(x), fetch_k)]
+        return reciprocal_rank_fusion(rankings, k)
+
+    async def aretrieve(x):
+        rankings = await asyncio.gather(
+            run_in_executor(None, dense, x),
+            run_in_executor(None, lexical_search, name, _query_text(x), fetch_k),
+        )
+        return reciprocal_rank_fusion(rankings, k)
+
+    return RunnableLambda(retrieve, afunc=aretrieve)
+
+
+def build_rag_chain(retriever, prompt: ChatPromptTemplate, llm: ChatOpenAI):
+    """
+    Assemble a RAG chain that retrieves exactly once per query.
+
+    The retrieved documents feed both the prompt context and the returned
+    sources, so the question is embedded and searched a single time.
+
+    Retrieved documents are packed into the context token budget
+    (pack_context); "retrieved_docs" holds the documents actually sent, so
+    the sources match what the model saw, and "prompt_tokens" the size of
+    the prompt.
+
+    Returns:
+        Runnable producing {"input", "retrieved_docs", "context",
+        "prompt_tokens", "answer"}
+    """
+    return (
+        RunnableParallel(
+            input=_query_text,
+            retrieved_docs=retriever | pack_context,
+        )
+        | RunnablePassthrough.assign(
+            context=lambda x: format_docs(x["retrieved_docs"])
+        )
+        | RunnablePassthrough.assign(
+            prompt_tokens=lambda x: count_message_tokens(prompt.invoke(x).to_messages())
+        )
+        | RunnablePassthrough.assign(
+            answer=prompt | llm | StrOutputParser()
+        )
+    )
 
 
-def get_legal_rag_chain(vector_store: PGVector):
+@_cached_chain("legal_rag")
+def get_legal_rag_chain(vector_store: PGVector, llm: ChatOpenAI):
     """
     Build RAG chain optimized for legal document analysis using LCEL.
     This is the general-purpose chain for user-uploaded documents (typically English).
 
     Args:
         vector_store: PGVector store containing document chunks
+        llm: Shared chat model (injected by the chain cache)
 
     Returns:
         A retrieval chain for legal document Q&A
     """
-    retriever = vector_store.as_retriever(
-        search_type="similarity",
-        search_kwargs={"k": RETRIEVAL_K}
-    )
+    if settings.HYBRID_RETRIEVAL_ENABLED:
+        retriever = hybrid_retriever(vector_store)
+    else:
+        retriever = vector_store.as_retriever(
+            search_type="similarity",
+            search_kwargs={"k": RETRIEVAL_K}
+        )
 
     system_prompt = """You are LegalMind, an expert legal document analyst.
 Your role is to help users understand legal documents by providing accurate,
@@ -165,42 +1163,39 @@ Context from the document:
         ("human", "{input}")
     ])
 
-    llm = get_llm()
+    return build_rag_chain(retriever, prompt, llm)
 
-    # Build the RAG chain using LCEL
-    rag_chain = (
-        {
-            "context": retriever | format_docs,
-            "input": RunnablePassthrough(),
-            "retrieved_docs": retriever,
-        }
-        | RunnablePassthrough.assign(
-            answer=prompt | llm | StrOutputParser()
-        )
-    )
 
-    return rag_chain
+def law_retrieval_mode() -> str:
+    """Retrieval used by the law chat chain, recorded with cached answers."""
+    return "hybrid" if settings.HYBRID_RETRIEVAL_ENABLED else "mmr"
 
 
-def get_egyptian_law_rag_chain(vector_store: PGVector):
+@_cached_chain("egyptian_law_rag")
+def get_egyptian_law_rag_chain(vector_store: PGVector, llm: ChatOpenAI):
     """
     Build RAG chain optimized for Egyptian law documents (Arabic content).
 
     Args:
         vector_store: PGVector store containing law document chunks
+        llm: Shared chat model (injected by the chain cache)
 
     Returns:
         A retrieval chain for Egyptian law Q&A
     """
-    # Use MMR for better diversity in Arabic legal documents
-    retriever = vector_store.as_retriever(
-        search_type="mmr",
-        search_kwargs={
-            "k": RETRIEVAL_K,
-            "fetch_k": 30,  # Fetch more candidates for MMR selection
-            "lambda_mult": 0.7  # Balance between relevance and diversity
-        }
-    )
+    # Both retrievers accept {"input", "embedding"} so the semantic cache's
+    # query embedding is reused for retrieval on a cache miss.
+    if law_retrieval_mode() == "hybrid":
+        retriever = hybrid_retriever(vector_store)
+    else:
+        # Use MMR for better diversity in Arabic legal documents.
+        retriever = query_retriever(
+            vector_store,
+            search_type="mmr",
+            k=RETRIEVAL_K,
+            fetch_k=30,  # Fetch more candidates for MMR selection
+            lambda_mult=0.7  # Balance between relevance and diversity
+        )
 
     system_prompt = """You are LegalMind, an expert legal document analyst specializing in Egyptian law.
 Your role is to help users understand Egyptian legal documents by providing accurate,
@@ -226,29 +1221,17 @@ Context from the document (in Arabic):
         ("human", "{input}")
     ])
 
-    llm = get_llm()
-
-    # Build the RAG chain using LCEL
-    rag_chain = (
-        {
-            "context": retriever | format_docs,
-            "input": RunnablePassthrough(),
-            "retrieved_docs": retriever,
-        }
-        | RunnablePassthrough.assign(
-            answer=prompt | llm | StrOutputParser()
-        )
-    )
-
-    return rag_chain
+    return build_rag_chain(retriever, prompt, llm)
 
 
-def get_clause_detection_chain(vector_store: PGVector):
+@_cached_chain("clause_detection")
+def get_clause_detection_chain(vector_store: PGVector, llm: ChatOpenAI):
     """
     Build chain for detecting and analyzing legal clauses.
 
     Args:
         vector_store: PGVector store containing document chunks
+        llm: Shared chat model (injected by the chain cache)
 
     Returns:
         A retrieval chain for clause detection
@@ -279,11 +1262,9 @@ Respond in a structured format."""
         ("human", "{input}")
     ])
 
-    llm = get_llm()
-
     chain = (
         {
-            "context": retriever | format_docs,
+            "context": retriever | pack_context | format_docs,
             "input": RunnablePassthrough(),
         }
         | prompt
@@ -294,12 +1275,14 @@ Respond in a structured format."""
     return chain
 
 
-def get_summary_chain(vector_store: PGVector):
+@_cached_chain("summary", temperature=0.1)
+def get_summary_chain(vector_store: PGVector, llm: ChatOpenAI):
     """
     Build chain for generating executive summaries of legal documents.
 
     Args:
         vector_store: PGVector store containing document chunks
+        llm: Shared chat model (injected by the chain cache)
 
     Returns:
         A retrieval chain for document summarization
@@ -329,11 +1312,9 @@ Context from the document:
         ("human", "{input}")
     ])
 
-    llm = get_llm(temperature=0.1)
-
     chain = (
         {
-            "context": retriever | format_docs,
+            "context": retriever | pack_context | format_docs,
             "input": RunnablePassthrough(),
         }
         | prompt
@@ -351,12 +1332,349 @@ def delete_document_vectors(document_id: int):
     Args:
         document_id: The document's database ID
     """
+    collection_name = f"document_{document_id}"
     try:
-        collection_name = f"document_{document_id}"
         vector_store = get_vector_store(collection_name=collection_name)
         vector_store.delete_collection()
     except Exception:
         pass  # Collection may not exist
+    finally:
+        evict_vector_store(collection_name)
+        get_chain_cache().invalidate(collection_name)
+
+
+def chunk_vector_id(collection_name: str, key) -> str:
+    """
+    Deterministic vector id for a chunk of a collection.
+
+    `key` identifies the chunk within the collection: its chunk_index for
+    documents, its content hash for laws (so ids survive reseeding).
+    Re-writing the same chunk (e.g. a retried ingestion) upserts in place.
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{collection_name}/{key}"))
+
+
+# Chunk table holding the text of a vector, by the metadata key its collection sets
+CHUNK_TABLES = {
+    "document_id": DocumentChunk._meta.db_table,
+    "law_slug": EgyptianLawChunk._meta.db_table,
+}
+
+
+def hydrate_chunk_text(docs) -> None:
+    """
+    Load the text of retrieved vectors stored without it (see
+    VECTOR_STORE_CHUNK_TEXT) from their chunk rows, by the "chunk_id"
+    metadata key. Documents that already carry their text are untouched.
+    """
+    missing = {}
+    for doc in docs:
+        if doc.page_content or "chunk_id" not in doc.metadata:
+            continue
+        for key, table in CHUNK_TABLES.items():
+            if key in doc.metadata:
+                missing.setdefault(table, []).append(doc)
+                break
+    if not missing:
+        return
+
+    with get_engine().connect() as conn:
+        for table, table_docs in missing.items():
+            rows = conn.execute(
+                text(f"SELECT id, content FROM {table} WHERE id = ANY(:ids)"),
+                {"ids": [int(doc.metadata["chunk_id"]) for doc in table_docs]},
+            )
+            content = dict(rows.all())
+            for doc in table_docs:
+                doc.page_content = content.get(int(doc.metadata["chunk_id"]), "")
+
+
+def drop_vector_text() -> int:
+    """
+    Empty the text column of vectors whose text is also stored in a chunk
+    row (they carry "chunk_id"); searches hydrate it from the row instead.
+
+    Returns:
+        Number of vectors updated
+    """
+    with get_engine().begin() as conn:
+        result = conn.execute(text("""
+            UPDATE langchain_pg_embedding
+            SET document = ''
+            WHERE cmetadata ->> 'chunk_id' IS NOT NULL AND document <> ''
+        """))
+    return result.rowcount
+
+
+def restore_vector_text() -> int:
+    """
+    Copy chunk text back into the vectors stored without it.
+
+    Returns:
+        Number of vectors updated
+    """
+    updated = 0
+    with get_engine().begin() as conn:
+        for key, table in CHUNK_TABLES.items():
+            result = conn.execute(text(f"""
+                UPDATE langchain_pg_embedding e
+                SET document = c.content
+                FROM {table} c
+                WHERE e.cmetadata ->> '{key}' IS NOT NULL
+                  AND (e.cmetadata ->> 'chunk_id')::bigint = c.id
+                  AND e.document = ''
+            """))
+            updated += result.rowcount
+    return updated
+
+
+@contextmanager
+def vector_index_connection():
+    """
+    Autocommit connection (CONCURRENTLY cannot run in a transaction) holding
+    the vector index advisory lock, so concurrent `vector_index` runs and
+    startup seeding never drop or rebuild an index another one is building.
+    """
+    with get_engine().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": VECTOR_INDEX_LOCK_KEY})
+        try:
+            yield conn
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": VECTOR_INDEX_LOCK_KEY})
+
+
+def create_vector_indexes(m: int, ef_construction: int, rebuild: bool = False):
+    """
+    Create the HNSW index (cosine, on the halfvec cast of the embedding),
+    the collection index used by small collections and the metadata scope
+    indexes of the unified corpus collections. Built CONCURRENTLY,
+    so searches and ingestion keep running meanwhile.
+
+    Args:
+        m: Max connections per HNSW graph node
+        ef_construction: Candidate list size while building the graph
+        rebuild: Drop and recreate the HNSW index (e.g. to change m)
+    """
+    # Creates the langchain tables if nothing was ingested yet
+    get_vector_store(collection_name="documind_documents")
+
+    with vector_index_connection() as conn:
+        # An interrupted concurrent build leaves an invalid index behind;
+        # rebuild it unless another session (e.g. a migration) is building it
+        invalid = conn.execute(
+            text("""
+                SELECT c.relname
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = ANY(:names)
+                  AND NOT i.indisvalid
+                  AND NOT EXISTS (
+                      SELECT 1 FROM pg_stat_progress_create_index p
+                      WHERE p.index_relid = i.indexrelid
+                  )
+            """),
+            {"names": [VECTOR_INDEX_NAME, VECTOR_COLLECTION_INDEX_NAME, *VECTOR_SCOPE_INDEX_NAMES.values()]},
+        ).scalars().all()
+        for name in invalid:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        conn.execute(text(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS {VECTOR_COLLECTION_INDEX_NAME}
+            ON langchain_pg_embedding (collection_id)
+        """))
+        # Metadata scopes of the unified corpus collections ($in filters compare text)
+        for key, name in VECTOR_SCOPE_INDEX_NAMES.items():
+            conn.execute(text(f"""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS {name}
+                ON langchain_pg_embedding (collection_id, (cmetadata ->> '{key}'))
+            """))
+        if rebuild:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {VECTOR_INDEX_NAME}"))
+        conn.execute(text(f"SET maintenance_work_mem = '{settings.VECTOR_INDEX_BUILD_MEMORY}'"))
+        conn.execute(text(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS {VECTOR_INDEX_NAME}
+            ON langchain_pg_embedding
+            USING hnsw ((embedding::halfvec({EMBEDDING_DIMENSIONS})) halfvec_cosine_ops)
+            WITH (m = {int(m)}, ef_construction = {int(ef_construction)})
+        """))
+
+
+def reindex_vector_index():
+    """Rebuild the HNSW index in place, e.g. after many deletes or a failed build."""
+    with vector_index_connection() as conn:
+        conn.execute(text(f"SET maintenance_work_mem = '{settings.VECTOR_INDEX_BUILD_MEMORY}'"))
+        conn.execute(text(f"REINDEX INDEX CONCURRENTLY {VECTOR_INDEX_NAME}"))
+
+
+def drop_vector_indexes():
+    """Drop the HNSW and collection indexes."""
+    with vector_index_connection() as conn:
+        for name in (VECTOR_INDEX_NAME, VECTOR_COLLECTION_INDEX_NAME, *VECTOR_SCOPE_INDEX_NAMES.values()):
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+
+
+def vector_index_status() -> list[dict]:
+    """Definition, size and validity of the vector table indexes."""
+    with get_engine().connect() as conn:
+        rows = conn.execute(
+            text("""
+                SELECT c.relname AS name,
+                       pg_get_indexdef(c.oid) AS definition,
+                       pg_size_pretty(pg_relation_size(c.oid)) AS size,
+                       i.indisvalid AS valid
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = ANY(:names)
+            """),
+            {"names": [VECTOR_INDEX_NAME, VECTOR_COLLECTION_INDEX_NAME, *VECTOR_SCOPE_INDEX_NAMES.values()]},
+        )
+        return [dict(row._mapping) for row in rows]
+
+
+def vector_table_size() -> str:
+    """Total on-disk size of the vector table, indexes included."""
+    with get_engine().connect() as conn:
+        return conn.execute(
+            text("SELECT pg_size_pretty(pg_total_relation_size('langchain_pg_embedding'))")
+        ).scalar()
+
+
+def stored_vector_dimensions() -> list[int]:
+    """Distinct dimensions of the stored vectors."""
+    with get_engine().connect() as conn:
+        rows = conn.execute(
+            text("SELECT DISTINCT vector_dims(embedding) FROM langchain_pg_embedding")
+        )
+        return sorted(row[0] for row in rows)
+
+
+def reproject_vectors(dimensions: int, batch_size: int) -> int:
+    """
+    Shorten up to `batch_size` stored vectors to `dimensions`.
+
+    text-embedding-3 embeddings can be shortened by keeping their first
+    dimensions and re-normalizing; this matches what the API returns for
+    the `dimensions` parameter, so no text is re-embedded. Vectors that
+    already have `dimensions` or fewer are left alone, so callers repeat
+    until 0 is returned (and can resume after an interruption).
+
+    Returns:
+        Number of vectors updated
+    """
+    with get_engine().begin() as conn:
+        result = conn.execute(
+            text("""
+                UPDATE langchain_pg_embedding
+                SET embedding = l2_normalize(subvector(embedding, 1, :dimensions))
+                WHERE id IN (
+                    SELECT id FROM langchain_pg_embedding
+                    WHERE vector_dims(embedding) > :dimensions
+                    LIMIT :batch_size
+                )
+            """),
+            {"dimensions": dimensions, "batch_size": batch_size},
+        )
+    return result.rowcount
+
+
+def update_vector_metadata(updates: dict) -> int:
+    """
+    Merge new metadata into existing vectors without re-embedding them.
+
+    Args:
+        updates: {vector_id: {metadata key: value}}
+
+    Returns:
+        Number of vectors updated
+    """
+    if not updates:
+        return 0
+    with get_engine().begin() as conn:
+        result = conn.execute(
+            text("""
+                UPDATE langchain_pg_embedding e
+                SET cmetadata = e.cmetadata || CAST(u.metadata AS jsonb)
+                FROM unnest(CAST(:ids AS varchar[]), CAST(:metadata AS text[])) AS u(id, metadata)
+                WHERE e.id = u.id
+            """),
+            {
+                "ids": list(updates),
+                "metadata": [json.dumps(m) for m in updates.values()],
+            },
+        )
+    return result.rowcount
+
+
+def delete_chunk_vectors(collection_name: str, chunk_ids: list[int]) -> int:
+    """
+    Delete the vectors of a collection linked to the given chunk rows
+    (by their "chunk_id" metadata), e.g. vectors written for rows that
+    were never checkpointed.
+
+    Returns:
+        Number of vectors deleted
+    """
+    if not chunk_ids:
+        return 0
+    name, scope = corpus_collection(collection_name)
+    with get_engine().begin() as conn:
+        result = conn.execute(
+            text("""
+                DELETE FROM langchain_pg_embedding e
+                USING langchain_pg_collection c
+                WHERE e.collection_id = c.uuid AND c.name = :name
+                  AND e.cmetadata @> CAST(:scope AS jsonb)
+                  AND (e.cmetadata->>'chunk_id')::integer = ANY(CAST(:ids AS integer[]))
+            """),
+            {"name": name, "scope": json.dumps(scope), "ids": list(chunk_ids)},
+        )
+    return result.rowcount
+
+
+def copy_collection_vectors(
+    source_collection: str,
+    target_collection: str,
+    chunk_indexes: list[int],
+    metadata: dict = None,
+) -> int:
+    """
+    Copy the vectors of the given chunks from one collection into another
+    inside the database. No embedding API calls are made; `metadata` keys
+    override the copied metadata (e.g. the new document's id and title),
+    and copies get the target collection's deterministic chunk ids.
+
+    Returns:
+        Number of vectors copied
+    """
+    # Creates the target collection if needed
+    get_vector_store(collection_name=target_collection)
+    source_name, source_scope = corpus_collection(source_collection)
+    target_name, target_scope = corpus_collection(target_collection)
+
+    with get_engine().begin() as conn:
+        result = conn.execute(
+            text("""
+                INSERT INTO langchain_pg_embedding (id, collection_id, embedding, document, cmetadata)
+                SELECT m.id, target.uuid, e.embedding, e.document,
+                       e.cmetadata || CAST(:metadata AS jsonb)
+                FROM langchain_pg_embedding e
+                JOIN langchain_pg_collection source ON e.collection_id = source.uuid
+                JOIN unnest(CAST(:indexes AS integer[]), CAST(:ids AS varchar[])) AS m(chunk_index, id)
+                    ON (e.cmetadata->>'chunk_index')::integer = m.chunk_index
+                CROSS JOIN langchain_pg_collection target
+                WHERE source.name = :source AND target.name = :target
+                  AND e.cmetadata @> CAST(:source_scope AS jsonb)
+                ON CONFLICT (id) DO NOTHING
+            """),
+            {
+                "source": source_name,
+                "target": target_name,
+                "source_scope": json.dumps(source_scope),
+                "indexes": list(chunk_indexes),
+                "ids": [chunk_vector_id(target_collection, i) for i in chunk_indexes],
+                "metadata": json.dumps({**(metadata or {}), **target_scope}),
+            },
+        )
+    return result.rowcount
 
 
 def get_law_vector_store(law_slug: str) -> PGVector:
@@ -374,6 +1692,149 @@ def get_law_vector_store(law_slug: str) -> PGVector:
     return get_vector_store(collection_name=collection_name)
 
 
+# Logical collection prefix -> (corpus collection, scope metadata key)
+CORPORA = {
+    "law_": (LAW_CORPUS_COLLECTION, "law_slug"),
+    "document_": (DOCUMENT_CORPUS_COLLECTION, "document_id"),
+}
+
+
+def merge_into_corpus(prefix: str) -> int:
+    """
+    Move the vectors of every `<prefix><key>` collection into the shared
+    corpus collection, setting the scope metadata key from the collection
+    name, and drop the emptied collections.
+
+    Returns:
+        Number of vectors moved
+    """
+    corpus, key = CORPORA[prefix]
+    value = f"substr(c.name, {len(prefix) + 1})"
+    if key == "document_id":
+        value = f"CAST({value} AS integer)"
+    pattern = prefix.replace("_", "\\_") + "%"
+
+    with get_engine().begin() as conn:
+        conn.execute(
+            text("""
+                INSERT INTO langchain_pg_collection (uuid, name, cmetadata)
+                VALUES (gen_random_uuid(), :corpus, NULL)
+                ON CONFLICT (name) DO NOTHING
+            """),
+            {"corpus": corpus},
+        )
+        result = conn.execute(
+            text(f"""
+                UPDATE langchain_pg_embedding e
+                SET collection_id = corpus.uuid,
+                    cmetadata = e.cmetadata || jsonb_build_object(:key, {value})
+                FROM langchain_pg_collection c, langchain_pg_collection corpus
+                WHERE e.collection_id = c.uuid AND c.name LIKE :pattern
+                  AND corpus.name = :corpus
+            """),
+            {"key": key, "pattern": pattern, "corpus": corpus},
+        )
+        conn.execute(
+            text("""
+                DELETE FROM langchain_pg_collection c
+                WHERE c.name LIKE :pattern
+                  AND NOT EXISTS (SELECT 1 FROM langchain_pg_embedding e WHERE e.collection_id = c.uuid)
+            """),
+            {"pattern": pattern},
+        )
+    return result.rowcount
+
+
+def split_corpus(prefix: str) -> int:
+    """
+    Move the vectors of a shared corpus collection back into one
+    `<prefix><key>` collection per scope value.
+
+    Returns:
+        Number of vectors moved
+    """
+    corpus, key = CORPORA[prefix]
+    with get_engine().begin() as conn:
+        conn.execute(
+            text("""
+                INSERT INTO langchain_pg_collection (uuid, name, cmetadata)
+                SELECT gen_random_uuid(), :prefix || scopes.value, NULL
+                FROM (
+                    SELECT DISTINCT e.cmetadata ->> :key AS value
+                    FROM langchain_pg_embedding e
+                    JOIN langchain_pg_collection c ON e.collection_id = c.uuid
+                    WHERE c.name = :corpus
+                ) scopes
+                WHERE scopes.value IS NOT NULL
+                ON CONFLICT (name) DO NOTHING
+            """),
+            {"prefix": prefix, "key": key, "corpus": corpus},
+        )
+        result = conn.execute(
+            text("""
+                UPDATE langchain_pg_embedding e
+                SET collection_id = target.uuid
+                FROM langchain_pg_collection corpus, langchain_pg_collection target
+                WHERE e.collection_id = corpus.uuid AND corpus.name = :corpus
+                  AND target.name = :prefix || (e.cmetadata ->> :key)
+            """),
+            {"prefix": prefix, "key": key, "corpus": corpus},
+        )
+    return result.rowcount
+
+
+def search_law_corpus(embedding: list[float], law_slugs: list[str], k: int = RETRIEVAL_K):
+    """
+    One nearest-neighbour query over the chunks of several laws.
+
+    Filters the shared law corpus by "law_slug" in unified corpus mode, or
+    the laws' own collections otherwise, and orders by the HNSW index
+    expression so the search can use it.
+
+    Returns:
+        List of (Document, cosine distance), closest first
+    """
+    if not law_slugs:
+        return []
+    if settings.VECTOR_INDEX_ENABLED:
+        distance = (
+            f"CAST(e.embedding AS halfvec({EMBEDDING_DIMENSIONS})) "
+            f"<=> CAST(:embedding AS halfvec({EMBEDDING_DIMENSIONS}))"
+        )
+    else:
+        distance = "e.embedding <=> CAST(:embedding AS vector)"
+    if settings.VECTOR_CORPUS_MODE == "unified":
+        where = "c.name = :corpus AND e.cmetadata ->> 'law_slug' = ANY(:slugs)"
+    else:
+        where = "c.name = ANY(:collections)"
+
+    with get_engine().connect() as conn:
+        rows = conn.execute(
+            text(f"""
+                SELECT e.id, e.document, e.cmetadata, {distance} AS distance
+                FROM langchain_pg_embedding e
+                JOIN langchain_pg_collection c ON e.collection_id = c.uuid
+                WHERE {where}
+                ORDER BY distance
+                LIMIT :k
+            """),
+            {
+                "embedding": json.dumps(embedding),
+                "corpus": LAW_CORPUS_COLLECTION,
+                "slugs": list(law_slugs),
+                "collections": [f"law_{slug}" for slug in law_slugs],
+                "k": k,
+            },
+        ).all()
+
+    docs = [
+        LCDocument(id=row.id, page_content=row.document, metadata=row.cmetadata)
+        for row in rows
+    ]
+    hydrate_chunk_text(docs)
+    return [(doc, row.distance) for doc, row in zip(docs, rows)]
+
+
 def delete_law_vectors(law_slug: str):
     """
     Delete all vectors associated with a law.
@@ -381,13 +1842,19 @@ def delete_law_vectors(law_slug: str):
     Args:
         law_slug: The law's slug
     """
+    collection_name = f"law_{law_slug}"
     try:
-        collection_name = f"law_{law_slug}"
         vector_store = get_vector_store(collection_name=collection_name)
         vector_store.delete_collection()
     except Exception:
         pass  # Collection may not exist
-def get_arabic_summary_chain(vector_store: PGVector):
+    finally:
+        evict_vector_store(collection_name)
+        get_chain_cache().invalidate(collection_name)
+
+
+@_cached_chain("arabic_summary", temperature=0.3)
+def get_arabic_summary_chain(vector_store: PGVector, llm: ChatOpenAI):
     """Create a chain for summarizing Arabic legal documents."""
     # Use MMR for better diversity
     retriever = vector_store.as_retriever(
@@ -410,21 +1877,20 @@ def get_arabic_summary_chain(vector_store: PGVector):
     Summary in Arabic:
     """)
     
-    model = ChatOpenAI(model=CHAT_MODEL, temperature=0.3)
-    
     return (
         {
-            "context": (lambda x: x["input"]) | retriever | format_docs,
+            "context": (lambda x: x["input"]) | retriever | pack_context | format_docs,
             "title": lambda x: x["title"],
             "input": lambda x: x["input"]
         }
         | prompt
-        | model
+        | llm
         | StrOutputParser()
     )
 
 
-def get_arabic_clauses_chain(vector_store: PGVector):
+@_cached_chain("arabic_clauses", temperature=0.3)
+def get_arabic_clauses_chain(vector_store: PGVector, llm: ChatOpenAI):
     """Create a chain for analyzing Arabic legal clauses."""
     retriever = vector_store.as_retriever(
         search_type="mmr",
@@ -451,15 +1917,13 @@ def get_arabic_clauses_chain(vector_store: PGVector):
     Clause Analysis in Arabic:
     """)
     
-    model = ChatOpenAI(model=CHAT_MODEL, temperature=0.3)
-    
     return (
         {
-            "context": (lambda x: x["input"]) | retriever | format_docs,
+            "context": (lambda x: x["input"]) | retriever | pack_context | format_docs,
             "title": lambda x: x["title"],
             "input": lambda x: x["input"]
         }
         | prompt
-        | model
+        | llm
         | StrOutputParser()
     )
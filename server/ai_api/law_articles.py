@@ -0,0 +1,221 @@
+"""
+Article (مادة) index of the seeded Egyptian laws.
+
+parse_articles() splits a law's ordered chunks at article headers when the
+law is seeded; the resulting LawArticle rows let questions that only ask
+for an article's text ("نص المادة 52", "article 52") be answered by an
+indexed fetch, with no embedding, vector search or LLM call.
+"""
+import logging
+import re
+
+from .models import LawArticle
+from .text_normalization import normalize_search_text
+from .text_splitters import (
+    ARABIC_SECTION_HEADER, ARTICLE_HEADER, REFERENCE_WORDS, SECTION_TITLE_LENGTH, strip_overlap,
+)
+
+logger = logging.getLogger(__name__)
+
+ARABIC_DIGITS = str.maketrans("٠١٢٣٤٥٦٧٨٩", "0123456789")
+
+# Headers must increase by at most this much; anything else is a reference
+# to another article ("وفقا لأحكام المادة 12") rather than a new article
+MAX_ARTICLE_GAP = 5
+
+# A law's title or a باب / فصل heading before "مادة 1" marks the start of
+# the law body after its issuance articles (مواد الإصدار)
+LAW_BODY_HEADING = re.compile(r"(?<!\S)(?:ال)?قانون(?!\S)")
+
+# Questions that only ask for an article's text (normalize_search_text form)
+ARABIC_ARTICLE_QUERY = re.compile(
+    r"^(?:(?:ما|ماذا|اعرض|اذكر|اكتب|هات)\s+)?"
+    r"(?:(?:هو|هي|نص|تنص|تقول|عليه)\s+)*"
+    r"(?:ال)?ماده\s*\(?\s*(\d+)\s*\)?"
+    r"(?:\s+من\s+(.*))?$"
+)
+ENGLISH_ARTICLE_QUERY = re.compile(
+    r"^(?:(?:what|show|give|display)\s+(?:me\s+)?(?:is\s+|does\s+|says\s+)?)?"
+    r"(?:the\s+)?(?:text\s+of\s+)?(?:the\s+)?"
+    r"article\s*\(?(\d+)\)?"
+    r"(?:\s+(?:say|says|state|states|provide|provides))?"
+    r"(?:\s+of\s+(.*?))?"
+    r"(?:\s+(?:say|says|state|states|provide|provides))?$"
+)
+
+# Words of a law name that do not tell laws apart ("من هذا القانون",
+# "of the law"), in normalize_search_text form
+GENERIC_LAW_WORDS = {"هذا", "هذه", "قانون", "this", "the", "law", "code"}
+
+
+def starts_law_body(text: str) -> bool:
+    """True if text since the last article header contains a law or section heading."""
+    headers = list(ARTICLE_HEADER.finditer(text))
+    since = text[headers[-1].end():] if headers else text
+    return bool(LAW_BODY_HEADING.search(since) or ARABIC_SECTION_HEADER.search(since))
+
+
+def parse_articles(chunks) -> list[dict]:
+    """
+    Split a law's chunks into articles.
+
+    Numbering restarting at 1 after a law or section heading is the law body
+    following its issuance articles; the body replaces them, as both number
+    from 1 and lookups mean the body's articles.
+
+    Args:
+        chunks: (chunk_id, page_number, content) tuples in chunk order
+
+    Returns:
+        List of {"number", "start_page", "end_page", "chunk_ids", "content"}
+    """
+    articles = []
+    current = None
+    previous = ""
+
+    def add(text, chunk_id, page):
+        if not text.strip():
+            return
+        current["parts"].append(text.strip())
+        if chunk_id not in current["chunk_ids"]:
+            current["chunk_ids"].append(chunk_id)
+        current["end_page"] = page
+
+    for chunk_id, page, content in chunks:
+        # Headers inside the prefix repeated from the previous chunk were
+        # seen there; a header may still start in it and end after it
+        overlap = len(content) - len(strip_overlap(previous, content))
+        context = previous[-SECTION_TITLE_LENGTH:]
+        previous = content
+        position = overlap
+        for match in ARTICLE_HEADER.finditer(content):
+            if match.end() <= overlap:
+                continue
+            number = int(match.group(1).translate(ARABIC_DIGITS))
+            last = current["number"] if current else 0
+            preceding_text = f"{context} {content[:match.start()]}"
+            preceding = preceding_text.split()[-1:]
+            if preceding and normalize_search_text(preceding[0]) in REFERENCE_WORDS:
+                continue
+            restart = (
+                number == 1 and last > 1
+                and starts_law_body(preceding_text[-SECTION_TITLE_LENGTH:])
+            )
+            if not (last < number <= last + MAX_ARTICLE_GAP or restart):
+                logger.debug(
+                    "Skipped out-of-sequence header for article %s after article %s (page %s)",
+                    number, last, page,
+                )
+                continue
+            if current:
+                if match.start() < overlap:
+                    # The start of the header already ended the previous chunk's text
+                    straddle = content[match.start():overlap].strip()
+                    if current["parts"] and current["parts"][-1].endswith(straddle):
+                        current["parts"][-1] = current["parts"][-1][:-len(straddle)].strip()
+                else:
+                    add(content[position:match.start()], chunk_id, page)
+                articles.append(current)
+            if restart:
+                logger.info(
+                    "Article numbering restarts at page %s; dropped %d issuance articles",
+                    page, len(articles),
+                )
+                articles = []
+            current = {
+                "number": number,
+                "start_page": page,
+                "end_page": page,
+                "chunk_ids": [],
+                "parts": [],
+            }
+            position = match.start()
+        if current:
+            add(content[position:], chunk_id, page)
+    if current:
+        articles.append(current)
+
+    for article in articles:
+        article["content"] = " ".join(part for part in article.pop("parts") if part)
+    return articles
+
+
+def rebuild_law_articles(law) -> int:
+    """
+    Replace a law's article index with one parsed from its stored chunks.
+
+    Returns:
+        Number of articles found
+    """
+    chunks = law.chunks.order_by("chunk_index").values_list("id", "page_number", "content")
+    articles = parse_articles(chunks.iterator())
+    LawArticle.objects.filter(law=law).delete()
+    LawArticle.objects.bulk_create(
+        [LawArticle(law=law, **article) for article in articles],
+        batch_size=500,
+    )
+    return len(articles)
+
+
+def article_query(query: str):
+    """
+    Article lookup asked by a question, if that is all it asks.
+
+    Returns:
+        (article number, language "ar" / "en", law name or None), or None
+    """
+    text = normalize_search_text(query).strip(" ?؟.!:")
+    for language, pattern in (("ar", ARABIC_ARTICLE_QUERY), ("en", ENGLISH_ARTICLE_QUERY)):
+        match = pattern.match(text)
+        if match:
+            return int(match.group(1)), language, match.group(2)
+    return None
+
+
+def law_name_words(text: str) -> set[str]:
+    """Distinguishing words of a law name, Arabic words without their ال."""
+    words = set()
+    for word in re.findall(r"[^\W_]+", normalize_search_text(text)):
+        if word.startswith("ال") and len(word) > 3:
+            word = word[2:]
+        if word not in GENERIC_LAW_WORDS:
+            words.add(word)
+    return words
+
+
+def names_law(name: str, law) -> bool:
+    """True if a law name asked for ("قانون العمل", "this law") refers to `law`."""
+    title_words = law_name_words(f"{law.title_ar} {law.title_en}")
+    return law_name_words(name) <= title_words
+
+
+async def alookup_article_answer(law, query: str):
+    """
+    Answer a pure article lookup from the article index.
+
+    Returns:
+        (answer, sources) or None when the query is not a lookup, names
+        another law, or the article is not indexed
+    """
+    lookup = article_query(query)
+    if lookup is None:
+        return None
+    number, language, name = lookup
+    if name and not names_law(name, law):
+        return None
+    article = await LawArticle.objects.filter(law=law, number=number).afirst()
+    if article is None:
+        return None
+
+    if language == "ar":
+        heading = f"المادة {number} من {law.title_ar}"
+    else:
+        heading = f"Article {number} of {law.title_en} (original Arabic text)"
+    sources = [{
+        "chunk_id": article.chunk_ids[0] if article.chunk_ids else None,
+        "content": article.content[:200] + "...",
+        "page": article.start_page or "N/A",
+        "end_page": article.end_page or article.start_page or "N/A",
+        "chunk_index": "N/A",
+    }]
+    return f"{heading}:\n\n{article.content}", sources
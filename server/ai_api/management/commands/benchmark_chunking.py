@@ -0,0 +1,131 @@
+"""
+Management command to compare the legal-structure splitter with the
+previous fixed-size character splitter on the seeded law PDFs.
+
+For each law it reports, per splitter: chunk count, embedded tokens and
+their cost, the share of tokens that only repeat overlap, and the share of
+chunks that start at an article / chapter header (the rest start
+mid-article). With --retrieval, both chunk sets are embedded (through the
+embedding cache, so re-runs are cheap) and scored by hit rate@k on
+sentences sampled from the law: a hit is a chunk containing the middle of
+the sentence within the top k.
+"""
+import random
+import re
+import statistics
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ai_api.ingestion import count_tokens, iter_pdf_pages
+from ai_api.langchain_config import get_character_splitter, get_embeddings, get_text_splitter
+from ai_api.management.commands.seed_egyptian_laws import EGYPTIAN_LAWS, law_pdf_chunks
+from ai_api.text_normalization import normalize_arabic
+from ai_api.text_splitters import ARABIC_ARTICLE_HEADER, ARABIC_SECTION_HEADER
+
+EMBEDDING_PRICE_PER_MILLION = 0.13  # USD, text-embedding-3-large
+QUERY_WINDOW = 6  # Words from the middle of a sampled sentence a relevant chunk must contain
+
+
+class Command(BaseCommand):
+    help = "Compare chunk count, embedding cost and hit rate of the text splitters"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--law", type=str, help="Benchmark a single law by slug")
+        parser.add_argument("--retrieval", action="store_true",
+                            help="Also embed both chunk sets and measure retrieval hit rate")
+        parser.add_argument("--queries", type=int, default=50, help="Sampled sentences per law")
+        parser.add_argument("--k", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        laws = EGYPTIAN_LAWS
+        if options.get("law"):
+            laws = [law for law in laws if law["slug"] == options["law"]]
+        laws = [law for law in laws if (settings.EGYPTIAN_LAWS_DIR / law["file_name"]).exists()]
+        if not laws:
+            raise CommandError("No law PDFs found")
+
+        splitters = {"character": get_character_splitter(), "legal": get_text_splitter()}
+        rng = random.Random(options["seed"])
+        totals = {name: {"chunks": 0, "tokens": 0} for name in splitters}
+        hit_rates = {name: [] for name in splitters}
+
+        self.stdout.write(
+            f"{'law':>16} {'splitter':>9} {'chunks':>7} {'tokens':>9} {'cost $':>7} "
+            f"{'overlap':>8} {'at header':>9} {'hit@' + str(options['k']):>7}"
+        )
+        for law in laws:
+            pdf_path = settings.EGYPTIAN_LAWS_DIR / law["file_name"]
+            chunk_sets = {
+                name: [chunk.page_content for chunk in law_pdf_chunks(pdf_path, splitter)]
+                for name, splitter in splitters.items()
+            }
+            # Tokens of the text itself; anything above it is repeated overlap
+            source_tokens = sum(
+                count_tokens(normalize_arabic(page.page_content.replace("\x00", "")))
+                for page in iter_pdf_pages(pdf_path, engine="pypdf")
+            )
+            queries = self.sample_queries(chunk_sets["legal"], options["queries"], rng)
+
+            for name, chunks in chunk_sets.items():
+                tokens = sum(count_tokens(chunk) for chunk in chunks)
+                at_header = sum(
+                    1 for chunk in chunks
+                    if ARABIC_ARTICLE_HEADER.match(chunk) or ARABIC_SECTION_HEADER.match(chunk)
+                )
+                hit_rate = "-"
+                if options["retrieval"] and queries:
+                    rate = self.hit_rate(chunks, queries, options["k"])
+                    hit_rates[name].append(rate)
+                    hit_rate = f"{rate:.3f}"
+                totals[name]["chunks"] += len(chunks)
+                totals[name]["tokens"] += tokens
+                self.stdout.write(
+                    f"{law['slug']:>16} {name:>9} {len(chunks):>7} {tokens:>9} "
+                    f"{tokens * EMBEDDING_PRICE_PER_MILLION / 1e6:>7.4f} "
+                    f"{max(0, tokens - source_tokens) / tokens:>8.1%} "
+                    f"{at_header / len(chunks):>9.1%} {hit_rate:>7}"
+                )
+
+        self.stdout.write("")
+        for name, total in totals.items():
+            hit_rate = f", hit@{options['k']} {statistics.mean(hit_rates[name]):.3f}" if hit_rates[name] else ""
+            self.stdout.write(
+                f"{name}: {total['chunks']} chunks, {total['tokens']} tokens "
+                f"(${total['tokens'] * EMBEDDING_PRICE_PER_MILLION / 1e6:.4f}){hit_rate}"
+            )
+
+    @staticmethod
+    def sample_queries(chunks, count, rng):
+        """(sentence, middle window) pairs sampled from the law text."""
+        sentences = [
+            sentence.strip()
+            for chunk in chunks
+            for sentence in re.split(r"[.؛]\s", chunk)
+            if 10 <= len(sentence.split()) <= 40
+        ]
+        queries = []
+        for sentence in rng.sample(sentences, min(count, len(sentences))):
+            words = sentence.split()
+            middle = (len(words) - QUERY_WINDOW) // 2
+            queries.append((sentence, " ".join(words[middle:middle + QUERY_WINDOW])))
+        return queries
+
+    @staticmethod
+    def hit_rate(chunks, queries, k):
+        """Share of queries with a chunk containing their window in the top k."""
+        embeddings = get_embeddings()
+        chunk_vectors = np.array(embeddings.embed_documents(chunks), dtype=np.float32)
+        query_vectors = np.array(
+            embeddings.embed_documents([sentence for sentence, _ in queries]), dtype=np.float32
+        )
+        chunk_vectors /= np.linalg.norm(chunk_vectors, axis=1, keepdims=True)
+        query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+        top = np.argsort(-(query_vectors @ chunk_vectors.T), axis=1)[:, :k]
+        hits = [
+            any(window in chunks[i] for i in row)
+            for row, (_, window) in zip(top, queries)
+        ]
+        return sum(hits) / len(hits)
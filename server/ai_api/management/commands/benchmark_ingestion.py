@@ -0,0 +1,116 @@
+"""
+Management command to compare peak memory of eager vs streaming PDF ingestion.
+
+Runs extraction -> split -> embedding batches without calling the
+embedding API, once with the whole document loaded up front (the old
+PyMuPDFLoader(...).load() path) and once through the generator pipeline.
+Each mode runs in a fresh process so peak RSS is measured in isolation.
+"""
+import multiprocessing
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+
+def _peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_mode(mode, pdf_path, results):
+    """Process the PDF in one mode and report counts, time and peak RSS."""
+    import django
+
+    django.setup()  # spawned process: the pipeline imports the app's models
+    from langchain_community.document_loaders import PyMuPDFLoader
+
+    from ai_api.ingestion import iter_chunks, iter_pdf_pages, token_batches
+    from ai_api.langchain_config import get_text_splitter
+
+    baseline = _peak_rss_mb()
+    started = time.monotonic()
+    splitter = get_text_splitter()
+
+    if mode == "eager":
+        pages = PyMuPDFLoader(pdf_path).load()
+        chunks = splitter.split_documents(pages)
+        batches = list(token_batches(chunks))
+        page_count, chunk_count, batch_count = len(pages), len(chunks), len(batches)
+    else:
+        page_count = chunk_count = batch_count = 0
+
+        def pages():
+            nonlocal page_count
+            for page in iter_pdf_pages(pdf_path):
+                page_count += 1
+                yield page
+
+        for batch in token_batches(iter_chunks(pages(), splitter)):
+            chunk_count += len(batch)
+            batch_count += 1
+
+    results.put({
+        "mode": mode,
+        "pages": page_count,
+        "chunks": chunk_count,
+        "batches": batch_count,
+        "seconds": round(time.monotonic() - started, 2),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "delta_mb": round(_peak_rss_mb() - baseline, 1),
+    })
+
+
+class Command(BaseCommand):
+    help = "Benchmark peak RSS of eager vs streaming PDF ingestion"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pdf",
+            type=str,
+            help="PDF to ingest (default: generate a synthetic fixture)",
+        )
+        parser.add_argument(
+            "--pages",
+            type=int,
+            default=2000,
+            help="Pages in the generated fixture PDF",
+        )
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmp:
+            pdf_path = options.get("pdf")
+            if not pdf_path:
+                pdf_path = str(Path(tmp) / "fixture.pdf")
+                self.stdout.write(f"Generating {options['pages']}-page fixture PDF...")
+                self.make_fixture(pdf_path, options["pages"])
+
+            context = multiprocessing.get_context("spawn")
+            results = context.Queue()
+            for mode in ("eager", "streaming"):
+                process = context.Process(target=_run_mode, args=(mode, pdf_path, results))
+                process.start()
+                result = results.get()
+                process.join()
+                self.stdout.write(
+                    f"{result['mode']:>10}: {result['pages']} pages, {result['chunks']} chunks, "
+                    f"{result['batches']} batches in {result['seconds']}s | "
+                    f"peak RSS {result['peak_rss_mb']} MB (+{result['delta_mb']} MB)"
+                )
+
+    def make_fixture(self, path, pages):
+        """Write a text-heavy PDF of the given page count."""
+        import pymupdf
+
+        paragraph = (
+            "Article {n}. The employer shall give the worker written notice of "
+            "termination no less than thirty days in advance, stating the reasons. "
+        )
+        pdf = pymupdf.open()
+        for n in range(pages):
+            page = pdf.new_page()
+            page.insert_textbox(page.rect + (36, 36, -36, -36), paragraph.format(n=n) * 30, fontsize=8)
+        pdf.save(path)
+        pdf.close()
@@ -0,0 +1,123 @@
+"""
+Management command to compare dense, MMR and hybrid retrieval on the seeded laws.
+
+Queries are generated from the law text itself, so no labelled set is
+needed:
+- article lookups ("المادة 52"), answered by the chunks citing that article
+- exact phrases (a few consecutive words of a chunk), answered by that chunk
+
+Each retriever is scored by hit rate@k (a relevant chunk is in the top k)
+and search latency. Query embeddings are computed once up front, so the
+latencies exclude the embedding API.
+"""
+import random
+import re
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ai_api.models import EgyptianLaw
+from ai_api.text_normalization import normalize_search_text
+from ai_api.langchain_config import (
+    RETRIEVAL_K,
+    get_embeddings,
+    get_law_vector_store,
+    hybrid_retriever,
+    query_retriever,
+)
+
+ARTICLE_PATTERN = re.compile(r"ماده\s*\(?\s*(\d+)\s*\)?")
+PHRASE_WORDS = 5
+
+
+class Command(BaseCommand):
+    help = "Benchmark hit rate and latency of dense, MMR and hybrid retrieval"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--law", type=str, help="Benchmark a single law by slug")
+        parser.add_argument("--queries", type=int, default=30,
+                            help="Queries of each kind per law")
+        parser.add_argument("--k", type=str, default=f"5,8,{RETRIEVAL_K}",
+                            help="Comma-separated result counts")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        ks = sorted(int(k) for k in options["k"].split(","))
+        rng = random.Random(options["seed"])
+
+        laws = EgyptianLaw.objects.filter(status="ready")
+        if options.get("law"):
+            laws = laws.filter(slug=options["law"])
+        if not laws:
+            raise CommandError("No ready laws")
+
+        # (method, kind, k) -> hits / latencies
+        hits, latencies = {}, {}
+        for law in laws:
+            cases = self.build_cases(law, options["queries"], rng)
+            if not cases:
+                self.stdout.write(f"{law.slug}: no usable chunks, skipped")
+                continue
+            self.stdout.write(f"{law.slug}: {len(cases)} queries")
+            vector_store = get_law_vector_store(law.slug)
+            embeddings = get_embeddings().embed_documents([query for _, query, _ in cases])
+
+            for k in ks:
+                retrievers = {
+                    "dense": query_retriever(vector_store, k=k),
+                    "mmr": query_retriever(
+                        vector_store, search_type="mmr", k=k, fetch_k=max(30, k), lambda_mult=0.7
+                    ),
+                    "hybrid": hybrid_retriever(vector_store, k=k),
+                }
+                for method, retriever in retrievers.items():
+                    for (kind, query, relevant), embedding in zip(cases, embeddings):
+                        started = time.perf_counter()
+                        docs = retriever.invoke({"input": query, "embedding": embedding})
+                        elapsed = (time.perf_counter() - started) * 1000
+                        found = {doc.metadata.get("chunk_id") for doc in docs}
+                        hits.setdefault((method, kind, k), []).append(bool(found & relevant))
+                        latencies.setdefault((method, k), []).append(elapsed)
+
+        if not hits:
+            raise CommandError("No queries could be generated")
+
+        self.stdout.write(
+            f"\n{'method':>7} {'k':>3} {'article hit':>11} {'phrase hit':>10} "
+            f"{'p50 ms':>7} {'p95 ms':>7}"
+        )
+        for k in ks:
+            for method in ("dense", "mmr", "hybrid"):
+                timings = sorted(latencies[(method, k)])
+                self.stdout.write(
+                    f"{method:>7} {k:>3} "
+                    f"{self.rate(hits.get((method, 'article', k))):>11} "
+                    f"{self.rate(hits.get((method, 'phrase', k))):>10} "
+                    f"{statistics.median(timings):>7.1f} "
+                    f"{timings[max(0, int(len(timings) * 0.95) - 1)]:>7.1f}"
+                )
+
+    def build_cases(self, law, count, rng):
+        """(kind, query, relevant chunk ids) tuples generated from a law's chunks."""
+        chunks = list(law.chunks.values_list("id", "content"))
+        articles = {}
+        for chunk_id, content in chunks:
+            for number in ARTICLE_PATTERN.findall(normalize_search_text(content)):
+                articles.setdefault(number, set()).add(chunk_id)
+
+        cases = [
+            ("article", f"المادة {number}", articles[number])
+            for number in rng.sample(sorted(articles), min(count, len(articles)))
+        ]
+        for chunk_id, content in rng.sample(chunks, min(count, len(chunks))):
+            words = content.split()
+            if len(words) < PHRASE_WORDS * 2:
+                continue
+            start = rng.randrange(len(words) - PHRASE_WORDS)
+            cases.append(("phrase", " ".join(words[start:start + PHRASE_WORDS]), {chunk_id}))
+        return cases
+
+    @staticmethod
+    def rate(values):
+        return f"{sum(values) / len(values):.3f}" if values else "-"
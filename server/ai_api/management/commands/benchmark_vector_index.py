@@ -0,0 +1,173 @@
+"""
+Management command to benchmark HNSW search against exact scans.
+
+Loads synthetic clustered embeddings into a scratch table in the vector
+database, growing it through each requested size (10k / 100k / 1M rows by
+default). At each size it builds the same halfvec HNSW index as
+`manage.py vector_index` and reports, per ef_search, the recall@k against
+an exact full-precision scan and the latency of both.
+
+1M rows at 3072 dimensions is ~12 GB of table plus ~6 GB of index; use
+--dimensions or --sizes to scale the run down.
+"""
+import statistics
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from pgvector.psycopg import register_vector
+from sqlalchemy import text
+
+from ai_api.langchain_config import EMBEDDING_DIMENSIONS, get_engine
+
+TABLE = "vector_index_benchmark"
+LOAD_BATCH = 10_000
+
+
+def _vector_literal(vector):
+    return "[" + ",".join(f"{x:.6f}" for x in vector) + "]"
+
+
+class Command(BaseCommand):
+    help = "Benchmark recall and latency of the HNSW index vs exact search"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=str, default="10000,100000,1000000",
+                            help="Comma-separated row counts")
+        parser.add_argument("--dimensions", type=int, default=EMBEDDING_DIMENSIONS)
+        parser.add_argument("--queries", type=int, default=50)
+        parser.add_argument("--k", type=int, default=15)
+        parser.add_argument("--ef-search", type=str, default="40,100,200",
+                            help="Comma-separated hnsw.ef_search values")
+        parser.add_argument("--m", type=int, default=settings.VECTOR_INDEX_M)
+        parser.add_argument("--ef-construction", type=int,
+                            default=settings.VECTOR_INDEX_EF_CONSTRUCTION)
+        parser.add_argument("--collections", type=int, default=1,
+                            help="Spread rows over N collections and filter searches by one")
+        parser.add_argument("--keep", action="store_true",
+                            help="Keep the scratch table afterwards")
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(s) for s in options["sizes"].split(","))
+        ef_searches = [int(s) for s in options["ef_search"].split(",")]
+        self.dimensions = options["dimensions"]
+        self.collections = max(1, options["collections"])
+        self.rng = np.random.default_rng(42)
+        self.centroids = self.rng.standard_normal((256, self.dimensions)).astype(np.float32)
+
+        engine = get_engine()
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+            conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+            conn.execute(text(
+                f"CREATE TABLE {TABLE} (id bigint PRIMARY KEY, collection integer, "
+                f"embedding vector({self.dimensions}))"
+            ))
+            conn.execute(text(f"CREATE INDEX ON {TABLE} (collection)"))
+
+            queries = self.sample_vectors(options["queries"])
+            loaded = 0
+            try:
+                for size in sizes:
+                    self.stdout.write(f"\n{size} rows ({self.dimensions} dimensions)")
+                    self.load(engine, loaded, size)
+                    loaded = size
+                    conn.execute(text(f"ANALYZE {TABLE}"))
+
+                    exact, exact_ms = self.search_all(conn, queries, options["k"], exact=True)
+                    self.stdout.write(f"  exact scan: p50 {self.p50(exact_ms)} ms, p95 {self.p95(exact_ms)} ms")
+
+                    build_seconds, index_size = self.build_index(
+                        conn, options["m"], options["ef_construction"]
+                    )
+                    self.stdout.write(
+                        f"  HNSW build (m={options['m']}, ef_construction={options['ef_construction']}): "
+                        f"{build_seconds:.1f}s, {index_size}"
+                    )
+
+                    for ef_search in ef_searches:
+                        conn.execute(text(f"SET hnsw.ef_search = {ef_search}"))
+                        found, ann_ms = self.search_all(conn, queries, options["k"], exact=False)
+                        recall = statistics.mean(
+                            len(set(a) & set(e)) / len(e) for a, e in zip(found, exact) if e
+                        )
+                        self.stdout.write(
+                            f"  HNSW ef_search={ef_search}: recall@{options['k']} {recall:.3f}, "
+                            f"p50 {self.p50(ann_ms)} ms, p95 {self.p95(ann_ms)} ms"
+                        )
+            finally:
+                if not options["keep"]:
+                    conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+
+    def sample_vectors(self, count):
+        """Clustered, normalized vectors (rough stand-in for text embeddings)."""
+        picks = self.rng.integers(0, len(self.centroids), count)
+        vectors = self.centroids[picks] + 0.5 * self.rng.standard_normal(
+            (count, self.dimensions)
+        ).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def load(self, engine, start, end):
+        """COPY rows [start, end) in binary batches."""
+        started = time.monotonic()
+        raw = engine.raw_connection()
+        try:
+            register_vector(raw.driver_connection)
+            with raw.cursor() as cursor:
+                for batch_start in range(start, end, LOAD_BATCH):
+                    batch_end = min(batch_start + LOAD_BATCH, end)
+                    vectors = self.sample_vectors(batch_end - batch_start)
+                    with cursor.copy(
+                        f"COPY {TABLE} (id, collection, embedding) FROM STDIN WITH (FORMAT BINARY)"
+                    ) as copy:
+                        copy.set_types(["int8", "int4", "vector"])
+                        for offset, vector in enumerate(vectors):
+                            row_id = batch_start + offset
+                            copy.write_row((row_id, row_id % self.collections, vector))
+            raw.commit()
+        finally:
+            raw.close()
+        self.stdout.write(f"  loaded {end - start} rows in {time.monotonic() - started:.1f}s")
+
+    def build_index(self, conn, m, ef_construction):
+        conn.execute(text(f"DROP INDEX IF EXISTS {TABLE}_hnsw_idx"))
+        conn.execute(text(f"SET maintenance_work_mem = '{settings.VECTOR_INDEX_BUILD_MEMORY}'"))
+        started = time.monotonic()
+        conn.execute(text(f"""
+            CREATE INDEX {TABLE}_hnsw_idx ON {TABLE}
+            USING hnsw ((embedding::halfvec({self.dimensions})) halfvec_cosine_ops)
+            WITH (m = {m}, ef_construction = {ef_construction})
+        """))
+        seconds = time.monotonic() - started
+        size = conn.execute(
+            text(f"SELECT pg_size_pretty(pg_relation_size('{TABLE}_hnsw_idx'))")
+        ).scalar()
+        return seconds, size
+
+    def search_all(self, conn, queries, k, exact):
+        """Run every query; return the result ids and latencies (ms)."""
+        if exact:
+            # Full-precision distances, no index (what searches did before)
+            order = "embedding <=> CAST(:q AS vector)"
+        else:
+            order = f"embedding::halfvec({self.dimensions}) <=> CAST(:q AS halfvec({self.dimensions}))"
+        where = "WHERE collection = :collection" if self.collections > 1 else ""
+        sql = text(f"SELECT id FROM {TABLE} {where} ORDER BY {order} LIMIT :k")
+
+        results, latencies = [], []
+        for n, query in enumerate(queries):
+            params = {"q": _vector_literal(query), "k": k, "collection": n % self.collections}
+            started = time.perf_counter()
+            ids = conn.execute(sql, params).scalars().all()
+            latencies.append((time.perf_counter() - started) * 1000)
+            results.append(ids)
+        return results, latencies
+
+    @staticmethod
+    def p50(values):
+        return round(statistics.median(values), 2)
+
+    @staticmethod
+    def p95(values):
+        return round(sorted(values)[max(0, int(len(values) * 0.95) - 1)], 2)
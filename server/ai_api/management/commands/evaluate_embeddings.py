@@ -0,0 +1,153 @@
+"""
+Management command to compare embedding sizes on the seeded Egyptian laws.
+
+For each ready law, the stored vectors are loaded and shortened in memory
+to each candidate size (keep the leading dimensions, re-normalize, as the
+API's `dimensions` parameter does), optionally at half precision (the
+halfvec HNSW index). Each configuration is scored by recall@k against the
+full-size float32 ranking for a set of legal questions, alongside its
+storage per vector and brute-force search time, so a size can be picked
+before running reproject_embeddings.
+
+Vectors must still be stored at full size (or at least at the largest
+size evaluated).
+"""
+import json
+import statistics
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from langchain_openai import OpenAIEmbeddings
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import text
+
+from ai_api.models import EgyptianLaw
+from ai_api.langchain_config import (
+    EMBEDDING_MODEL,
+    corpus_collection,
+    get_engine,
+    get_http_client,
+    get_openai_api_key,
+)
+
+# Questions users ask about the seeded laws (Arabic and English)
+DEFAULT_QUESTIONS = [
+    "ما هي حقوق العامل عند إنهاء عقد العمل؟",
+    "ما هي مدة الإجازة السنوية للعامل؟",
+    "ما هي عقوبة السرقة؟",
+    "ما هي شروط صحة العقد؟",
+    "متى يجوز الطعن على الربط الضريبي؟",
+    "ما هي الحقوق والحريات العامة التي يكفلها الدستور؟",
+    "What notice period is required to terminate an employment contract?",
+    "What are the penalties for tax evasion?",
+    "How is compensation for damages calculated under the civil code?",
+    "What rights does the constitution guarantee to detained persons?",
+]
+
+
+def _shorten(vectors, dimensions, dtype=np.float32):
+    shortened = vectors[:, :dimensions].astype(np.float32)
+    shortened /= np.linalg.norm(shortened, axis=1, keepdims=True)
+    return shortened.astype(dtype)
+
+
+def _top_k(queries, vectors, k):
+    scores = queries.astype(np.float32) @ vectors.astype(np.float32).T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+class Command(BaseCommand):
+    help = "Evaluate retrieval quality vs storage and latency of shorter embeddings"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dimensions",
+            type=str,
+            default="3072,1536,1024,768,512,256",
+            help="Comma-separated sizes to evaluate",
+        )
+        parser.add_argument("--k", type=int, default=15)
+        parser.add_argument("--law", type=str, help="Evaluate a single law by slug")
+        parser.add_argument(
+            "--questions-file",
+            type=str,
+            help="File with one question per line (default: built-in questions)",
+        )
+
+    def handle(self, *args, **options):
+        k = options["k"]
+        questions = DEFAULT_QUESTIONS
+        if options.get("questions_file"):
+            with open(options["questions_file"], encoding="utf-8") as f:
+                questions = [line.strip() for line in f if line.strip()]
+
+        laws = EgyptianLaw.objects.filter(status="ready")
+        if options.get("law"):
+            laws = laws.filter(slug=options["law"])
+        corpora = {law.slug: self.load_vectors(law.collection_name) for law in laws}
+        corpora = {slug: vectors for slug, vectors in corpora.items() if len(vectors)}
+        if not corpora:
+            raise CommandError("No seeded law vectors found")
+
+        full = min(vectors.shape[1] for vectors in corpora.values())
+        sizes = sorted(
+            {int(d) for d in options["dimensions"].split(",") if int(d) <= full},
+            reverse=True,
+        )
+        self.stdout.write(
+            f"{sum(len(v) for v in corpora.values())} chunks in {len(corpora)} law(s), "
+            f"stored at {full} dimensions; {len(questions)} questions, recall@{k}"
+        )
+
+        embedder = OpenAIEmbeddings(
+            model=EMBEDDING_MODEL,
+            dimensions=full,
+            openai_api_key=get_openai_api_key(),
+            http_client=get_http_client(),
+        )
+        query_vectors = np.array(embedder.embed_documents(questions), dtype=np.float32)
+
+        chunk_count = sum(len(v) for v in corpora.values())
+        self.stdout.write(
+            f"{'dims':>6} {'precision':>9} {'recall':>7} {'bytes/vec':>10} "
+            f"{'corpus MB':>10} {'ms/query':>9}"
+        )
+        for dimensions in sizes:
+            for precision, dtype, width in (("float32", np.float32, 4), ("half", np.float16, 2)):
+                recalls, timings = [], []
+                for vectors in corpora.values():
+                    reference = _top_k(_shorten(query_vectors, full), _shorten(vectors, full), k)
+                    candidate_vectors = _shorten(vectors, dimensions, dtype)
+                    candidate_queries = _shorten(query_vectors, dimensions, dtype)
+
+                    started = time.perf_counter()
+                    found = _top_k(candidate_queries, candidate_vectors, k)
+                    timings.append((time.perf_counter() - started) * 1000 / len(questions))
+
+                    recalls.extend(
+                        len(set(a) & set(b)) / k for a, b in zip(found, reference)
+                    )
+                bytes_per_vector = dimensions * width
+                self.stdout.write(
+                    f"{dimensions:>6} {precision:>9} {statistics.mean(recalls):>7.3f} "
+                    f"{bytes_per_vector:>10} {chunk_count * bytes_per_vector / 2**20:>10.1f} "
+                    f"{statistics.mean(timings):>9.3f}"
+                )
+
+    def load_vectors(self, collection_name):
+        """All stored vectors of a collection as a (chunks, dimensions) array."""
+        name, scope = corpus_collection(collection_name)
+        with get_engine().connect() as conn:
+            rows = conn.execute(
+                text("""
+                    SELECT e.embedding
+                    FROM langchain_pg_embedding e
+                    JOIN langchain_pg_collection c ON e.collection_id = c.uuid
+                    WHERE c.name = :name AND e.cmetadata @> CAST(:scope AS jsonb)
+                """).columns(embedding=Vector()),
+                {"name": name, "scope": json.dumps(scope)},
+            ).scalars().all()
+        if not rows:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.array(rows, dtype=np.float32)
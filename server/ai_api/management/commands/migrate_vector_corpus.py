@@ -0,0 +1,41 @@
+"""
+Management command to move stored vectors between the collection layouts.
+
+By default every law and document has its own collection. With
+VECTOR_CORPUS_MODE=unified, laws share the `egyptian_laws` collection and
+documents the `user_documents` collection, scoped by the law_slug /
+document_id metadata. This command moves the vectors already stored into
+the target layout (vector ids are unchanged). Searches miss the moved
+vectors until VECTOR_CORPUS_MODE matches, so switch the setting and
+restart the server and workers right after it finishes.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from ai_api.langchain_config import CORPORA, merge_into_corpus, split_corpus
+
+
+class Command(BaseCommand):
+    help = "Move vectors into the shared law/document collections (or back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--to",
+            choices=["unified", "collections"],
+            required=True,
+            help="Target layout (VECTOR_CORPUS_MODE to switch to afterwards)",
+        )
+
+    def handle(self, *args, **options):
+        move = merge_into_corpus if options["to"] == "unified" else split_corpus
+        try:
+            for prefix, (corpus, key) in CORPORA.items():
+                moved = move(prefix)
+                self.stdout.write(f"  {corpus} ({key}): {moved} vectors moved")
+        except Exception as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done; set VECTOR_CORPUS_MODE={options['to']} and restart the server and workers"
+            )
+        )
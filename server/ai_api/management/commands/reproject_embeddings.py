@@ -0,0 +1,88 @@
+"""
+Management command to shorten stored embeddings to EMBEDDING_DIMENSIONS.
+
+After lowering EMBEDDING_DIMENSIONS, vectors already stored (and the
+semantic answer cache) still have the old size. text-embedding-3 vectors
+are shortened in place by keeping their leading dimensions and
+re-normalizing, so nothing is re-embedded. The HNSW index is dropped
+during the update and rebuilt for the new size. Searches fail until the
+command finishes, so run it right after deploying the new setting.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from ai_api.models import LawAnswerCache
+from ai_api.langchain_config import (
+    EMBEDDING_MODEL,
+    EMBEDDING_DIMENSIONS,
+    create_vector_indexes,
+    drop_vector_indexes,
+    reproject_vectors,
+    stored_vector_dimensions,
+    vector_table_size,
+)
+
+
+class Command(BaseCommand):
+    help = "Shorten stored embeddings to EMBEDDING_DIMENSIONS without re-embedding"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Vectors updated per transaction",
+        )
+
+    def handle(self, *args, **options):
+        if not EMBEDDING_MODEL.startswith("text-embedding-3"):
+            raise CommandError(f"{EMBEDDING_MODEL} embeddings cannot be shortened")
+
+        stored = stored_vector_dimensions()
+        if not stored:
+            self.stdout.write("No vectors stored")
+            return
+        if min(stored) < EMBEDDING_DIMENSIONS:
+            raise CommandError(
+                f"Stored vectors have {min(stored)} dimensions, fewer than "
+                f"EMBEDDING_DIMENSIONS={EMBEDDING_DIMENSIONS}; re-embed them instead "
+                "(seed_egyptian_laws --force --rebuild, re-upload documents)"
+            )
+        if stored == [EMBEDDING_DIMENSIONS]:
+            self.stdout.write(f"All vectors already have {EMBEDDING_DIMENSIONS} dimensions")
+            return
+
+        self.stdout.write(
+            f"Reprojecting vectors from {max(stored)} to {EMBEDDING_DIMENSIONS} dimensions "
+            f"(vector table: {vector_table_size()})..."
+        )
+        # The index expression casts to the old size
+        drop_vector_indexes()
+
+        total = 0
+        while True:
+            updated = reproject_vectors(EMBEDDING_DIMENSIONS, options["batch_size"])
+            if not updated:
+                break
+            total += updated
+            self.stdout.write(f"  {total} vectors reprojected")
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {LawAnswerCache._meta.db_table} "
+                "SET embedding = l2_normalize(subvector(embedding, 1, %s)) "
+                "WHERE vector_dims(embedding) > %s",
+                [EMBEDDING_DIMENSIONS, EMBEDDING_DIMENSIONS],
+            )
+            self.stdout.write(f"  {cursor.rowcount} cached answers reprojected")
+
+        self.stdout.write("Rebuilding vector indexes...")
+        create_vector_indexes(settings.VECTOR_INDEX_M, settings.VECTOR_INDEX_EF_CONSTRUCTION)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reprojected {total} vectors (vector table: {vector_table_size()}; "
+                "run VACUUM FULL langchain_pg_embedding to return the freed space to the OS)"
+            )
+        )
@@ -1,44 +1,97 @@
 """
 Management command to seed Egyptian law documents and generate embeddings.
-Run on container startup to ensure laws are always available.
+Run in the background by the seed_egyptian_laws_task Celery task when a
+worker starts, so laws are always available; can also be run by hand.
 """
 
-import unicodedata
-import re
+import hashlib
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from django.core.management.base import BaseCommand
 from django.conf import settings
+from django.db import connection
 from django.utils import timezone
 
-from langchain_community.document_loaders import PyPDFLoader
+from ai_api.models import EgyptianLaw, EgyptianLawChunk
+from ai_api.analysis import LAW_ANALYSES, generate_law_analysis, invalidate_law_analyses
+from ai_api.seed_worker import run_law_parser
+from ai_api.semantic_cache import clear_law_answers
+from ai_api.tasks import clear_law_seed_progress, report_law_seed_progress
+from ai_api.ingestion import ingest_chunks, iter_chunks, iter_pdf_pages
+from ai_api.law_articles import rebuild_law_articles
+from ai_api.text_normalization import normalize_arabic
+from ai_api.langchain_config import (
+    CHUNK_WRITE_BATCH,
+    chunk_vector_id,
+    get_text_splitter,
+    get_law_vector_store,
+    delete_chunk_vectors,
+    delete_law_vectors,
+    update_vector_metadata,
+)
+
+# Parsed chunk batches buffered per law between its parser and embedder
+PARSE_QUEUE_BATCHES = 4
 
 
-def normalize_arabic(text: str) -> str:
+def law_pdf_chunks(pdf_path, text_splitter=None):
     """
-    Normalize Arabic text by:
-    1. Converting Presentation Forms to standard Arabic (NFKC normalization)
-    2. Removing diacritics/tashkeel for better matching
-    3. Normalizing whitespace
+    Stream a law PDF as normalized chunks: lazy page load -> sanitize and
+    normalize Arabic -> split (with get_text_splitter() unless another
+    splitter is given). Chunk metadata carries the 0-indexed "page" and
+    "end_page" (for chunks crossing a page break) and "total_pages".
     """
-    # NFKC normalization converts presentation forms to standard Arabic
-    text = unicodedata.normalize("NFKC", text)
+    def normalized_pages():
+        for page in iter_pdf_pages(pdf_path, engine="pypdf"):
+            page.page_content = normalize_arabic(page.page_content.replace("\x00", ""))
+            yield page
 
-    # Remove Arabic diacritics (tashkeel) - helps matching
-    arabic_diacritics = re.compile(r"[\u064B-\u065F\u0670]")
-    text = arabic_diacritics.sub("", text)
+    for chunk in iter_chunks(normalized_pages(), text_splitter or get_text_splitter()):
+        chunk.page_content = normalize_arabic(chunk.page_content.replace("\x00", ""))
+        yield chunk
 
-    # Normalize whitespace
-    text = " ".join(text.split())
-
-    return text
 
+def parse_law_pdf(pdf_path, batches, stop):
+    """
+    Parse a law PDF in a worker process or thread (used by --workers),
+    putting its chunks on the bounded `batches` queue in batches of
+    CHUNK_WRITE_BATCH. The parser waits while the queue is full, so at
+    most PARSE_QUEUE_BATCHES batches of a law are held at a time.
 
-from ai_api.models import EgyptianLaw, EgyptianLawChunk
-from ai_api.langchain_config import (
-    get_text_splitter,
-    get_law_vector_store,
-    delete_law_vectors,
-)
+    Queue items are ("chunks", batch), then ("done", seconds) or
+    ("error", message). Parsing stops once `stop` is set.
+    """
+    def put(item):
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    started = time.monotonic()
+    try:
+        batch = []
+        for chunk in law_pdf_chunks(pdf_path):
+            batch.append(chunk)
+            if len(batch) >= CHUNK_WRITE_BATCH:
+                if not put(("chunks", batch)):
+                    return
+                batch = []
+        if batch and not put(("chunks", batch)):
+            return
+        put(("done", time.monotonic() - started))
+    except Exception as e:
+        put(("error", str(e)))
+    finally:
+        if stop.is_set() and hasattr(batches, "cancel_join_thread"):
+            # Nobody reads the rest; don't block the process exit on it
+            batches.cancel_join_thread()
 
 
 # Law definitions matching frontend egyptianLawDocuments.js
@@ -103,17 +156,41 @@ class Command(BaseCommand):
         parser.add_argument(
             "--force",
             action="store_true",
-            help="Force re-seeding even if already done",
+            help="Force re-seeding even if already done (only changed chunks are re-embedded)",
         )
         parser.add_argument(
             "--law",
             type=str,
             help="Seed only a specific law by slug",
         )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="With --force, drop and re-embed every chunk instead of only changed ones",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Seed laws concurrently: N processes parse PDFs, N threads embed",
+        )
+        parser.add_argument(
+            "--articles",
+            action="store_true",
+            help="Only rebuild the article index of laws already seeded (no PDF parsing or embedding)",
+        )
+        parser.add_argument(
+            "--with-analysis",
+            action="store_true",
+            help="Also generate and store the Arabic summary and clause analysis for each law",
+        )
 
     def handle(self, *args, **options):
         force = options.get("force", False)
         specific_law = options.get("law")
+        self.rebuild = options.get("rebuild", False)
+        with_analysis = options.get("with_analysis", False)
+        workers = options.get("workers") or 1
 
         laws_to_process = EGYPTIAN_LAWS
         if specific_law:
@@ -124,15 +201,119 @@ class Command(BaseCommand):
                 )
                 return
 
+        if options.get("articles"):
+            self.index_articles(laws_to_process)
+            return
+
         self.stdout.write(f"Processing {len(laws_to_process)} law(s)...")
+        started = time.monotonic()
+
+        if workers > 1 and len(laws_to_process) > 1:
+            self.seed_laws_parallel(laws_to_process, force, workers)
+        else:
+            for law_data in laws_to_process:
+                self.seed_law(law_data, force)
 
-        for law_data in laws_to_process:
-            self.seed_law(law_data, force)
+        if with_analysis:
+            for law_data in laws_to_process:
+                self.seed_analyses(law_data["slug"], force)
 
-        self.stdout.write(self.style.SUCCESS("Egyptian laws seeding complete!"))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Egyptian laws seeding complete! ({time.monotonic() - started:.1f}s)"
+            )
+        )
 
     def seed_law(self, law_data: dict, force: bool):
         """Seed a single law document."""
+        prepared = self.prepare_law(law_data, force)
+        if prepared is None:
+            return
+        law, pdf_path, cleanup = prepared
+
+        self.stdout.write(f"    Loading PDF: {pdf_path.name}")
+        self.store_law(law, law_pdf_chunks(pdf_path), cleanup)
+
+    def seed_laws_parallel(self, laws: list, force: bool, workers: int):
+        """
+        Seed several laws concurrently, at most `workers` at a time.
+
+        PDF parsing, Arabic normalization and splitting are CPU bound and
+        run in a child process per law; storing chunks and embedding them
+        is I/O bound and runs on a worker thread (each law embeds with up
+        to EMBEDDING_CONCURRENCY requests in flight; see seed_worker for
+        how parsers are started). Chunks stream from
+        parser to embedder through a bounded queue, so memory stays
+        bounded however large the laws are. Inside a Celery worker
+        process, which may not start child processes, parsing runs in
+        threads instead.
+        """
+        prepared = [p for p in (self.prepare_law(law_data, force) for law_data in laws) if p]
+        if not prepared:
+            return
+
+        self.stdout.write(f"  Seeding {len(prepared)} law(s) with {workers} workers...")
+        in_threads = multiprocessing.current_process().daemon
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(self.parse_and_store_law, law, pdf_path, cleanup, in_threads)
+                for law, pdf_path, cleanup in prepared
+            ]
+            for future in futures:
+                future.result()
+
+    def parse_and_store_law(self, law, pdf_path, cleanup, in_threads):
+        """Run parse_law_pdf next to store_law on this thread, with its own DB connection."""
+        if in_threads:
+            batches, stop = queue.Queue(PARSE_QUEUE_BATCHES), threading.Event()
+            parser = threading.Thread(
+                target=parse_law_pdf, args=(str(pdf_path), batches, stop), daemon=True
+            )
+        else:
+            # A spawned interpreter shares none of this process's threads,
+            # DB connections or HTTP clients, unlike a fork
+            context = multiprocessing.get_context("spawn")
+            batches, stop = context.Queue(PARSE_QUEUE_BATCHES), context.Event()
+            parser = context.Process(
+                target=run_law_parser, args=(str(pdf_path), batches, stop), daemon=True
+            )
+        parser.start()
+        try:
+            self.store_law(law, self.parsed_chunks(law, batches, parser), cleanup)
+        finally:
+            stop.set()
+            parser.join()
+            connection.close()
+
+    def parsed_chunks(self, law, batches, parser):
+        """Chunks put on the queue by parse_law_pdf; raises if parsing failed."""
+        while True:
+            try:
+                kind, value = batches.get(timeout=1)
+            except queue.Empty:
+                running = parser.exitcode is None if hasattr(parser, "exitcode") else parser.is_alive()
+                if running:
+                    continue
+                # Whatever the parser put before exiting is readable by now
+                try:
+                    kind, value = batches.get(timeout=1)
+                except queue.Empty:
+                    raise RuntimeError("PDF parser exited unexpectedly") from None
+            if kind == "chunks":
+                yield from value
+            elif kind == "error":
+                raise RuntimeError(f"Failed to parse PDF: {value}")
+            else:
+                self.stdout.write(f"    [{law.slug}] Parsed in {value:.1f}s")
+                return
+
+    def prepare_law(self, law_data: dict, force: bool):
+        """
+        Create or refresh the law row and decide whether it needs seeding.
+
+        Returns:
+            (law, pdf_path, cleanup) or None when the law is skipped
+        """
         slug = law_data["slug"]
 
         # Check if already seeded
@@ -156,7 +337,7 @@ class Command(BaseCommand):
         if not created and not force:
             if law.status == "ready" and actual_chunks_exist:
                 self.stdout.write(f"  Skipping {slug} - already seeded and verified")
-                return
+                return None
 
             # Recovery case: status is 'ready' but data is missing (failed previous run)
             if law.status == "ready" and not actual_chunks_exist:
@@ -176,88 +357,223 @@ class Command(BaseCommand):
 
         self.stdout.write(f"  Processing {slug}...")
 
-        try:
-            law.status = "processing"
-            law.save()
-
-            # Get PDF path
-            pdf_path = settings.EGYPTIAN_LAWS_DIR / law_data["file_name"]
-            if not pdf_path.exists():
-                self.stderr.write(self.style.ERROR(f"    PDF not found: {pdf_path}"))
-                law.status = "failed"
-                law.save()
-                return
-
-            # Load and process PDF
-            self.stdout.write(f"    Loading PDF: {pdf_path.name}")
-            loader = PyPDFLoader(str(pdf_path))
-            pages = loader.load()
+        law.status = "processing"
+        law.save()
+        report_law_seed_progress(slug, stage="parsing")
 
-            # Sanitize and normalize Arabic content
-            for page in pages:
-                content = page.page_content.replace("\x00", "")
-                page.page_content = normalize_arabic(content)
-
-            law.page_count = len(pages)
-            self.stdout.write(f"    Loaded {len(pages)} pages")
-
-            # Split into chunks
-            text_splitter = get_text_splitter()
-            chunks = text_splitter.split_documents(pages)
-            self.stdout.write(f"    Split into {len(chunks)} chunks")
+        # Get PDF path
+        pdf_path = settings.EGYPTIAN_LAWS_DIR / law_data["file_name"]
+        if not pdf_path.exists():
+            self.stderr.write(self.style.ERROR(f"    PDF not found: {pdf_path}"))
+            law.status = "failed"
+            law.save()
+            clear_law_seed_progress(slug)
+            return None
+
+        return law, pdf_path, actual_chunks_exist or force
+
+    def store_law(self, law, chunks, cleanup: bool):
+        """
+        Bring a law's chunks and vectors in line with the given (normalized) chunks.
+
+        Chunks are content-addressed: a chunk's vector id derives from the
+        hash of its text (plus its occurrence number, for repeated text).
+        When the law was seeded before, the new chunks are diffed against
+        the stored ones: unchanged chunks keep their row and vector (only
+        position metadata is updated), new chunks are embedded and chunks
+        that disappeared are deleted. --rebuild, or rows seeded before
+        chunks were hashed, fall back to wiping and re-embedding everything.
+
+        New rows get their vector id only once their batch is written (as
+        in tasks.embed_pending_chunks), so rows left without one by a
+        failed run are dropped and embedded again rather than reused.
+
+        Args:
+            law: EgyptianLaw being seeded
+            chunks: Iterable of split chunks (streamed or pre-parsed)
+            cleanup: Whether the law already has chunks/vectors stored
+        """
+        slug = law.slug
+        collection_name = law.collection_name
+        started = time.monotonic()
 
-            # 3. Clean old data before re-processing to prevent duplicates
-            if actual_chunks_exist or force:
-                self.stdout.write(
-                    f"    Cleaning existing data for {slug} before re-processing..."
+        try:
+            # chunk vector id -> stored row, for rows that may be reused
+            existing = {}
+            incremental = False
+            if cleanup:
+                old_rows = list(
+                    EgyptianLawChunk.objects.filter(law=law)
+                    .only(
+                        "id", "content_hash", "vector_id", "chunk_index", "page_number", "end_page_number"
+                    )
                 )
-                EgyptianLawChunk.objects.filter(law=law).delete()
-                try:
-                    delete_law_vectors(slug)
-                except Exception:
-                    pass  # Ignore if vector store doesn't exist yet
-
-            # Add metadata and save chunks
-            chunk_objects = []
-            for i, chunk in enumerate(chunks):
-                chunk.page_content = normalize_arabic(
-                    chunk.page_content.replace("\x00", "")
+                if self.rebuild or any(not r.content_hash for r in old_rows):
+                    # 3. Clean old data before re-processing to prevent duplicates
+                    self.stdout.write(
+                        f"    Cleaning existing data for {slug} before re-processing..."
+                    )
+                    EgyptianLawChunk.objects.filter(law=law).delete()
+                    try:
+                        delete_law_vectors(slug)
+                    except Exception:
+                        pass  # Ignore if vector store doesn't exist yet
+                else:
+                    # Rows whose batch never finished embedding; a vector
+                    # written without its checkpoint goes with them
+                    unembedded = [row.id for row in old_rows if not row.vector_id]
+                    if unembedded:
+                        delete_chunk_vectors(collection_name, unembedded)
+                        EgyptianLawChunk.objects.filter(id__in=unembedded).delete()
+                    existing = {row.vector_id: row for row in old_rows if row.vector_id}
+                    incremental = True
+
+            page_count = 0
+            pages_read = 0
+            embedded = 0
+            reused = []  # rows whose vector is kept
+            moved = []  # reused rows whose position changed
+            occurrences = {}
+
+            def store_rows(rows, new_chunks):
+                """Write a block of rows and link each chunk to its row id."""
+                EgyptianLawChunk.objects.bulk_create(rows)
+                for row, chunk in zip(rows, new_chunks):
+                    chunk.metadata["chunk_id"] = row.id
+                return new_chunks
+
+            def law_chunks():
+                """Store rows for every chunk; yield only those that need embedding."""
+                nonlocal page_count, pages_read
+                rows, new_chunks = [], []
+                for i, chunk in enumerate(chunks):
+                    page_count = chunk.metadata.get("total_pages", page_count)
+                    page_num = chunk.metadata.get("page", 0) + 1
+                    end_page_num = chunk.metadata.get("end_page", page_num - 1) + 1
+                    pages_read = page_num
+                    content_hash = hashlib.sha256(chunk.page_content.encode("utf-8")).hexdigest()
+                    occurrence = occurrences.get(content_hash, 0)
+                    occurrences[content_hash] = occurrence + 1
+                    vector_id = chunk_vector_id(collection_name, f"{content_hash}/{occurrence}")
+
+                    row = existing.pop(vector_id, None)
+                    if row is not None:
+                        reused.append(row)
+                        if (row.chunk_index, row.page_number, row.end_page_number) != (
+                            i, page_num, end_page_num
+                        ):
+                            row.chunk_index = i
+                            row.page_number = page_num
+                            row.end_page_number = end_page_num
+                            moved.append(row)
+                        continue
+
+                    chunk.id = vector_id
+                    chunk.metadata.update(
+                        {
+                            "law_slug": slug,
+                            "law_title": law.title_en,
+                            "chunk_index": i,
+                            "page_number": page_num,
+                            "end_page_number": end_page_num,
+                        }
+                    )
+                    rows.append(
+                        EgyptianLawChunk(
+                            law=law,
+                            content=chunk.page_content,
+                            content_hash=content_hash,
+                            chunk_index=i,
+                            page_number=page_num,
+                            end_page_number=end_page_num,
+                        )
+                    )
+                    new_chunks.append(chunk)
+                    if len(rows) >= CHUNK_WRITE_BATCH:
+                        yield from store_rows(rows, new_chunks)
+                        rows, new_chunks = [], []
+                yield from store_rows(rows, new_chunks)
+
+            def on_batch(batch):
+                """Checkpoint a written batch by storing its vector ids on the rows."""
+                nonlocal embedded
+                EgyptianLawChunk.objects.bulk_update(
+                    [
+                        EgyptianLawChunk(pk=chunk.metadata["chunk_id"], vector_id=chunk.id)
+                        for chunk in batch
+                    ],
+                    ["vector_id"],
                 )
-                page_num = chunk.metadata.get("page", 0) + 1
-                chunk.metadata.update(
-                    {
-                        "law_slug": slug,
-                        "law_title": law.title_en,
-                        "chunk_index": i,
-                        "page_number": page_num,
-                    }
+                embedded += len(batch)
+                report_law_seed_progress(
+                    slug,
+                    stage="embedding",
+                    pages=pages_read,
+                    total_pages=page_count,
+                    embedded_chunks=embedded,
                 )
 
-                chunk_objects.append(
-                    EgyptianLawChunk(
-                        law=law,
-                        content=chunk.page_content,
-                        chunk_index=i,
-                        page_number=page_num,
-                    )
+            # Store embeddings in vector database
+            self.stdout.write(f"    [{slug}] Generating embeddings...")
+            report_law_seed_progress(slug, stage="embedding", pages=0, embedded_chunks=0)
+            vector_store = get_law_vector_store(slug)
+            ingestion = ingest_chunks(
+                vector_store, law_chunks(), vector_id=lambda chunk: chunk.id, on_batch=on_batch
+            )
+            self.stdout.write(
+                f"    [{slug}] Embedded {ingestion['chunks']} new chunks from {page_count} pages "
+                f"in {ingestion['batches']} batches "
+                f"({ingestion['seconds']}s, {ingestion['chunks_per_second']} chunks/s)"
+            )
+
+            # Reused chunks keep their vector; refresh its position and row link
+            if moved:
+                EgyptianLawChunk.objects.bulk_update(
+                    moved, ["chunk_index", "page_number", "end_page_number"]
+                )
+            update_vector_metadata({
+                row.vector_id: {
+                    "chunk_id": row.id,
+                    "chunk_index": row.chunk_index,
+                    "page_number": row.page_number,
+                    "end_page_number": row.end_page_number,
+                }
+                for row in reused
+            })
+
+            # Chunks no longer in the law
+            removed = list(existing.values())
+            if removed:
+                vector_store.delete(ids=[row.vector_id for row in removed])
+                EgyptianLawChunk.objects.filter(id__in=[row.id for row in removed]).delete()
+
+            if incremental:
+                self.stdout.write(
+                    f"    [{slug}] Reused {len(reused)} chunks ({len(moved)} moved), "
+                    f"added {ingestion['chunks']}, removed {len(removed)}"
                 )
 
-            EgyptianLawChunk.objects.bulk_create(chunk_objects)
+            # Stored summaries/clause analyses and cached chat answers
+            # describe the previous content
+            if ingestion["chunks"] or removed:
+                invalidate_law_analyses(law)
+                clear_law_answers(law)
 
-            # Store embeddings in vector database
-            self.stdout.write(f"    Generating embeddings...")
-            vector_store = get_law_vector_store(slug)
-            vector_store.add_documents(chunks)
+            # Article lookups read the stored chunks
+            articles = rebuild_law_articles(law)
+            self.stdout.write(f"    [{slug}] Indexed {articles} articles")
 
             # Mark as ready
             law.status = "ready"
-            law.chunk_count = len(chunks)
+            law.page_count = page_count
+            law.chunk_count = sum(occurrences.values())
             law.seeded_at = timezone.now()
             law.save()
 
             self.stdout.write(
                 self.style.SUCCESS(
-                    f"    Successfully seeded {slug}: {law.page_count} pages, {law.chunk_count} chunks"
+                    f"    Successfully seeded {slug}: {law.page_count} pages, "
+                    f"{law.chunk_count} chunks ({time.monotonic() - started:.1f}s)"
                 )
             )
 
@@ -268,3 +584,39 @@ class Command(BaseCommand):
             import traceback
 
             self.stderr.write(traceback.format_exc())
+
+        finally:
+            clear_law_seed_progress(slug)
+
+    def index_articles(self, laws: list):
+        """Rebuild the article index from the stored chunks of seeded laws."""
+        for law_data in laws:
+            law = EgyptianLaw.objects.filter(slug=law_data["slug"], status="ready").first()
+            if law is None:
+                self.stdout.write(f"  Skipping articles for {law_data['slug']} - law is not ready")
+                continue
+            self.stdout.write(f"  Indexed {rebuild_law_articles(law)} articles for {law.slug}")
+
+    def seed_analyses(self, slug: str, force: bool):
+        """
+        Precompute the stored summary and clause analysis for a seeded law,
+        so the /summary/ and /clauses/ endpoints serve them as plain reads.
+        """
+        law = EgyptianLaw.objects.filter(slug=slug, status="ready").first()
+        if law is None:
+            self.stdout.write(f"  Skipping analyses for {slug} - law is not ready")
+            return
+
+        for kind in LAW_ANALYSES:
+            report_law_seed_progress(slug, stage="analysis", analysis=kind)
+            try:
+                _, created = generate_law_analysis(law, kind, force=force)
+                if created:
+                    self.stdout.write(f"    Generated {kind} analysis for {slug}")
+                else:
+                    self.stdout.write(f"    Skipping {kind} analysis for {slug} - already stored")
+            except Exception as e:
+                self.stderr.write(
+                    self.style.ERROR(f"    Failed to generate {kind} analysis for {slug}: {str(e)}")
+                )
+        clear_law_seed_progress(slug)
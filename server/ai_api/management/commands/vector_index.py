@@ -0,0 +1,84 @@
+"""
+Management command to create and maintain the HNSW index of the vector table.
+
+Every collection lives in langchain_pg_embedding; without an ANN index
+each similarity/MMR search scans every vector of the collection. The
+HNSW index covers the whole table and searches filter it by collection
+(small collections use the collection index instead). Idempotent: run it
+after changing m / ef_construction with --rebuild.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ai_api.langchain_config import (
+    create_vector_indexes,
+    drop_vector_indexes,
+    reindex_vector_index,
+    vector_index_status,
+)
+
+
+class Command(BaseCommand):
+    help = "Create (or rebuild, drop) the HNSW index on the vector table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--m",
+            type=int,
+            default=settings.VECTOR_INDEX_M,
+            help="Max connections per HNSW node (default: VECTOR_INDEX_M)",
+        )
+        parser.add_argument(
+            "--ef-construction",
+            type=int,
+            default=settings.VECTOR_INDEX_EF_CONSTRUCTION,
+            help="Build-time candidate list size (default: VECTOR_INDEX_EF_CONSTRUCTION)",
+        )
+        action = parser.add_mutually_exclusive_group()
+        action.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Drop and recreate the HNSW index with the given parameters",
+        )
+        action.add_argument(
+            "--reindex",
+            action="store_true",
+            help="Rebuild the HNSW index in place (e.g. after large deletes)",
+        )
+        action.add_argument(
+            "--drop",
+            action="store_true",
+            help="Drop the vector indexes",
+        )
+        action.add_argument(
+            "--status",
+            action="store_true",
+            help="Only show the current indexes",
+        )
+
+    def handle(self, *args, **options):
+        if options["drop"]:
+            drop_vector_indexes()
+            self.stdout.write(self.style.SUCCESS("Dropped vector indexes"))
+            return
+
+        if options["reindex"]:
+            self.stdout.write("Rebuilding HNSW index...")
+            reindex_vector_index()
+        elif not options["status"]:
+            self.stdout.write(
+                f"Creating vector indexes (m={options['m']}, "
+                f"ef_construction={options['ef_construction']})..."
+            )
+            create_vector_indexes(
+                options["m"], options["ef_construction"], rebuild=options["rebuild"]
+            )
+
+        indexes = vector_index_status()
+        if not indexes:
+            self.stdout.write(self.style.WARNING("No vector indexes"))
+        for index in indexes:
+            state = "valid" if index["valid"] else "INVALID"
+            self.stdout.write(f"  {index['name']} ({index['size']}, {state})")
+            self.stdout.write(f"    {index['definition']}")
+        self.stdout.write(f"Query-time hnsw.ef_search: {settings.VECTOR_INDEX_EF_SEARCH}")
@@ -0,0 +1,47 @@
+"""
+Management command to drop or restore the chunk text stored in the vector table.
+
+Chunk text lives in the chunk tables and, by default, again in the
+langchain_pg_embedding `document` column. With VECTOR_STORE_CHUNK_TEXT
+off, new vectors are written without it and searches read the text from
+the chunk rows; --drop converts the vectors already stored, --restore
+undoes it.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from ai_api.langchain_config import drop_vector_text, restore_vector_text
+
+
+class Command(BaseCommand):
+    help = "Drop (or restore) the chunk text duplicated in the vector table"
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group(required=True)
+        group.add_argument(
+            "--drop",
+            action="store_true",
+            help="Empty the text of vectors linked to a chunk row",
+        )
+        group.add_argument(
+            "--restore",
+            action="store_true",
+            help="Copy chunk text back into vectors stored without it",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options["drop"]:
+                updated = drop_vector_text()
+                self.stdout.write(
+                    self.style.SUCCESS(f"Dropped text from {updated} vectors")
+                )
+                self.stdout.write(
+                    "Run VACUUM on langchain_pg_embedding to reclaim the space."
+                )
+            else:
+                updated = restore_vector_text()
+                self.stdout.write(
+                    self.style.SUCCESS(f"Restored text of {updated} vectors")
+                )
+        except Exception as e:
+            raise CommandError(str(e))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.9 on 2026-10-17 06:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_api', '0003_egyptianlaw_egyptianlawchunk_lawchatsession_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisArtifact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('summary', 'Summary'), ('clauses', 'Clause Analysis')], max_length=20)),
+                ('prompt_version', models.CharField(max_length=20)),
+                ('model', models.CharField(max_length=100)),
+                ('content', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('document', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='analyses', to='ai_api.document')),
+                ('law', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='analyses', to='ai_api.egyptianlaw')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('document__isnull', False)), fields=('document', 'kind', 'prompt_version', 'model'), name='unique_document_analysis'), models.UniqueConstraint(condition=models.Q(('law__isnull', False)), fields=('law', 'kind', 'prompt_version', 'model'), name='unique_law_analysis')],
+            },
+        ),
+    ]
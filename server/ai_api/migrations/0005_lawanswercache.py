@@ -0,0 +1,36 @@
+# Generated by Django 5.2.9 on 2026-10-17 06:14
+
+import django.db.models.deletion
+import pgvector.django
+import pgvector.django.vector
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_api', '0004_analysisartifact'),
+    ]
+
+    operations = [
+        pgvector.django.VectorExtension(),
+        migrations.CreateModel(
+            name='LawAnswerCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.TextField()),
+                ('embedding', pgvector.django.vector.VectorField()),
+                ('model', models.CharField(max_length=100)),
+                ('answer', models.TextField()),
+                ('sources', models.JSONField(blank=True, default=list)),
+                ('hit_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True)),
+                ('law', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answer_cache', to='ai_api.egyptianlaw')),
+            ],
+            options={
+                'ordering': ['-last_used_at'],
+                'indexes': [models.Index(fields=['law', 'last_used_at'], name='ai_api_lawa_law_id_d31972_idx')],
+            },
+        ),
+    ]
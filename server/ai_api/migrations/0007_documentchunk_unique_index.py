@@ -0,0 +1,30 @@
+# Generated by Django 5.2.9 on 2026-10-17 06:18
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_chunks(apps, schema_editor):
+    """Earlier retried tasks could store a chunk twice; keep the first copy."""
+    DocumentChunk = apps.get_model('ai_api', 'DocumentChunk')
+    keep = (
+        DocumentChunk.objects.values('document', 'chunk_index')
+        .annotate(first_id=Min('id'))
+        .values_list('first_id', flat=True)
+    )
+    DocumentChunk.objects.exclude(id__in=list(keep)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_api', '0006_document_content_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_chunks, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='documentchunk',
+            constraint=models.UniqueConstraint(fields=('document', 'chunk_index'), name='unique_document_chunk_index'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-17 06:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_api', '0007_documentchunk_unique_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='egyptianlawchunk',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
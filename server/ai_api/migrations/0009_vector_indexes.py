@@ -0,0 +1,56 @@
+# Generated by Django 5.2.9 on 2026-10-17 09:02
+
+from django.conf import settings
+from django.db import migrations
+
+
+def create_vector_indexes(apps, schema_editor):
+    """
+    Index the langchain_pg_embedding table of existing deployments (same
+    statements as `manage.py vector_index`). The table is created by
+    langchain_postgres on first use; on a fresh database it does not exist
+    yet and the law seeding task creates the indexes instead. The halfvec
+    cast follows EMBEDDING_DIMENSIONS, like the search queries, so the
+    planner can use the index.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('langchain_pg_embedding')")
+        if cursor.fetchone()[0] is None:
+            return
+        cursor.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS langchain_pg_embedding_collection_idx "
+            "ON langchain_pg_embedding (collection_id)"
+        )
+        cursor.execute(f"SET maintenance_work_mem = '{settings.VECTOR_INDEX_BUILD_MEMORY}'")
+        cursor.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS langchain_pg_embedding_hnsw_idx "
+            "ON langchain_pg_embedding "
+            f"USING hnsw ((embedding::halfvec({int(settings.EMBEDDING_DIMENSIONS)})) halfvec_cosine_ops) "
+            f"WITH (m = {int(settings.VECTOR_INDEX_M)}, "
+            f"ef_construction = {int(settings.VECTOR_INDEX_EF_CONSTRUCTION)})"
+        )
+
+
+def drop_vector_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("DROP INDEX CONCURRENTLY IF EXISTS langchain_pg_embedding_hnsw_idx")
+        cursor.execute("DROP INDEX CONCURRENTLY IF EXISTS langchain_pg_embedding_collection_idx")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('ai_api', '0008_egyptianlawchunk_content_hash'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_vector_indexes, drop_vector_indexes),
+    ]
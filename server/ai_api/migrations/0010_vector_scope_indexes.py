@@ -0,0 +1,50 @@
+# Generated by Django 5.2.9 on 2026-10-17 11:40
+
+from django.db import migrations
+
+SCOPE_INDEXES = {
+    'law_slug': 'langchain_pg_embedding_law_slug_idx',
+    'document_id': 'langchain_pg_embedding_document_id_idx',
+}
+
+
+def create_scope_indexes(apps, schema_editor):
+    """
+    Index the law_slug / document_id metadata that scopes searches in the
+    shared corpus collections (VECTOR_CORPUS_MODE=unified). Skipped when
+    the vector table does not exist yet, as in 0009.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('langchain_pg_embedding')")
+        if cursor.fetchone()[0] is None:
+            return
+        for key, name in SCOPE_INDEXES.items():
+            cursor.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON langchain_pg_embedding (collection_id, (cmetadata ->> '{key}'))"
+            )
+
+
+def drop_scope_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for name in SCOPE_INDEXES.values():
+            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('ai_api', '0009_vector_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_scope_indexes, drop_scope_indexes),
+    ]
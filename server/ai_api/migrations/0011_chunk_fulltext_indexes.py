@@ -0,0 +1,61 @@
+# Generated by Django 5.2.9 on 2026-10-17 13:15
+
+from django.db import migrations
+
+# Mirrors ai_api.text_normalization.normalize_search_text() (whitespace
+# aside, which to_tsvector ignores)
+CREATE_SEARCH_TEXT_FUNCTION = r"""
+CREATE OR REPLACE FUNCTION legalmind_search_text(content text) RETURNS text
+LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+    SELECT lower(translate(
+        regexp_replace(normalize(content, NFKC), '[\u064B-\u065F\u0670]', '', 'g'),
+        'أإآىة٠١٢٣٤٥٦٧٨٩ـ',
+        'ااايه0123456789'
+    ))
+$$
+"""
+
+FULLTEXT_INDEXES = {
+    'ai_api_egyptianlawchunk_fts_idx': 'ai_api_egyptianlawchunk',
+    'ai_api_documentchunk_fts_idx': 'ai_api_documentchunk',
+}
+
+
+def create_fulltext_indexes(apps, schema_editor):
+    """
+    Full-text indexes over normalized chunk content for hybrid retrieval
+    (see langchain_config.lexical_search). PostgreSQL only.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_SEARCH_TEXT_FUNCTION)
+        for name, table in FULLTEXT_INDEXES.items():
+            cursor.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} "
+                "USING gin (to_tsvector('simple', legalmind_search_text(content)))"
+            )
+
+
+def drop_fulltext_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for name in FULLTEXT_INDEXES:
+            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        cursor.execute("DROP FUNCTION IF EXISTS legalmind_search_text(text)")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('ai_api', '0010_vector_scope_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_indexes, drop_fulltext_indexes),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.9 on 2026-10-17 14:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_api', '0011_chunk_fulltext_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LawArticle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.IntegerField()),
+                ('start_page', models.IntegerField(blank=True, null=True)),
+                ('end_page', models.IntegerField(blank=True, null=True)),
+                ('chunk_ids', models.JSONField(blank=True, default=list)),
+                ('content', models.TextField()),
+                ('law', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='articles', to='ai_api.egyptianlaw')),
+            ],
+            options={
+                'ordering': ['number'],
+                'constraints': [models.UniqueConstraint(fields=('law', 'number'), name='unique_law_article')],
+            },
+        ),
+    ]
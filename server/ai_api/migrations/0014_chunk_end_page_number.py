@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-17 07:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_api', '0013_message_prompt_tokens'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentchunk',
+            name='end_page_number',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='egyptianlawchunk',
+            name='end_page_number',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-17 07:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_api', '0014_chunk_end_page_number'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lawanswercache',
+            name='prompt_version',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='lawanswercache',
+            name='retrieval_mode',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+    ]
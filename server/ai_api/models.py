@@ -1,5 +1,7 @@
 from django.db import models
 from django.conf import settings
+from pgvector.django import VectorField
+import hashlib
 import uuid
 import os
 
@@ -10,6 +12,16 @@ def document_upload_path(instance, filename):
     return os.path.join('documents/', filename)
 
 
+def file_content_hash(file):
+    """SHA-256 of a (Django) file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for block in file.chunks():
+        digest.update(block)
+    file.seek(0)
+    return digest.hexdigest()
+
+
 class Document(models.Model):
     """
     Stores uploaded legal PDF documents.
@@ -35,6 +47,8 @@ class Document(models.Model):
         default='uploaded'
     )
     page_count = models.IntegerField(null=True, blank=True)
+    # SHA-256 of the PDF, used to reuse chunks/vectors of identical uploads
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     processed_at = models.DateTimeField(null=True, blank=True)
 
@@ -58,11 +72,20 @@ class DocumentChunk(models.Model):
     content = models.TextField()
     chunk_index = models.IntegerField()
     page_number = models.IntegerField(null=True, blank=True)
-    # Store the vector store document ID for retrieval reference
+    # Page the chunk ends on when it continues across a page break
+    end_page_number = models.IntegerField(null=True, blank=True)
+    # Store the vector store document ID for retrieval reference.
+    # Set once the chunk's vector is written (ingestion checkpoint).
     vector_id = models.CharField(max_length=255, null=True, blank=True)
 
     class Meta:
         ordering = ['chunk_index']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['document', 'chunk_index'],
+                name='unique_document_chunk_index',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.document.title} - Chunk {self.chunk_index}"
@@ -113,6 +136,9 @@ class ChatMessage(models.Model):
     content = models.TextField()
     # Store source citations as JSON for assistant messages
     sources = models.JSONField(null=True, blank=True)
+    # Prompt tokens sent to the chat model for an assistant message
+    # (0 when answered without the model, e.g. from a cache)
+    prompt_tokens = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -126,7 +152,7 @@ class EgyptianLaw(models.Model):
     """
     Pre-seeded Egyptian law documents.
     These are system-wide, not tied to individual users.
-    Embeddings are generated once on container startup.
+    Embeddings are generated once, by a background task when a worker starts.
     """
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -171,8 +197,12 @@ class EgyptianLawChunk(models.Model):
         related_name='chunks'
     )
     content = models.TextField()
+    # SHA-256 of the content; reseeding reuses chunks whose hash is unchanged
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
     chunk_index = models.IntegerField()
     page_number = models.IntegerField(null=True, blank=True)
+    # Page the chunk ends on when it continues across a page break
+    end_page_number = models.IntegerField(null=True, blank=True)
     vector_id = models.CharField(max_length=255, null=True, blank=True)
 
     class Meta:
@@ -182,6 +212,37 @@ class EgyptianLawChunk(models.Model):
         return f"{self.law.title_en} - Chunk {self.chunk_index}"
 
 
+class LawArticle(models.Model):
+    """
+    An article (مادة) of an Egyptian law, parsed from its chunks at seed time.
+    Lets "article N of law X" be answered by an indexed fetch instead of a
+    vector search.
+    """
+    law = models.ForeignKey(
+        EgyptianLaw,
+        on_delete=models.CASCADE,
+        related_name='articles'
+    )
+    number = models.IntegerField()
+    start_page = models.IntegerField(null=True, blank=True)
+    end_page = models.IntegerField(null=True, blank=True)
+    # EgyptianLawChunk ids the article text spans, in order
+    chunk_ids = models.JSONField(default=list, blank=True)
+    content = models.TextField()
+
+    class Meta:
+        ordering = ['number']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['law', 'number'],
+                name='unique_law_article',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.law.title_en} - Article {self.number}"
+
+
 class LawChatSession(models.Model):
     """
     Chat sessions for Egyptian law documents.
@@ -225,6 +286,9 @@ class LawChatMessage(models.Model):
     role = models.CharField(max_length=10, choices=ROLE_CHOICES)
     content = models.TextField()
     sources = models.JSONField(null=True, blank=True)
+    # Prompt tokens sent to the chat model for an assistant message
+    # (0 when answered without the model, e.g. from a cache)
+    prompt_tokens = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -232,3 +296,88 @@ class LawChatMessage(models.Model):
 
     def __str__(self):
         return f"{self.role}: {self.content[:50]}..."
+
+
+class AnalysisArtifact(models.Model):
+    """
+    Stored summary or clause analysis for a document or an Egyptian law.
+    Sources never change after processing, so an analysis is generated once
+    per (source, kind, prompt version, model) and reused until the document
+    is reprocessed or the law is reseeded.
+    """
+    KIND_CHOICES = [
+        ('summary', 'Summary'),
+        ('clauses', 'Clause Analysis'),
+    ]
+
+    document = models.ForeignKey(
+        Document,
+        on_delete=models.CASCADE,
+        related_name='analyses',
+        null=True,
+        blank=True
+    )
+    law = models.ForeignKey(
+        EgyptianLaw,
+        on_delete=models.CASCADE,
+        related_name='analyses',
+        null=True,
+        blank=True
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    prompt_version = models.CharField(max_length=20)
+    model = models.CharField(max_length=100)
+    content = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['document', 'kind', 'prompt_version', 'model'],
+                condition=models.Q(document__isnull=False),
+                name='unique_document_analysis',
+            ),
+            models.UniqueConstraint(
+                fields=['law', 'kind', 'prompt_version', 'model'],
+                condition=models.Q(law__isnull=False),
+                name='unique_law_analysis',
+            ),
+        ]
+
+    def __str__(self):
+        source = self.document or self.law
+        return f"{self.get_kind_display()}: {source} ({self.prompt_version})"
+
+
+class LawAnswerCache(models.Model):
+    """
+    Previously answered law chat query, matched by embedding similarity.
+    Lets near-identical questions against the same law skip the LLM.
+    Entries are namespaced per law and cleared when the law is reseeded.
+    """
+    law = models.ForeignKey(
+        EgyptianLaw,
+        on_delete=models.CASCADE,
+        related_name='answer_cache'
+    )
+    query = models.TextField()
+    embedding = VectorField()
+    model = models.CharField(max_length=100)
+    # Law chat prompt version and retrieval mode the answer was generated with
+    prompt_version = models.CharField(max_length=20, blank=True)
+    retrieval_mode = models.CharField(max_length=20, blank=True)
+    answer = models.TextField()
+    sources = models.JSONField(default=list, blank=True)
+    hit_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-last_used_at']
+        indexes = [
+            models.Index(fields=['law', 'last_used_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.law.slug}: {self.query[:50]}"
@@ -0,0 +1,17 @@
+"""
+Entry point of the law PDF parser processes started by seed_egyptian_laws.
+
+Parsers are started with the "spawn" method: a fresh interpreter that
+inherits none of the parent's threads, DB connections or HTTP clients.
+It has to set up Django before the seeding command can be imported, so
+this module imports nothing from the app at module level.
+"""
+import django
+
+
+def run_law_parser(pdf_path, batches, stop):
+    """Set up Django in the spawned process, then run parse_law_pdf."""
+    django.setup()
+    from ai_api.management.commands.seed_egyptian_laws import parse_law_pdf
+
+    parse_law_pdf(pdf_path, batches, stop)
@@ -0,0 +1,141 @@
+"""
+Semantic answer cache for Egyptian law chat.
+
+Users ask near-identical questions against the same few laws, so answers
+are stored with the query embedding and reused when a new query for the
+same law is similar enough. Entries only match answers generated with the
+current chat model, law chat prompt version and retrieval mode. They
+expire after SEMANTIC_CACHE_TTL and each law keeps at most
+SEMANTIC_CACHE_MAX_ENTRIES, evicting the least recently used. A law's
+entries are cleared when it is reseeded.
+
+Hit/miss counters live in the shared Django cache so they cover every
+worker, and are reported by the ops cache-stats endpoint.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from pgvector.django import CosineDistance
+
+from .models import EgyptianLaw, LawAnswerCache
+from .langchain_config import CHAT_MODEL, PROMPT_VERSIONS, law_retrieval_mode
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = "semantic_cache:{slug}:{name}"
+
+
+async def _aincr(slug, name):
+    """Increment a shared counter, creating it on first use."""
+    key = METRICS_KEY.format(slug=slug, name=name)
+    try:
+        await cache.aadd(key, 0, timeout=None)
+        await cache.aincr(key)
+    except Exception:
+        logger.warning("Could not update semantic cache metric %s", key)
+
+
+def _answer_config():
+    """Settings an answer depends on besides the law and the query."""
+    return {
+        "model": CHAT_MODEL,
+        "prompt_version": PROMPT_VERSIONS["egyptian_law_rag"],
+        "retrieval_mode": law_retrieval_mode(),
+    }
+
+
+def _fresh_entries(law):
+    """Entries for a law that are still valid for the current model, prompt and retrieval."""
+    cutoff = timezone.now() - timedelta(seconds=settings.SEMANTIC_CACHE_TTL)
+    return LawAnswerCache.objects.filter(
+        law=law, created_at__gte=cutoff, **_answer_config()
+    )
+
+
+async def alookup_law_answer(law, embedding):
+    """
+    Find a cached answer for a query embedding.
+
+    Returns:
+        The closest LawAnswerCache entry within the similarity threshold, or None
+    """
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return None
+
+    max_distance = 1 - settings.SEMANTIC_CACHE_THRESHOLD
+    try:
+        entry = await (
+            _fresh_entries(law)
+            .annotate(distance=CosineDistance("embedding", embedding))
+            .filter(distance__lte=max_distance)
+            .order_by("distance")
+            .afirst()
+        )
+    except Exception:
+        # The cache must never break chat; treat lookup failures as misses
+        logger.exception("Semantic cache lookup failed for %s", law.slug)
+        entry = None
+
+    if entry is None:
+        await _aincr(law.slug, "misses")
+        return None
+
+    await _aincr(law.slug, "hits")
+    await LawAnswerCache.objects.filter(pk=entry.pk).aupdate(
+        hit_count=F("hit_count") + 1,
+        last_used_at=timezone.now(),
+    )
+    return entry
+
+
+async def astore_law_answer(law, query, embedding, answer, sources):
+    """Cache an answer and evict expired / least recently used entries."""
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return
+
+    try:
+        await LawAnswerCache.objects.acreate(
+            law=law,
+            query=query,
+            embedding=embedding,
+            answer=answer,
+            **_answer_config(),
+            sources=sources,
+        )
+
+        cutoff = timezone.now() - timedelta(seconds=settings.SEMANTIC_CACHE_TTL)
+        await LawAnswerCache.objects.filter(law=law, created_at__lt=cutoff).adelete()
+
+        keep = [
+            pk async for pk in LawAnswerCache.objects.filter(law=law)
+            .order_by("-last_used_at")
+            .values_list("pk", flat=True)[:settings.SEMANTIC_CACHE_MAX_ENTRIES]
+        ]
+        await LawAnswerCache.objects.filter(law=law).exclude(pk__in=keep).adelete()
+    except Exception:
+        logger.exception("Semantic cache store failed for %s", law.slug)
+
+
+def clear_law_answers(law):
+    """Drop every cached answer for a law (called when it is reseeded)."""
+    LawAnswerCache.objects.filter(law=law).delete()
+
+
+def semantic_cache_stats():
+    """Per-law hit/miss counters and entry counts."""
+    result = {}
+    for slug in EgyptianLaw.objects.values_list("slug", flat=True):
+        hits = cache.get(METRICS_KEY.format(slug=slug, name="hits"), 0)
+        misses = cache.get(METRICS_KEY.format(slug=slug, name="misses"), 0)
+        lookups = hits + misses
+        result[slug] = {
+            "entries": LawAnswerCache.objects.filter(law_id=slug).count(),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+    return result
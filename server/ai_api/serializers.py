@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from .models import (
     Document, DocumentChunk, ChatSession, ChatMessage,
-    EgyptianLaw, EgyptianLawChunk, LawChatSession, LawChatMessage
+    EgyptianLaw, EgyptianLawChunk, LawArticle, LawChatSession, LawChatMessage
 )
 
 
@@ -10,7 +10,23 @@ class DocumentChunkSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = DocumentChunk
-        fields = ['id', 'chunk_index', 'page_number', 'content']
+        fields = ['id', 'chunk_index', 'page_number', 'end_page_number', 'content']
+
+
+class EgyptianLawChunkSerializer(serializers.ModelSerializer):
+    """Serializer for Egyptian law chunks with source citation info."""
+
+    class Meta:
+        model = EgyptianLawChunk
+        fields = ['id', 'chunk_index', 'page_number', 'end_page_number', 'content']
+
+
+class LawArticleSerializer(serializers.ModelSerializer):
+    """Serializer for an indexed Egyptian law article."""
+
+    class Meta:
+        model = LawArticle
+        fields = ['number', 'start_page', 'end_page', 'chunk_ids', 'content']
 
 
 class DocumentSerializer(serializers.ModelSerializer):
@@ -54,8 +70,8 @@ class ChatMessageSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ChatMessage
-        fields = ['id', 'role', 'content', 'sources', 'created_at']
-        read_only_fields = ['id', 'created_at']
+        fields = ['id', 'role', 'content', 'sources', 'prompt_tokens', 'created_at']
+        read_only_fields = ['id', 'prompt_tokens', 'created_at']
 
 
 class ChatSessionSerializer(serializers.ModelSerializer):
@@ -169,13 +185,33 @@ class EgyptianLawListSerializer(serializers.ModelSerializer):
         ]
 
 
+class LawSearchSerializer(serializers.Serializer):
+    """Serializer for cross-law search requests."""
+    query = serializers.CharField(
+        max_length=2000,
+        help_text="The text to search for"
+    )
+    laws = serializers.ListField(
+        child=serializers.SlugField(),
+        required=False,
+        allow_empty=False,
+        help_text="Optional law slugs to search (default: every law the plan allows)"
+    )
+    k = serializers.IntegerField(
+        min_value=1,
+        max_value=50,
+        default=15,
+        help_text="Number of passages to return"
+    )
+
+
 class LawChatMessageSerializer(serializers.ModelSerializer):
     """Serializer for law chat messages."""
 
     class Meta:
         model = LawChatMessage
-        fields = ['id', 'role', 'content', 'sources', 'created_at']
-        read_only_fields = ['id', 'created_at']
+        fields = ['id', 'role', 'content', 'sources', 'prompt_tokens', 'created_at']
+        read_only_fields = ['id', 'prompt_tokens', 'created_at']
 
 
 class LawChatSessionSerializer(serializers.ModelSerializer):
@@ -3,29 +3,201 @@ Celery tasks for DocuMind AI operations.
 
 Tasks:
 - process_pdf_document: Async PDF processing (extraction, chunking, embedding)
+- embed_document_page_range: Embeds one page range of a large document
+- finalize_document: Marks a fanned-out document ready
+- seed_egyptian_laws_task: Seeds the Egyptian laws in the background
 """
-from celery import shared_task
+import logging
+import threading
+import time
+import uuid
+
+from celery import chord, shared_task
+from celery.signals import worker_ready
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
 from django.utils import timezone
-from langchain_community.document_loaders import PyMuPDFLoader, PyPDFLoader
+from langchain_core.documents import Document as LCDocument
 
-from .models import Document, DocumentChunk
+from .models import Document, DocumentChunk, file_content_hash
+from .analysis import invalidate_document_analyses
+from .ingestion import RETRYABLE_ERRORS, ingest_chunks, iter_chunks, iter_pdf_pages
 from .langchain_config import (
+    CHUNK_WRITE_BATCH,
+    INGESTION_TIME_MARGIN,
+    INGESTION_PAGE_RANGE,
+    INGESTION_FANOUT_MIN_PAGES,
     get_text_splitter,
     get_document_vector_store,
+    chunk_vector_id,
+    copy_collection_vectors,
+    update_vector_metadata,
 )
 
+logger = logging.getLogger(__name__)
+
+
+def clone_processed_document(source, doc):
+    """
+    Reuse the chunks and vectors of an identical, already processed PDF.
+    Rows are copied in the database, so no extraction or embedding happens.
+
+    Returns:
+        Number of chunks copied
+    """
+    collection_name = f"document_{doc.id}"
+    source_chunks = list(source.chunks.all())
+    DocumentChunk.objects.bulk_create([
+        DocumentChunk(
+            document=doc,
+            content=chunk.content,
+            chunk_index=chunk.chunk_index,
+            page_number=chunk.page_number,
+            end_page_number=chunk.end_page_number,
+            vector_id=chunk_vector_id(collection_name, chunk.chunk_index),
+        )
+        for chunk in source_chunks
+    ], ignore_conflicts=True)
+    copy_collection_vectors(
+        f"document_{source.id}",
+        collection_name,
+        chunk_indexes=[chunk.chunk_index for chunk in source_chunks],
+        metadata={"document_id": doc.id, "document_title": doc.title},
+    )
+    # Point the copies at the new chunk rows
+    update_vector_metadata({
+        vector_id: {"chunk_id": chunk_id}
+        for chunk_id, vector_id in doc.chunks.values_list('id', 'vector_id')
+    })
+    doc.page_count = source.page_count
+    return len(source_chunks)
+
+
+def extract_document_chunks(doc):
+    """
+    Stream the PDF page by page through sanitize and split, storing the
+    chunks in blocks of CHUNK_WRITE_BATCH rows, so memory does not grow
+    with the document size.
+
+    Chunks and page_count are committed together, so a set page_count
+    marks extraction as done and a retried task skips straight to
+    embedding. Chunk rows are unique per (document, chunk_index), so
+    re-running extraction never duplicates them.
+    """
+    page_count = 0
+
+    def sanitized_pages():
+        nonlocal page_count
+        for page in iter_pdf_pages(doc.file.path):
+            page_count += 1
+            # Remove NUL bytes that PostgreSQL can't handle
+            page.page_content = page.page_content.replace('\x00', '')
+            yield page
+
+    rows = []
+    try:
+        with transaction.atomic():
+            for i, chunk in enumerate(iter_chunks(sanitized_pages(), get_text_splitter())):
+                page = chunk.metadata.get('page', 0)
+                rows.append(DocumentChunk(
+                    document=doc,
+                    content=chunk.page_content,
+                    chunk_index=i,
+                    page_number=page + 1,  # 1-indexed
+                    end_page_number=chunk.metadata.get('end_page', page) + 1,
+                ))
+                if len(rows) >= CHUNK_WRITE_BATCH:
+                    DocumentChunk.objects.bulk_create(rows, ignore_conflicts=True)
+                    rows = []
+            DocumentChunk.objects.bulk_create(rows, ignore_conflicts=True)
+
+            doc.page_count = page_count
+            doc.save(update_fields=['page_count'])
+    except KeyError as ke:
+        # pypdf raises KeyError('bbox') on corrupted fonts
+        if 'bbox' in str(ke):
+            raise Exception(
+                "PDF parsing failed. The PDF might have corrupted fonts or non-standard formatting. "
+                "Please try re-saving the PDF or converting it to a standard format."
+            ) from ke
+        raise
+
+
+def embed_pending_chunks(doc, deadline, first_page=None, last_page=None):
+    """
+    Embed the chunks that have no vector yet, optionally limited to a
+    page range (inclusive, 1-indexed) when processing is fanned out.
+
+    Rows are streamed from the database, so only the batches in flight
+    are held in memory. Each written batch is checkpointed by storing its
+    vector ids on the chunk rows, so a retry only embeds what is left.
+    Vector ids are deterministic, so a batch written but not checkpointed
+    is upserted.
+
+    Returns:
+        dict: Ingestion stats (see ingest_chunks)
+    """
+    collection_name = f"document_{doc.id}"
+    pending = doc.chunks.filter(vector_id__isnull=True)
+    if first_page is not None:
+        pending = pending.filter(page_number__gte=first_page, page_number__lte=last_page)
 
-@shared_task(bind=True, name='ai_api.process_pdf_document')
+    # chunk_index -> row id, for chunks handed to the pipeline but not yet checkpointed
+    in_flight = {}
+
+    def chunks():
+        for chunk in pending.order_by('chunk_index').iterator(chunk_size=CHUNK_WRITE_BATCH):
+            in_flight[chunk.chunk_index] = chunk.pk
+            yield LCDocument(
+                page_content=chunk.content,
+                metadata={
+                    "document_id": doc.id,
+                    "document_title": doc.title,
+                    "chunk_id": chunk.pk,
+                    "chunk_index": chunk.chunk_index,
+                    "page_number": chunk.page_number,
+                    "end_page_number": chunk.end_page_number,
+                },
+            )
+
+    def vector_id(chunk):
+        return chunk_vector_id(collection_name, chunk.metadata["chunk_index"])
+
+    def checkpoint(batch):
+        DocumentChunk.objects.bulk_update(
+            [
+                DocumentChunk(
+                    pk=in_flight.pop(chunk.metadata["chunk_index"]),
+                    vector_id=vector_id(chunk),
+                )
+                for chunk in batch
+            ],
+            ['vector_id'],
+        )
+
+    vector_store = get_document_vector_store(doc.id)
+    return ingest_chunks(
+        vector_store, chunks(), vector_id=vector_id, on_batch=checkpoint, deadline=deadline
+    )
+
+
+@shared_task(bind=True, name='ai_api.process_pdf_document', max_retries=5)
 def process_pdf_document(self, document_id):
     """
     Process a PDF document asynchronously.
 
     Steps:
-    1. Load PDF from file system
-    2. Extract text and page count
-    3. Split into chunks
-    4. Generate embeddings and store in vector DB
-    5. Update document status
+    0. Reuse chunks/vectors if an identical PDF was already processed
+    1. Load PDF, split into chunks and store them (skipped when resuming)
+    2. Generate embeddings in checkpointed batches and store in vector DB;
+       documents of INGESTION_FANOUT_MIN_PAGES pages or more are handed
+       to a chord of per-page-range subtasks instead
+    3. Update document status
+
+    Work stops before CELERY_TASK_TIME_LIMIT and the task re-enqueues
+    itself to continue; rate-limit failures are retried the same way.
 
     Args:
         document_id: ID of the Document model instance
@@ -33,82 +205,85 @@ def process_pdf_document(self, document_id):
     Returns:
         dict: Processing result with status and metadata
     """
+    deadline = time.monotonic() + settings.CELERY_TASK_TIME_LIMIT - INGESTION_TIME_MARGIN
+
     try:
         # Get document
         doc = Document.objects.get(id=document_id)
         doc.status = 'processing'
         doc.save(update_fields=['status'])
 
-        # Load PDF with fallback mechanism
-        # Try PyMuPDFLoader first (more robust), fallback to PyPDFLoader
-        try:
-            loader = PyMuPDFLoader(doc.file.path)
-            pages = loader.load()
-        except Exception as e:
-            # Fallback to PyPDFLoader if PyMuPDF fails
-            print(f"PyMuPDFLoader failed, trying PyPDFLoader: {e}")
-            try:
-                loader = PyPDFLoader(doc.file.path)
-                pages = loader.load()
-            except KeyError as ke:
-                # If we get KeyError (bbox issue), try with extraction mode
-                if 'bbox' in str(ke):
-                    raise Exception(
-                        "PDF parsing failed. The PDF might have corrupted fonts or non-standard formatting. "
-                        "Please try re-saving the PDF or converting it to a standard format."
-                    ) from ke
-                raise
-
-        # Update page count
-        doc.page_count = len(pages)
-
-        # Sanitize text content - remove NUL bytes that PostgreSQL can't handle
-        for page in pages:
-            page.page_content = page.page_content.replace('\x00', '')
+        # Stored summaries/clause analyses describe the previous content
+        invalidate_document_analyses(doc)
+
+        if not doc.content_hash:
+            doc.content_hash = file_content_hash(doc.file)
+            doc.save(update_fields=['content_hash'])
+
+        resuming = doc.page_count is not None and doc.chunks.exists()
 
-        # Split into chunks
-        text_splitter = get_text_splitter()
-        chunks = text_splitter.split_documents(pages)
-
-        # Add metadata to chunks and save to database
-        chunk_objects = []
-        for i, chunk in enumerate(chunks):
-            # Sanitize chunk content as well
-            chunk.page_content = chunk.page_content.replace('\x00', '')
-
-            page_num = chunk.metadata.get('page', 0) + 1  # 1-indexed
-            chunk.metadata.update({
-                "document_id": doc.id,
-                "document_title": doc.title,
-                "chunk_index": i,
-                "page_number": page_num,
-            })
-
-            # Prepare chunk object for bulk create
-            chunk_objects.append(DocumentChunk(
-                document=doc,
-                content=chunk.page_content,
-                chunk_index=i,
-                page_number=page_num,
-            ))
-
-        # Bulk create chunks for better performance
-        DocumentChunk.objects.bulk_create(chunk_objects)
-
-        # Store in vector database
-        vector_store = get_document_vector_store(doc.id)
-        vector_store.add_documents(chunks)
+        # Identical PDF already processed (by this or another user): copy it
+        source = None if resuming else Document.objects.filter(
+            content_hash=doc.content_hash, status='ready'
+        ).exclude(id=doc.id).order_by('-processed_at').first()
+        if source is not None:
+            chunk_count = clone_processed_document(source, doc)
+
+            doc.status = 'ready'
+            doc.processed_at = timezone.now()
+            doc.save(update_fields=['status', 'processed_at', 'page_count'])
+
+            return {
+                'status': 'success',
+                'document_id': doc.id,
+                'page_count': doc.page_count,
+                'chunk_count': chunk_count,
+                'cloned_from': source.id,
+            }
+
+        if not resuming:
+            extract_document_chunks(doc)
+
+        # Large documents: embed page ranges in parallel across workers
+        ranges = pending_page_ranges(doc)
+        if doc.page_count >= INGESTION_FANOUT_MIN_PAGES and ranges:
+            chord(
+                embed_document_page_range.s(doc.id, first, last)
+                for first, last in ranges
+            )(
+                finalize_document.s(doc.id).on_error(mark_document_failed.si(doc.id))
+            )
+            return {
+                'status': 'fanned_out',
+                'document_id': doc.id,
+                'page_count': doc.page_count,
+                'page_ranges': len(ranges),
+            }
+
+        # Embed in checkpointed batches and store in vector database
+        ingestion = embed_pending_chunks(doc, deadline)
+
+        if not ingestion['complete']:
+            # Out of time: continue in a fresh task from the last checkpoint
+            process_pdf_document.apply_async((doc.id,))
+            return {
+                'status': 'continued',
+                'document_id': doc.id,
+                'embedded_chunks': ingestion['chunks'],
+                'chunks_per_second': ingestion['chunks_per_second'],
+            }
 
         # Mark as ready
         doc.status = 'ready'
         doc.processed_at = timezone.now()
-        doc.save(update_fields=['status', 'processed_at', 'page_count'])
+        doc.save(update_fields=['status', 'processed_at'])
 
         return {
             'status': 'success',
             'document_id': doc.id,
             'page_count': doc.page_count,
-            'chunk_count': len(chunks),
+            'chunk_count': doc.chunks.count(),
+            'chunks_per_second': ingestion['chunks_per_second'],
         }
 
     except Document.DoesNotExist:
@@ -117,6 +292,13 @@ def process_pdf_document(self, document_id):
             'error': f'Document {document_id} not found'
         }
 
+    except RETRYABLE_ERRORS as e:
+        # Rate limited beyond the in-task backoff: resume later from the checkpoint
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=60 * (self.request.retries + 1))
+        Document.objects.filter(id=document_id).update(status='failed')
+        raise
+
     except Exception as e:
         # Mark document as failed
         try:
@@ -128,3 +310,176 @@ def process_pdf_document(self, document_id):
 
         # Re-raise for Celery to handle
         raise
+
+
+def pending_page_ranges(doc):
+    """
+    Page ranges (inclusive) that still have chunks without vectors,
+    INGESTION_PAGE_RANGE pages each.
+    """
+    pages = doc.chunks.filter(vector_id__isnull=True).values_list('page_number', flat=True)
+    starts = sorted({
+        (page - 1) // INGESTION_PAGE_RANGE * INGESTION_PAGE_RANGE + 1
+        for page in pages
+    })
+    return [(start, start + INGESTION_PAGE_RANGE - 1) for start in starts]
+
+
+@shared_task(bind=True, name='ai_api.embed_document_page_range', max_retries=None)
+def embed_document_page_range(self, document_id, first_page, last_page):
+    """
+    Embed the pending chunks of one page range of a document.
+
+    Runs inside a chord started by process_pdf_document. If the time
+    budget runs out, the task retries itself and resumes from its last
+    checkpointed batch, so the chord only completes once the range is done.
+
+    Returns:
+        dict: Range and ingestion stats
+    """
+    deadline = time.monotonic() + settings.CELERY_TASK_TIME_LIMIT - INGESTION_TIME_MARGIN
+    doc = Document.objects.get(id=document_id)
+
+    try:
+        ingestion = embed_pending_chunks(doc, deadline, first_page, last_page)
+    except RETRYABLE_ERRORS as e:
+        raise self.retry(exc=e, countdown=60, max_retries=5)
+
+    if not ingestion['complete']:
+        raise self.retry(countdown=1)
+
+    return {
+        'first_page': first_page,
+        'last_page': last_page,
+        'chunks': ingestion['chunks'],
+        'chunks_per_second': ingestion['chunks_per_second'],
+    }
+
+
+@shared_task(name='ai_api.finalize_document')
+def finalize_document(range_results, document_id):
+    """
+    Chord callback: mark a fanned-out document ready once every range is embedded.
+
+    Chunk order (chunk_index) and page_count were fixed at extraction, so
+    only the final status is assembled here.
+    """
+    doc = Document.objects.get(id=document_id)
+
+    if doc.chunks.filter(vector_id__isnull=True).exists():
+        # A range finished without covering every chunk: resume processing
+        process_pdf_document.delay(doc.id)
+        return {'status': 'continued', 'document_id': doc.id}
+
+    doc.status = 'ready'
+    doc.processed_at = timezone.now()
+    doc.save(update_fields=['status', 'processed_at'])
+
+    return {
+        'status': 'success',
+        'document_id': doc.id,
+        'page_count': doc.page_count,
+        'chunk_count': doc.chunks.count(),
+        'page_ranges': len(range_results),
+        'embedded_chunks': sum(r['chunks'] for r in range_results),
+    }
+
+
+@shared_task(name='ai_api.mark_document_failed')
+def mark_document_failed(document_id):
+    """Chord error callback: a page range failed for good."""
+    Document.objects.filter(id=document_id).update(status='failed')
+
+
+LAW_SEED_LOCK = "seed_egyptian_laws:lock"
+LAW_SEED_PROGRESS = "seed_egyptian_laws:progress:{slug}"
+
+
+def report_law_seed_progress(slug, **progress):
+    """
+    Publish a law's seeding progress.
+    Called by seed_egyptian_laws as it goes, read by the law status endpoint.
+    """
+    cache.set(LAW_SEED_PROGRESS.format(slug=slug), progress, timeout=settings.LAW_SEED_LOCK_TIMEOUT)
+
+
+def refresh_law_seed_lock(token):
+    """Extend the seeding lock if the run holding `token` still owns it."""
+    if cache.get(LAW_SEED_LOCK) != token:
+        return False
+    return cache.touch(LAW_SEED_LOCK, settings.LAW_SEED_LOCK_TIMEOUT)
+
+
+def hold_law_seed_lock(token, stop):
+    """
+    Heartbeat keeping the seeding lock alive until `stop` is set, however
+    long a single step (parsing a large PDF, building the HNSW index)
+    takes. Stops as soon as the lock belongs to another run.
+    """
+    while not stop.wait(settings.LAW_SEED_LOCK_TIMEOUT / 5):
+        if not refresh_law_seed_lock(token):
+            logger.warning("Law seeding lock lost; another run may be seeding")
+            return
+
+
+def clear_law_seed_progress(slug):
+    """Drop a law's progress once it is seeded (or failed)."""
+    cache.delete(LAW_SEED_PROGRESS.format(slug=slug))
+
+
+def get_law_seed_progress(slug):
+    """Current seeding progress of a law, or None when it is not being seeded."""
+    return cache.get(LAW_SEED_PROGRESS.format(slug=slug))
+
+
+def law_seeding_in_progress():
+    """Whether a worker currently holds the seeding lock."""
+    return cache.get(LAW_SEED_LOCK) is not None
+
+
+@shared_task(
+    bind=True,
+    name='ai_api.seed_egyptian_laws',
+    max_retries=None,
+    time_limit=settings.LAW_SEED_TIME_LIMIT,
+    ignore_result=True,
+)
+def seed_egyptian_laws_task(self, force=False, law=None):
+    """
+    Seed the Egyptian laws (see the seed_egyptian_laws command) under a
+    distributed lock, so only one worker seeds at a time however many
+    workers start.
+
+    A heartbeat thread refreshes the lock while this run works (including
+    the final vector_index build), so it only expires LAW_SEED_LOCK_TIMEOUT
+    after the worker died. If it is held, the task retries once it could have expired: either the
+    running seed finished (and the retry only confirms every law is ready)
+    or its worker died and the retry picks up the unfinished laws.
+    """
+    token = uuid.uuid4().hex
+    if not cache.add(LAW_SEED_LOCK, token, timeout=settings.LAW_SEED_LOCK_TIMEOUT):
+        raise self.retry(countdown=settings.LAW_SEED_LOCK_TIMEOUT)
+
+    stop = threading.Event()
+    threading.Thread(target=hold_law_seed_lock, args=(token, stop), daemon=True).start()
+    try:
+        call_command(
+            'seed_egyptian_laws',
+            force=force,
+            law=law,
+            workers=settings.LAW_SEED_WORKERS,
+            with_analysis=settings.SEED_LAW_ANALYSES,
+        )
+        # On a fresh database the vector table only exists once laws are stored
+        call_command('vector_index')
+    finally:
+        stop.set()
+        if cache.get(LAW_SEED_LOCK) == token:
+            cache.delete(LAW_SEED_LOCK)
+
+
+@worker_ready.connect
+def seed_laws_on_worker_start(sender, **kwargs):
+    """Queue law seeding when a worker starts; already seeded laws are skipped."""
+    if settings.SEED_LAWS_ON_STARTUP:
+        seed_egyptian_laws_task.delay()
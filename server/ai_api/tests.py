@@ -1,3 +1,444 @@
-from django.test import TestCase
+from io import StringIO
+from unittest.mock import Mock, patch
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from langchain_core.documents import Document as LCDocument
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from accounts.models import Plan, EgyptianLawSelection
+from .management.commands.seed_egyptian_laws import Command as SeedLawsCommand
+from .models import (
+    ChatMessage, Document, EgyptianLaw, EgyptianLawChunk, LawAnswerCache, LawArticle,
+)
+from .langchain_config import HYBRID_RETRIEVAL_K, CachedEmbeddings, get_chain_cache
+from .law_articles import parse_articles
+from .text_splitters import LegalTextSplitter
+
+
+class CountingEmbeddings(DeterministicFakeEmbedding):
+    """Fake embeddings that count how many queries were embedded."""
+    query_calls: int = 0
+
+    def embed_query(self, text):
+        self.query_calls += 1
+        return super().embed_query(text)
+
+
+async def read_stream(content):
+    """Body of a streaming response with an async iterator."""
+    return b"".join([part async for part in content]).decode()
+
+
+def make_vector_store(collection_name):
+    """In-memory stand-in for a PGVector collection."""
+    embeddings = CountingEmbeddings(size=16)
+    store = InMemoryVectorStore(embeddings)
+    store.add_documents([
+        LCDocument(
+            page_content=f"Clause {i}: termination requires thirty days notice.",
+            metadata={"page_number": i + 1, "chunk_index": i},
+        )
+        for i in range(20)
+    ])
+    store.collection_name = collection_name
+    embeddings.query_calls = 0
+    return store
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    HYBRID_RETRIEVAL_ENABLED=False,
+)
+class SingleRetrievalTests(TestCase):
+    """Each chat request must embed the query and search the store once."""
+
+    def setUp(self):
+        get_chain_cache().invalidate()
+        self.user = get_user_model().objects.create_user(
+            email="reader@example.com", username="reader", password="pass12345"
+        )
+        standard, _ = Plan.objects.get_or_create(
+            name="standard",
+            defaults={"display_name": "Standard", "max_egyptian_laws": 2},
+        )
+        self.user.subscription.plan = standard
+        self.user.subscription.save()
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.llm = FakeListChatModel(responses=["Thirty days notice is required."])
+        llm_patcher = patch("ai_api.langchain_config.get_llm", return_value=self.llm)
+        llm_patcher.start()
+        self.addCleanup(llm_patcher.stop)
+
+    def tearDown(self):
+        get_chain_cache().invalidate()
+
+    def test_document_chat_embeds_query_once(self):
+        doc = Document.objects.create(
+            user=self.user, title="Lease", file="documents/lease.pdf", status="ready"
+        )
+        store = make_vector_store(f"document_{doc.id}")
+
+        with patch("ai_api.views.get_document_vector_store", return_value=store):
+            response = self.client.post(
+                f"/api/ai/documents/{doc.id}/chat/",
+                {"query": "How do I terminate?"},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(store.embeddings.query_calls, 1)
+        self.assertEqual(len(response.data["sources"]), 15)
+
+    def test_document_chat_packs_context_into_token_budget(self):
+        doc = Document.objects.create(
+            user=self.user, title="Lease", file="documents/lease.pdf", status="ready"
+        )
+        store = make_vector_store(f"document_{doc.id}")
+
+        with override_settings(CONTEXT_TOKEN_BUDGET=60), \
+                patch("ai_api.views.get_document_vector_store", return_value=store):
+            response = self.client.post(
+                f"/api/ai/documents/{doc.id}/chat/",
+                {"query": "How do I terminate?"},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertLess(len(response.data["sources"]), 15)
+        message = ChatMessage.objects.get(pk=response.data["message_id"])
+        self.assertGreater(message.prompt_tokens, 60)
+
+    def test_law_chat_embeds_query_once(self):
+        law = EgyptianLaw.objects.create(
+            slug="labor-law", title_en="Labor Law", title_ar="قانون العمل",
+            file_path="labor.pdf", status="ready",
+        )
+        EgyptianLawSelection.objects.create(subscription=self.user.subscription, law=law)
+        store = make_vector_store(law.collection_name)
+
+        with patch("ai_api.views.get_law_vector_store", return_value=store):
+            response = self.client.post(
+                f"/api/ai/laws/{law.slug}/chat/",
+                {"query": "What notice is required?"},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(store.embeddings.query_calls, 1)
+        self.assertTrue(response.data["sources"])
+
+    def test_hybrid_law_chat_includes_lexical_hit(self):
+        law = EgyptianLaw.objects.create(
+            slug="labor-law", title_en="Labor Law", title_ar="قانون العمل",
+            file_path="labor.pdf", status="ready",
+        )
+        EgyptianLawSelection.objects.create(subscription=self.user.subscription, law=law)
+        store = make_vector_store(law.collection_name)
+        article = LCDocument(
+            page_content="مادة 52: يلتزم صاحب العمل بإخطار العامل قبل إنهاء العقد.",
+            metadata={"law_slug": law.slug, "chunk_id": 52, "chunk_index": 99, "page_number": 30},
+        )
+
+        with override_settings(HYBRID_RETRIEVAL_ENABLED=True), \
+                patch("ai_api.views.get_law_vector_store", return_value=store), \
+                patch("ai_api.langchain_config.lexical_search", return_value=[article]) as lexical:
+            response = self.client.post(
+                f"/api/ai/laws/{law.slug}/chat/",
+                {"query": "ما نص المادة 52؟"},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(store.embeddings.query_calls, 1)
+        lexical.assert_called_once()
+        self.assertIn(52, [source["chunk_id"] for source in response.data["sources"]])
+        self.assertEqual(len(response.data["sources"]), HYBRID_RETRIEVAL_K)
+
+    def test_law_chat_stream_uses_semantic_answer_cache(self):
+        law = EgyptianLaw.objects.create(
+            slug="labor-law", title_en="Labor Law", title_ar="قانون العمل",
+            file_path="labor.pdf", status="ready",
+        )
+        EgyptianLawSelection.objects.create(subscription=self.user.subscription, law=law)
+        store = make_vector_store(law.collection_name)
+
+        def stream():
+            response = self.client.post(
+                f"/api/ai/laws/{law.slug}/chat/stream/",
+                {"query": "What notice is required?"},
+                format="json",
+            )
+            self.assertEqual(response.status_code, 200)
+            return async_to_sync(read_stream)(response.streaming_content)
+
+        # Miss: the generated answer is streamed and cached
+        with patch("ai_api.views.get_law_vector_store", return_value=store), \
+                patch("ai_api.views.alookup_law_answer", return_value=None), \
+                patch("ai_api.views.astore_law_answer") as store_answer:
+            body = stream()
+        self.assertIn("event: done", body)
+        store_answer.assert_awaited_once()
+        self.assertEqual(store_answer.await_args.args[3], "Thirty days notice is required.")
+
+        # Hit: the cached answer is streamed without calling the model
+        cached = LawAnswerCache(answer="Cached: thirty days.", sources=[{"chunk_id": 3}])
+        with patch("ai_api.views.get_law_vector_store", return_value=store), \
+                patch("ai_api.views.alookup_law_answer", return_value=cached), \
+                patch("ai_api.views.get_egyptian_law_rag_chain") as get_chain:
+            body = stream()
+        get_chain.assert_not_called()
+        self.assertIn("Cached: thirty days.", body)
+        self.assertEqual(store.embeddings.query_calls, 2)
+
+    def test_law_chat_answers_article_lookup_from_index(self):
+        law = EgyptianLaw.objects.create(
+            slug="labor-law", title_en="Labor Law", title_ar="قانون العمل",
+            file_path="labor.pdf", status="ready",
+        )
+        EgyptianLawSelection.objects.create(subscription=self.user.subscription, law=law)
+        LawArticle.objects.create(
+            law=law, number=52, start_page=30, end_page=30, chunk_ids=[7],
+            content="مادة 52 يلتزم صاحب العمل بإخطار العامل قبل إنهاء العقد.",
+        )
+        store = make_vector_store(law.collection_name)
+
+        with patch("ai_api.views.get_law_vector_store", return_value=store) as get_store:
+            response = self.client.post(
+                f"/api/ai/laws/{law.slug}/chat/",
+                {"query": "ما نص المادة ٥٢؟"},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200, response.content)
+        get_store.assert_not_called()
+        self.assertIn("يلتزم صاحب العمل", response.data["answer"])
+        self.assertEqual(response.data["sources"][0]["chunk_id"], 7)
+
+        with patch("ai_api.views.get_law_vector_store", return_value=store):
+            response = self.client.post(
+                f"/api/ai/laws/{law.slug}/chat/",
+                {"query": "ما نص المادة 52 من قانون العقوبات؟"},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(store.embeddings.query_calls, 1)
+        self.assertEqual(response.data["answer"], "Thirty days notice is required.")
+
+
+class FakeAsyncRedis:
+    """Dict-backed stand-in for the asyncio Redis client."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def pipeline(self, transaction=True):
+        return FakeAsyncPipeline(self)
+
+
+class FakeAsyncPipeline:
+    """Pipeline of FakeAsyncRedis: commands queue until execute()."""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.commands = {}
+
+    def set(self, key, value, ex=None):
+        self.commands[key] = value
+        return self
+
+    async def execute(self):
+        self.client.data.update(self.commands)
+
+
+class AsyncEmbeddingCacheTests(TestCase):
+    """The async embedding path caches through the asyncio Redis client."""
+
+    def test_async_embeddings_do_not_use_sync_redis_client(self):
+        sync_client = Mock()
+        async_client = FakeAsyncRedis()
+        embeddings = CachedEmbeddings(
+            CountingEmbeddings(size=8), model="test", dimensions=8,
+            client=sync_client, async_client=lambda: async_client,
+        )
+
+        async def embed():
+            first = await embeddings.aembed_query("نص المادة 52")
+            second = await embeddings.aembed_query("نص  المادة 52")
+            documents = await embeddings.aembed_documents(["نص المادة 52", "مادة 53", "مادة 53"])
+            return first, second, documents
+
+        first, second, documents = async_to_sync(embed)()
+
+        self.assertEqual(sync_client.mock_calls, [])
+        self.assertEqual(embeddings.embeddings.query_calls, 1)
+        self.assertAlmostEqual(first[0], second[0], places=5)
+        self.assertEqual(documents[0], second)
+        self.assertEqual(documents[1], documents[2])
+        self.assertEqual((embeddings.hits, embeddings.misses), (2, 2))
+        self.assertEqual(len(async_client.data), 2)
+
+
+class FakeLawVectorStore:
+    """Vector store stand-in recording the vectors written by ingest_chunks."""
+
+    def __init__(self):
+        self.embeddings = DeterministicFakeEmbedding(size=8)
+        self.vectors = {}  # vector id -> metadata
+        self.fail_from_index = None  # write, then fail, batches reaching this chunk_index
+
+    def add_embeddings(self, texts, embeddings, metadatas, ids):
+        self.vectors.update({id: dict(metadata) for id, metadata in zip(ids, metadatas)})
+        if self.fail_from_index is not None and any(
+            metadata["chunk_index"] >= self.fail_from_index for metadata in metadatas
+        ):
+            raise RuntimeError("embedding API down")
+
+    def delete(self, ids):
+        for id in ids:
+            self.vectors.pop(id, None)
+
+    def update_metadata(self, updates):
+        for id, metadata in updates.items():
+            self.vectors[id].update(metadata)
+
+    def delete_chunks(self, collection_name, chunk_ids):
+        for id, metadata in list(self.vectors.items()):
+            if metadata.get("chunk_id") in chunk_ids:
+                del self.vectors[id]
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class LawReseedTests(TestCase):
+    """Reseeding a law only embeds new chunks and recovers from partial runs."""
+
+    def setUp(self):
+        self.law = EgyptianLaw.objects.create(
+            slug="labor-law", title_en="Labor Law", title_ar="قانون العمل",
+            file_path="labor.pdf", status="processing",
+        )
+        self.store = FakeLawVectorStore()
+        module = "ai_api.management.commands.seed_egyptian_laws"
+        for name, value in (
+            ("get_law_vector_store", lambda slug: self.store),
+            ("update_vector_metadata", self.store.update_metadata),
+            ("delete_chunk_vectors", self.store.delete_chunks),
+        ):
+            patcher = patch(f"{module}.{name}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def seed(self, texts, cleanup=True):
+        command = SeedLawsCommand(stdout=StringIO(), stderr=StringIO())
+        command.rebuild = False
+        chunks = [
+            LCDocument(page_content=text, metadata={"page": i, "total_pages": len(texts)})
+            for i, text in enumerate(texts)
+        ]
+        command.store_law(self.law, chunks, cleanup)
+        self.law.refresh_from_db()
+        return {row.content: row for row in EgyptianLawChunk.objects.filter(law=self.law)}
+
+    def embedded_texts(self, rows):
+        ids = {id for id, metadata in self.store.vectors.items()}
+        return sorted(content for content, row in rows.items() if row.vector_id in ids)
+
+    def test_reseed_diffs_chunks_and_resumes_partial_run(self):
+        rows = self.seed(["مادة 1 alpha", "مادة 2 beta", "مادة 3 gamma"], cleanup=False)
+        first_ids = {content: row.vector_id for content, row in rows.items()}
+
+        # alpha unchanged, gamma moved, delta new, beta removed
+        written = []
+        add_embeddings = self.store.add_embeddings
+        with patch.object(self.store, "add_embeddings",
+                          lambda **kw: written.extend(kw["metadatas"]) or add_embeddings(**kw)):
+            rows = self.seed(["مادة 1 alpha", "مادة 3 gamma", "مادة 4 delta"])
+
+        self.assertEqual(self.law.status, "ready")
+        self.assertEqual([metadata["chunk_index"] for metadata in written], [2])
+        self.assertEqual(sorted(rows), ["مادة 1 alpha", "مادة 3 gamma", "مادة 4 delta"])
+        self.assertEqual(rows["مادة 1 alpha"].vector_id, first_ids["مادة 1 alpha"])
+        self.assertEqual(rows["مادة 3 gamma"].vector_id, first_ids["مادة 3 gamma"])
+        self.assertEqual(rows["مادة 3 gamma"].chunk_index, 1)
+        self.assertEqual(self.store.vectors[first_ids["مادة 3 gamma"]]["chunk_index"], 1)
+        self.assertNotIn(first_ids["مادة 2 beta"], self.store.vectors)
+        self.assertEqual(len(self.store.vectors), 3)
+
+        # A run failing after writing the vectors of new chunks, before the checkpoint
+        texts = ["مادة 1 alpha", "مادة 3 gamma", "مادة 4 delta", "مادة 5 epsilon"]
+        self.store.fail_from_index = 3
+        rows = self.seed(texts)
+        self.assertEqual(self.law.status, "failed")
+        self.assertIsNone(rows["مادة 5 epsilon"].vector_id)
+
+        self.store.fail_from_index = None
+        rows = self.seed(texts)
+        self.assertEqual(self.law.status, "ready")
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(self.embedded_texts(rows), sorted(texts))
+        self.assertEqual(len(self.store.vectors), 4)
+        epsilon = self.store.vectors[rows["مادة 5 epsilon"].vector_id]
+        self.assertEqual(epsilon["chunk_id"], rows["مادة 5 epsilon"].id)
+
+
+class LegalTextSplitterTests(TestCase):
+    """Chunks of page streams cite the pages they span."""
+
+    def test_chunk_crossing_page_break_records_end_page(self):
+        pages = [
+            LCDocument(page_content="مادة 1 يعمل بهذا القانون في جميع أنحاء الجمهورية ويستمر نص",
+                       metadata={"page": 0}),
+            LCDocument(page_content="المادة الأولى في الصفحة التالية. مادة 2 نص المادة الثانية.",
+                       metadata={"page": 1}),
+        ]
+
+        chunks = list(LegalTextSplitter(chunk_size=30, chunk_overlap=0).split_pages(pages))
+
+        spans = {chunk.page_content: (chunk.metadata["page"], chunk.metadata["end_page"]) for chunk in chunks}
+        self.assertEqual(spans["مادة 1 يعمل بهذا القانون في"], (0, 0))
+        self.assertEqual(spans["نص\nالمادة الأولى في الصفحة"], (0, 1))
+        self.assertEqual(spans["مادة 2 نص المادة الثانية."], (1, 1))
+
+
+class LawArticleIndexTests(TestCase):
+    """Article parsing and lookups against the article index."""
+
+    def test_body_articles_restarting_after_issuance_articles_are_indexed(self):
+        chunks = [
+            (1, 0, "قانون رقم 12 لسنة 2003 مادة 1 يعمل بأحكام القانون المرافق."),
+            (2, 0, "مادة 2 ينشر هذا القرار في الجريدة الرسمية."),
+            (3, 1, "قانون العمل الباب الأول تعريفات مادة 1 يقصد بالعامل كل شخص طبيعي."),
+            (4, 2, "مادة 2 يلتزم صاحب العمل بإخطار العامل وفقا لأحكام المادة 1 من هذا القانون."),
+            (5, 2, "مادة 3 تسري أحكام هذا القانون على جميع العاملين."),
+        ]
+
+        articles = parse_articles(chunks)
+
+        self.assertEqual([article["number"] for article in articles], [1, 2, 3])
+        self.assertIn("يقصد بالعامل", articles[0]["content"])
+        self.assertEqual(articles[0]["chunk_ids"], [3])
+        self.assertIn("المادة 1 من هذا القانون", articles[1]["content"])
@@ -0,0 +1,82 @@
+"""
+Arabic text normalization shared by law seeding and lexical search.
+
+normalize_arabic() is applied to law text before it is chunked and stored.
+normalize_search_text() additionally folds letter variants and digits so
+a query matches however the PDF spelled a word or an article number; the
+SEARCH_TEXT_FUNCTION Postgres function (migration 0011) applies the same
+steps to chunk content inside the full-text indexes.
+"""
+import re
+import unicodedata
+
+ARABIC_DIACRITICS = re.compile(r"[\u064B-\u065F\u0670]")
+
+# Alef/yaa/taa marbuta variants and Arabic-Indic digits; tatweel is dropped
+SEARCH_FOLDING = str.maketrans(
+    "أإآىة٠١٢٣٤٥٦٧٨٩",
+    "ااايه0123456789",
+    "ـ",
+)
+
+# Postgres mirror of normalize_search_text(), used by the full-text indexes
+SEARCH_TEXT_FUNCTION = "legalmind_search_text"
+
+# Attached clitics stripped from query terms ("والعامل" -> "عامل")
+ARABIC_PREFIXES = ("وال", "بال", "فال", "كال", "لل", "ال")
+
+# Function words that match nearly every chunk (in normalize_search_text form)
+STOPWORDS = {
+    "في", "من", "علي", "الي", "عن", "مع", "ما", "ماذا", "هل", "هو", "هي", "هم",
+    "او", "ان", "التي", "الذي", "الذين", "هذا", "هذه", "ذلك", "تلك", "كل", "اي",
+    "كيف", "متي", "اين", "لا", "لم", "لن", "قد", "به", "بها", "له", "لها", "عند",
+    "the", "a", "an", "of", "in", "on", "to", "for", "and", "or", "is", "are",
+    "what", "which", "how", "when", "who", "does", "do", "can", "with", "by", "be",
+}
+
+
+def normalize_arabic(text: str) -> str:
+    """
+    Normalize Arabic text by:
+    1. Converting Presentation Forms to standard Arabic (NFKC normalization)
+    2. Removing diacritics/tashkeel for better matching
+    3. Normalizing whitespace
+    """
+    # NFKC normalization converts presentation forms to standard Arabic
+    text = unicodedata.normalize("NFKC", text)
+
+    # Remove Arabic diacritics (tashkeel) - helps matching
+    text = ARABIC_DIACRITICS.sub("", text)
+
+    # Normalize whitespace
+    text = " ".join(text.split())
+
+    return text
+
+
+def normalize_search_text(text: str) -> str:
+    """normalize_arabic() plus letter variant and digit folding, lowercased."""
+    return normalize_arabic(text).translate(SEARCH_FOLDING).lower()
+
+
+def search_terms(query: str) -> list[str]:
+    """
+    Lexical search terms of a query: normalized words minus stopwords,
+    plus each Arabic word without and with its definite article so
+    "مادة" matches "المادة" (and the reverse).
+    """
+    terms = []
+    for word in re.findall(r"[^\W_]+", normalize_search_text(query)):
+        if word in STOPWORDS or (len(word) < 2 and not word.isdigit()):
+            continue
+        variants = [word]
+        for prefix in ARABIC_PREFIXES:
+            if word.startswith(prefix) and len(word) - len(prefix) >= 2:
+                variants.append(word[len(prefix):])
+                break
+        if re.match(r"[\u0621-\u064A]", word):
+            variants.append("ال" + variants[-1])
+        for variant in variants:
+            if variant not in terms:
+                terms.append(variant)
+    return terms
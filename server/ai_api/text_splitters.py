@@ -0,0 +1,190 @@
+"""
+Legal-structure text splitter for laws and uploaded contracts.
+
+Text is cut into structural units at headers (Arabic مادة / باب / فصل /
+كتاب / قسم, English Article / Section / Clause / Chapter and numbered
+clause lines), then consecutive units are packed into chunks of up to
+chunk_size tokens. A chunk never ends mid-article unless the article alone
+exceeds chunk_size; only such oversized units are split further (at
+sentence boundaries, with overlap). Chapter-level headers always start a
+new chunk, and units carry over page breaks.
+"""
+import re
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter, TextSplitter
+
+from .text_normalization import normalize_search_text
+
+# Arabic ordinals / numbers following a structural keyword
+_ARABIC_NUMBER = r"[(\[]?\s*(?:[0-9٠-٩]+|ال(?:أول|اول|ثاني|ثالث|رابع|خامس|سادس|سابع|ثامن|تاسع|عاشر|حادي|تمهيدي)\S*)"
+
+# "مادة 52", "المادة (52)", "مادة ٥٢" as a standalone word; "مادة 52 مكرر"
+# belongs to the text of article 52
+ARTICLE_HEADER = re.compile(
+    r"(?<![^\s(\[])(?:ال)?ماد[ةه]\s*[(\[]?\s*([0-9٠-٩]+)\s*[)\]]?(?!\s*مكرر)"
+)
+ARABIC_ARTICLE_HEADER = re.compile(
+    r"(?<![^\s(\[])(?:ال)?ماد[ةه]\s*" + _ARABIC_NUMBER + r"(?!\s*مكرر)"
+)
+ARABIC_SECTION_HEADER = re.compile(
+    r"(?<![^\s(\[])(?:ال)?(?:باب|فصل|كتاب|قسم)\s+" + _ARABIC_NUMBER
+)
+ENGLISH_ARTICLE_HEADER = re.compile(
+    r"^[ \t]*(?:(?:article|section|clause)\s+[0-9ivxlc]+(?:\.\d+)*\b|\d+(?:\.\d+)*[.)]?[ \t]+(?=[A-Z]))",
+    re.IGNORECASE | re.MULTILINE,
+)
+ENGLISH_SECTION_HEADER = re.compile(
+    r"^[ \t]*(?:chapter|part|schedule|annex|exhibit)\s+[0-9ivxlc]+\b",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Words that introduce a reference to an article or section rather than its
+# header ("وفقا لأحكام المادة 12"), in normalize_search_text form
+REFERENCE_WORDS = {
+    "احكام", "لاحكام", "باحكام", "نص", "بنص", "لنص", "في", "بموجب", "وفق", "وفقا",
+    "طبقا", "تطبيق", "عليها", "عليه", "اليها", "اليه", "ذات", "بذات",
+}
+
+# Chapter-level units shorter than this (characters) are titles, kept with
+# the unit that follows
+SECTION_TITLE_LENGTH = 200
+
+# Separators for units larger than a chunk, coarsest first (single newlines
+# in PDF text are mostly line wraps)
+SENTENCE_SEPARATORS = ["\n\n", ". ", "؛ ", "، ", "; ", ", ", " ", ""]
+
+
+def is_reference(text: str, start: int) -> bool:
+    """True if the header match at `start` is a reference, by its preceding word."""
+    preceding = text[max(0, start - 50):start].split()[-1:]
+    return bool(preceding) and normalize_search_text(preceding[0]) in REFERENCE_WORDS
+
+
+def strip_overlap(previous: str, current: str) -> str:
+    """Text of a chunk minus the prefix it repeats from the previous chunk."""
+    if not previous or not current:
+        return current
+    probe = current.split(" ", 1)[0]
+    position = previous.find(probe, max(0, len(previous) - len(current)))
+    while position != -1:
+        at_word = position == 0 or previous[position - 1] == " "
+        if at_word and current.startswith(previous[position:]):
+            return current[len(previous) - position:]
+        position = previous.find(probe, position + 1)
+    return current
+
+
+class LegalTextSplitter(TextSplitter):
+    """
+    Split legal text on article / section / clause boundaries.
+
+    Sizes are measured with `length_function` (embedding tokens);
+    `chunk_overlap` only applies inside articles too large for one chunk.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._fallback = RecursiveCharacterTextSplitter(
+            chunk_size=self._chunk_size,
+            chunk_overlap=self._chunk_overlap,
+            length_function=self._length_function,
+            separators=SENTENCE_SEPARATORS,
+            keep_separator="end",
+        )
+
+    def units(self, text: str) -> list[tuple[str, bool]]:
+        """
+        Structural units of a text, in order.
+
+        Returns:
+            (unit text, starts a chapter-level section) pairs
+        """
+        boundaries = {0: False}
+        for pattern, major in (
+            (ARABIC_ARTICLE_HEADER, False),
+            (ARABIC_SECTION_HEADER, True),
+            (ENGLISH_ARTICLE_HEADER, False),
+            (ENGLISH_SECTION_HEADER, True),
+        ):
+            for match in pattern.finditer(text):
+                # English headers are anchored to line starts; Arabic ones
+                # may be references inside flattened law text
+                if not pattern.flags & re.MULTILINE and is_reference(text, match.start()):
+                    continue
+                boundaries[match.start()] = boundaries.get(match.start(), False) or major
+        starts = sorted(boundaries)
+        units = []
+        for start, end in zip(starts, starts[1:] + [len(text)]):
+            unit = text[start:end]
+            if not unit.strip():
+                continue
+            previous = units[-1] if units else None
+            if previous and previous[1] and len(previous[0]) < SECTION_TITLE_LENGTH:
+                # A chapter title stays with the article that follows it
+                units[-1] = (previous[0] + unit, True)
+            else:
+                units.append((unit, boundaries[start]))
+        return units
+
+    def split_text(self, text: str) -> list[str]:
+        chunks, current, current_size = [], [], 0
+
+        def flush():
+            nonlocal current, current_size
+            if current:
+                chunks.append("".join(current).strip())
+            current, current_size = [], 0
+
+        for unit, major in self.units(text):
+            size = self._length_function(unit)
+            if size > self._chunk_size:
+                flush()
+                chunks.extend(self._fallback.split_text(unit))
+                continue
+            if current and (major or current_size + size > self._chunk_size):
+                flush()
+            current.append(unit)
+            current_size += size
+        flush()
+        return [chunk for chunk in chunks if chunk]
+
+    def split_pages(self, pages):
+        """
+        Split a stream of page Documents, letting units continue across
+        page breaks. Each chunk keeps the metadata of the page it starts on,
+        plus "end_page": the "page" of the page it ends on.
+
+        Yields:
+            Chunk Documents
+        """
+        carry, carry_metadata = "", None
+        for page in pages:
+            if not page.page_content.strip():
+                continue
+            text = f"{carry}\n{page.page_content}" if carry else page.page_content
+            chunks = self.split_text(text)
+            if not chunks:
+                continue
+            # Chunks starting in the carried text start on its page, and
+            # end on its last page unless they reach into this page
+            page_metadata = {**page.metadata, "end_page": page.metadata.get("page")}
+            metadatas, position = [], 0
+            for chunk in chunks:
+                start = text.find(chunk, position)
+                if start == -1:
+                    start = position
+                position = start + 1
+                if start < len(carry):
+                    metadata = dict(carry_metadata)
+                    if start + len(chunk) > len(carry):
+                        metadata["end_page"] = page_metadata["end_page"]
+                else:
+                    metadata = dict(page_metadata)
+                metadatas.append(metadata)
+            # The last chunk may continue on the next page
+            for chunk, metadata in zip(chunks[:-1], metadatas):
+                yield Document(page_content=chunk, metadata=metadata)
+            carry, carry_metadata = chunks[-1], metadatas[-1]
+        if carry:
+            yield Document(page_content=carry, metadata=carry_metadata)
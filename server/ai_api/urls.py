@@ -4,19 +4,28 @@ from .views import (
     DocumentUploadView,
     DocumentListView,
     DocumentDetailView,
+    DocumentChunkDetailView,
     DocumentChatView,
+    DocumentChatStreamView,
     DocumentClauseDetectionView,
     DocumentSummaryView,
     ChatSessionListView,
     ChatSessionDetailView,
     # Egyptian Law views
     EgyptianLawListView,
+    EgyptianLawStatusView,
+    EgyptianLawSearchView,
     EgyptianLawDetailView,
+    EgyptianLawChunkDetailView,
+    EgyptianLawArticleDetailView,
     EgyptianLawChatView,
+    EgyptianLawChatStreamView,
     EgyptianLawClauseDetectionView,
     EgyptianLawSummaryView,
     LawChatSessionListView,
     LawChatSessionDetailView,
+    # Ops views
+    AICacheStatsView,
 )
 
 urlpatterns = [
@@ -24,9 +33,11 @@ urlpatterns = [
     path('documents/', DocumentListView.as_view(), name='document-list'),
     path('documents/upload/', DocumentUploadView.as_view(), name='document-upload'),
     path('documents/<int:pk>/', DocumentDetailView.as_view(), name='document-detail'),
+    path('documents/<int:pk>/chunks/<int:chunk_id>/', DocumentChunkDetailView.as_view(), name='document-chunk'),
 
     # Document AI features
     path('documents/<int:pk>/chat/', DocumentChatView.as_view(), name='document-chat'),
+    path('documents/<int:pk>/chat/stream/', DocumentChatStreamView.as_view(), name='document-chat-stream'),
     path('documents/<int:pk>/clauses/', DocumentClauseDetectionView.as_view(), name='document-clauses'),
     path('documents/<int:pk>/summary/', DocumentSummaryView.as_view(), name='document-summary'),
 
@@ -36,10 +47,18 @@ urlpatterns = [
 
     # Egyptian Laws
     path('laws/', EgyptianLawListView.as_view(), name='law-list'),
+    path('laws/status/', EgyptianLawStatusView.as_view(), name='law-status'),
+    path('laws/search/', EgyptianLawSearchView.as_view(), name='law-search'),
     path('laws/sessions/', LawChatSessionListView.as_view(), name='law-session-list'),
     path('laws/sessions/<int:pk>/', LawChatSessionDetailView.as_view(), name='law-session-detail'),
     path('laws/<slug:slug>/', EgyptianLawDetailView.as_view(), name='law-detail'),
+    path('laws/<slug:slug>/chunks/<int:chunk_id>/', EgyptianLawChunkDetailView.as_view(), name='law-chunk'),
+    path('laws/<slug:slug>/articles/<int:number>/', EgyptianLawArticleDetailView.as_view(), name='law-article'),
     path('laws/<slug:slug>/chat/', EgyptianLawChatView.as_view(), name='law-chat'),
+    path('laws/<slug:slug>/chat/stream/', EgyptianLawChatStreamView.as_view(), name='law-chat-stream'),
     path('laws/<slug:slug>/clauses/', EgyptianLawClauseDetectionView.as_view(), name='law-clauses'),
     path('laws/<slug:slug>/summary/', EgyptianLawSummaryView.as_view(), name='law-summary'),
+
+    # Ops
+    path('ops/cache-stats/', AICacheStatsView.as_view(), name='ai-cache-stats'),
 ]
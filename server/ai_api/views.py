@@ -6,22 +6,29 @@ Provides endpoints for:
 - Chat with documents using RAG
 - Legal clause detection
 - Document summarization
+- Streaming (Server-Sent Events) chat
 """
+import json
 import os
 
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.generics import ListAPIView, RetrieveDestroyAPIView
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework import status
+from adrf.views import APIView as AsyncAPIView
 
 from .models import (
-    Document, ChatSession, ChatMessage,
-    EgyptianLaw, LawChatSession, LawChatMessage
+    Document, DocumentChunk, ChatSession, ChatMessage,
+    EgyptianLaw, EgyptianLawChunk, LawArticle, LawChatSession, LawChatMessage,
+    file_content_hash
 )
 from .serializers import (
     DocumentSerializer,
+    DocumentChunkSerializer,
     DocumentUploadSerializer,
     ChatSessionSerializer,
     ChatSessionListSerializer,
@@ -29,6 +36,9 @@ from .serializers import (
     ChatResponseSerializer,
     EgyptianLawSerializer,
     EgyptianLawListSerializer,
+    EgyptianLawChunkSerializer,
+    LawArticleSerializer,
+    LawSearchSerializer,
     LawChatSessionSerializer,
     LawChatSessionListSerializer,
 )
@@ -36,14 +46,20 @@ from .langchain_config import (
     get_document_vector_store,
     get_legal_rag_chain,
     get_egyptian_law_rag_chain,
-    get_clause_detection_chain,
-    get_summary_chain,
     delete_document_vectors,
     get_law_vector_store,
-    get_arabic_summary_chain,
-    get_arabic_clauses_chain,
+    get_chain_cache,
+    get_embeddings,
+    search_law_corpus,
 )
-from .tasks import process_pdf_document
+from .analysis import aget_document_analysis, aget_law_analysis
+from .law_articles import alookup_article_answer
+from .semantic_cache import (
+    alookup_law_answer,
+    astore_law_answer,
+    semantic_cache_stats,
+)
+from .tasks import process_pdf_document, get_law_seed_progress, law_seeding_in_progress
 
 # Import billing permissions
 from accounts.permissions import (
@@ -51,10 +67,271 @@ from accounts.permissions import (
     check_message_limit,
     check_egyptian_law_access,
     has_egyptian_law_access,
+    accessible_egyptian_law_slugs,
     increment_document_count
 )
 
 
+def source_page_end(doc):
+    """Last page of a cited chunk; its first page for chunks stored before page ranges."""
+    return doc.metadata.get("end_page_number") or doc.metadata.get("page_number", "N/A")
+
+
+def format_sources(retrieved_docs):
+    """
+    Build the citation list returned alongside a RAG answer.
+    `chunk_id` is the chunk row, whose full text the chunk endpoints return.
+    """
+    sources = []
+    for source_doc in retrieved_docs:
+        sources.append({
+            "chunk_id": source_doc.metadata.get("chunk_id"),
+            "content": source_doc.page_content[:200] + "...",
+            "page": source_doc.metadata.get("page_number", "N/A"),
+            "end_page": source_page_end(source_doc),
+            "chunk_index": source_doc.metadata.get("chunk_index", "N/A"),
+        })
+    return sources
+
+
+def sse_event(event, data):
+    """Encode one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def stream_rag_answer(rag_chain, query, session, message_model, on_answer=None):
+    """
+    Run a RAG chain with `astream` and yield Server-Sent Events.
+
+    Emits `sources` once retrieval finishes, then one `token` event per
+    generated chunk, and persists the assistant message (with its prompt
+    token count) before the final `done` event. `on_answer(answer,
+    sources)` is awaited once the answer is complete (e.g. to cache it).
+    """
+    answer_parts = []
+    sources = None
+    prompt_tokens = None
+    try:
+        async for chunk in rag_chain.astream(query):
+            if sources is None and "retrieved_docs" in chunk:
+                sources = format_sources(chunk["retrieved_docs"])
+                yield sse_event("sources", sources)
+            if "prompt_tokens" in chunk:
+                prompt_tokens = chunk["prompt_tokens"]
+            if chunk.get("answer"):
+                answer_parts.append(chunk["answer"])
+                yield sse_event("token", {"text": chunk["answer"]})
+
+        answer = "".join(answer_parts)
+        if on_answer is not None:
+            await on_answer(answer, sources or [])
+
+        assistant_message = await message_model.objects.acreate(
+            session=session,
+            role='assistant',
+            content=answer,
+            sources=sources or [],
+            prompt_tokens=prompt_tokens
+        )
+
+        # Update session timestamp
+        await session.asave()
+
+        yield sse_event("done", {
+            "session_id": session.id,
+            "message_id": assistant_message.id,
+        })
+
+    except Exception as e:
+        yield sse_event("error", {"error": str(e)})
+
+
+async def stream_static_answer(answer, sources, session, message_model):
+    """
+    Emit an answer that needs no LLM (e.g. an article lookup) with the same
+    events as stream_rag_answer, persisting the assistant message.
+    """
+    try:
+        yield sse_event("sources", sources)
+        yield sse_event("token", {"text": answer})
+
+        assistant_message = await message_model.objects.acreate(
+            session=session,
+            role='assistant',
+            content=answer,
+            sources=sources,
+            prompt_tokens=0
+        )
+        await session.asave()
+
+        yield sse_event("done", {
+            "session_id": session.id,
+            "message_id": assistant_message.id,
+        })
+
+    except Exception as e:
+        yield sse_event("error", {"error": str(e)})
+
+
+def wants_refresh(request):
+    """True if the client asked to regenerate a stored analysis."""
+    return request.query_params.get('refresh', '').lower() in ('true', '1', 'yes')
+
+
+async def get_chat_document(request, pk):
+    """
+    Document a chat request targets, if the user owns it and it is ready.
+
+    Returns:
+        (document, None) or (None, error Response)
+    """
+    try:
+        doc = await Document.objects.aget(pk=pk, user=request.user)
+    except Document.DoesNotExist:
+        return None, Response(
+            {"error": "Document not found"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    if doc.status != 'ready':
+        return None, Response(
+            {"error": f"Document is not ready for chat. Status: {doc.status}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return doc, None
+
+
+async def get_chat_law(request, slug):
+    """
+    Law a chat request targets, if the user's plan covers it and it is ready.
+
+    Returns:
+        (law, None) or (None, error Response)
+    """
+    # Check law access based on user's plan
+    has_access, error_msg = await sync_to_async(has_egyptian_law_access)(
+        request.user, slug
+    )
+    if not has_access:
+        return None, Response(
+            {"error": error_msg, "upgrade_required": True},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    try:
+        law = await EgyptianLaw.objects.aget(slug=slug)
+    except EgyptianLaw.DoesNotExist:
+        return None, Response(
+            {"error": "Law not found"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    if law.status != 'ready':
+        return None, Response(
+            {"error": f"Law is not ready for chat. Status: {law.status}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return law, None
+
+
+async def start_chat_turn(request, session_model, message_model, **scope):
+    """
+    Validate a chat request, get or create its session (continuing
+    `session_id` when given) and save the user's message. Shared by the
+    blocking and streaming chat views.
+
+    Args:
+        session_model / message_model: ChatSession and ChatMessage, or
+            their law chat counterparts
+        scope: Field tying the session to its document or law
+
+    Returns:
+        (session, query, None) or (None, None, error Response)
+    """
+    serializer = ChatQuerySerializer(data=request.data)
+    if not serializer.is_valid():
+        return None, None, Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    query = serializer.validated_data['query']
+    session_id = serializer.validated_data.get('session_id')
+
+    if session_id:
+        try:
+            session = await session_model.objects.aget(
+                pk=session_id,
+                user=request.user,
+                **scope
+            )
+        except session_model.DoesNotExist:
+            return None, None, Response(
+                {"error": "Chat session not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+    else:
+        session = await session_model.objects.acreate(
+            user=request.user,
+            title=query[:50] + "..." if len(query) > 50 else query,
+            **scope
+        )
+
+    # Save user message
+    await message_model.objects.acreate(
+        session=session,
+        role='user',
+        content=query
+    )
+    return session, query, None
+
+
+async def stream_law_answer(law, query, session):
+    """
+    Stream a law chat answer the way EgyptianLawChatView answers it:
+    article lookups come from the article index; otherwise the query is
+    embedded once for the semantic answer cache lookup and, on a miss, for
+    retrieval, and generated answers are added to the cache.
+    """
+    try:
+        article_answer = await alookup_article_answer(law, query)
+        if article_answer is not None:
+            answer, sources = article_answer
+            async for event in stream_static_answer(answer, sources, session, LawChatMessage):
+                yield event
+            return
+
+        vector_store = await sync_to_async(
+            get_law_vector_store, thread_sensitive=False
+        )(law.slug)
+        embedding = await vector_store.embeddings.aembed_query(query)
+        cached = await alookup_law_answer(law, embedding)
+    except Exception as e:
+        yield sse_event("error", {"error": str(e)})
+        return
+
+    if cached is not None:
+        events = stream_static_answer(cached.answer, cached.sources, session, LawChatMessage)
+    else:
+        async def cache_answer(answer, sources):
+            await astore_law_answer(law, query, embedding, answer, sources)
+
+        events = stream_rag_answer(
+            get_egyptian_law_rag_chain(vector_store),
+            {"input": query, "embedding": embedding},
+            session,
+            LawChatMessage,
+            on_answer=cache_answer,
+        )
+    async for event in events:
+        yield event
+
+
+def sse_response(events):
+    """Wrap an async event iterator in an unbuffered SSE response."""
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # Disable proxy buffering
+    return response
+
+
 class DocumentUploadView(APIView):
     """
     POST /api/ai/documents/upload/
@@ -83,7 +360,8 @@ class DocumentUploadView(APIView):
             doc = serializer.save(
                 user=request.user,
                 status='processing',
-                title=original_filename if original_filename else serializer.validated_data.get('title')
+                title=original_filename if original_filename else serializer.validated_data.get('title'),
+                content_hash=file_content_hash(serializer.validated_data['file']),
             )
 
             # Queue PDF processing task asynchronously
@@ -156,7 +434,30 @@ class DocumentDetailView(RetrieveDestroyAPIView):
         instance.delete()
 
 
-class DocumentChatView(APIView):
+class DocumentChunkDetailView(APIView):
+    """
+    GET /api/ai/documents/<id>/chunks/<chunk_id>/
+
+    Full text of a cited document chunk.
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'read'
+
+    def get(self, request, pk, chunk_id):
+        try:
+            chunk = DocumentChunk.objects.get(
+                id=chunk_id, document_id=pk, document__user=request.user
+            )
+        except DocumentChunk.DoesNotExist:
+            return Response(
+                {"error": "Chunk not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response(DocumentChunkSerializer(chunk).data)
+
+
+class DocumentChatView(AsyncAPIView):
     """
     POST /api/ai/documents/<id>/chat/
 
@@ -172,85 +473,40 @@ class DocumentChatView(APIView):
     throttle_scope = 'chat'
 
     @check_message_limit
-    def post(self, request, pk):
-        # Validate request
-        serializer = ChatQuerySerializer(data=request.data)
-        if not serializer.is_valid():
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-        # Get document
-        try:
-            doc = Document.objects.get(pk=pk, user=request.user)
-        except Document.DoesNotExist:
-            return Response(
-                {"error": "Document not found"},
-                status=status.HTTP_404_NOT_FOUND
-            )
-
-        if doc.status != 'ready':
-            return Response(
-                {"error": f"Document is not ready for chat. Status: {doc.status}"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        query = serializer.validated_data['query']
-        session_id = serializer.validated_data.get('session_id')
+    async def post(self, request, pk):
+        doc, error = await get_chat_document(request, pk)
+        if error is not None:
+            return error
+        session, query, error = await start_chat_turn(
+            request, ChatSession, ChatMessage, document=doc
+        )
+        if error is not None:
+            return error
 
         try:
-            # Get or create chat session
-            if session_id:
-                try:
-                    session = ChatSession.objects.get(
-                        pk=session_id,
-                        user=request.user,
-                        document=doc
-                    )
-                except ChatSession.DoesNotExist:
-                    return Response(
-                        {"error": "Chat session not found"},
-                        status=status.HTTP_404_NOT_FOUND
-                    )
-            else:
-                session = ChatSession.objects.create(
-                    user=request.user,
-                    document=doc,
-                    title=query[:50] + "..." if len(query) > 50 else query
-                )
-
-            # Save user message
-            user_message = ChatMessage.objects.create(
-                session=session,
-                role='user',
-                content=query
-            )
-
             # Get RAG response
-            vector_store = get_document_vector_store(doc.id)
+            vector_store = await sync_to_async(
+                get_document_vector_store, thread_sensitive=False
+            )(doc.id)
             rag_chain = get_legal_rag_chain(vector_store)
-            result = rag_chain.invoke(query)
+            result = await rag_chain.ainvoke(query)
 
             answer = result.get("answer", "")
 
             # Extract source information
-            sources = []
-            retrieved_docs = result.get("retrieved_docs", [])
-            for source_doc in retrieved_docs:
-                sources.append({
-                    "content": source_doc.page_content[:200] + "...",
-                    "page": source_doc.metadata.get("page_number", "N/A"),
-                    "chunk_index": source_doc.metadata.get("chunk_index", "N/A"),
-                })
+            sources = format_sources(result.get("retrieved_docs", []))
 
             # Save assistant message
-            assistant_message = ChatMessage.objects.create(
+            assistant_message = await ChatMessage.objects.acreate(
                 session=session,
                 role='assistant',
                 content=answer,
-                sources=sources
+                sources=sources,
+                prompt_tokens=result.get("prompt_tokens")
             )
 
             # Update session timestamp
-            session.save()
+            await session.asave()
 
             return Response({
                 "answer": answer,
@@ -266,18 +522,55 @@ class DocumentChatView(APIView):
             )
 
 
-class DocumentClauseDetectionView(APIView):
+class DocumentChatStreamView(AsyncAPIView):
+    """
+    POST /api/ai/documents/<id>/chat/stream/
+
+    Streaming variant of document chat using Server-Sent Events.
+    Same request body as the chat endpoint. Emits events:
+    - sources: citation list (sent as soon as retrieval completes)
+    - token:   {"text": "..."} for each generated chunk
+    - done:    {"session_id": ..., "message_id": ...}
+    - error:   {"error": "..."}
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'chat'
+
+    @check_message_limit
+    async def post(self, request, pk):
+        doc, error = await get_chat_document(request, pk)
+        if error is not None:
+            return error
+        session, query, error = await start_chat_turn(
+            request, ChatSession, ChatMessage, document=doc
+        )
+        if error is not None:
+            return error
+
+        vector_store = await sync_to_async(
+            get_document_vector_store, thread_sensitive=False
+        )(doc.id)
+        rag_chain = get_legal_rag_chain(vector_store)
+
+        return sse_response(
+            stream_rag_answer(rag_chain, query, session, ChatMessage)
+        )
+
+
+class DocumentClauseDetectionView(AsyncAPIView):
     """
     POST /api/ai/documents/<id>/clauses/
+    POST /api/ai/documents/<id>/clauses/?refresh=true
 
     Detect and analyze legal clauses in a document.
+    The analysis is stored and served on repeat calls unless refresh is set.
     """
     permission_classes = [IsAuthenticated]
     throttle_scope = 'ai_analysis'
 
-    def post(self, request, pk):
+    async def post(self, request, pk):
         try:
-            doc = Document.objects.get(pk=pk, user=request.user)
+            doc = await Document.objects.aget(pk=pk, user=request.user)
         except Document.DoesNotExist:
             return Response(
                 {"error": "Document not found"},
@@ -291,19 +584,15 @@ class DocumentClauseDetectionView(APIView):
             )
 
         try:
-            vector_store = get_document_vector_store(doc.id)
-            clause_chain = get_clause_detection_chain(vector_store)
-
-            analysis = clause_chain.invoke(
-                "Identify and analyze all key legal clauses in this document. "
-                "Include termination, confidentiality, liability, indemnity, "
-                "payment terms, jurisdiction, and any other important clauses."
+            analysis, cached = await aget_document_analysis(
+                doc, 'clauses', refresh=wants_refresh(request)
             )
 
             return Response({
                 "analysis": analysis,
                 "document_id": doc.id,
                 "document_title": doc.title,
+                "cached": cached,
             })
 
         except Exception as e:
@@ -313,18 +602,20 @@ class DocumentClauseDetectionView(APIView):
             )
 
 
-class DocumentSummaryView(APIView):
+class DocumentSummaryView(AsyncAPIView):
     """
     POST /api/ai/documents/<id>/summary/
+    POST /api/ai/documents/<id>/summary/?refresh=true
 
     Generate an executive summary of a document.
+    The summary is stored and served on repeat calls unless refresh is set.
     """
     permission_classes = [IsAuthenticated]
     throttle_scope = 'ai_analysis'
 
-    def post(self, request, pk):
+    async def post(self, request, pk):
         try:
-            doc = Document.objects.get(pk=pk, user=request.user)
+            doc = await Document.objects.aget(pk=pk, user=request.user)
         except Document.DoesNotExist:
             return Response(
                 {"error": "Document not found"},
@@ -338,17 +629,15 @@ class DocumentSummaryView(APIView):
             )
 
         try:
-            vector_store = get_document_vector_store(doc.id)
-            summary_chain = get_summary_chain(vector_store)
-
-            summary = summary_chain.invoke(
-                "Generate a comprehensive executive summary of this legal document."
+            summary, cached = await aget_document_analysis(
+                doc, 'summary', refresh=wants_refresh(request)
             )
 
             return Response({
                 "summary": summary,
                 "document_id": doc.id,
                 "document_title": doc.title,
+                "cached": cached,
             })
 
         except Exception as e:
@@ -393,15 +682,44 @@ class EgyptianLawListView(ListAPIView):
     """
     GET /api/ai/laws/
 
-    List all available Egyptian law documents.
-    Only shows laws with 'ready' status (fully seeded).
+    List all Egyptian law documents with their current status.
+    Laws are seeded in the background, so some may still be 'pending' or
+    'processing'; only 'ready' laws can be used.
     """
     serializer_class = EgyptianLawListSerializer
     permission_classes = [IsAuthenticated]
     throttle_scope = 'read'
 
     def get_queryset(self):
-        return EgyptianLaw.objects.filter(status='ready')
+        return EgyptianLaw.objects.all()
+
+
+class EgyptianLawStatusView(APIView):
+    """
+    GET /api/ai/laws/status/
+
+    Readiness and seeding progress of every Egyptian law.
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'read'
+
+    def get(self, request):
+        laws = [
+            {
+                "slug": law.slug,
+                "status": law.status,
+                "page_count": law.page_count,
+                "chunk_count": law.chunk_count,
+                "seeded_at": law.seeded_at,
+                "progress": get_law_seed_progress(law.slug),
+            }
+            for law in EgyptianLaw.objects.all()
+        ]
+        return Response({
+            "ready": bool(laws) and all(law["status"] == "ready" for law in laws),
+            "seeding": law_seeding_in_progress(),
+            "laws": laws,
+        })
 
 
 class EgyptianLawDetailView(APIView):
@@ -426,24 +744,45 @@ class EgyptianLawDetailView(APIView):
         return Response(serializer.data)
 
 
-class EgyptianLawChatView(APIView):
+class EgyptianLawChunkDetailView(APIView):
     """
-    POST /api/ai/laws/<slug>/chat/
+    GET /api/ai/laws/<slug>/chunks/<chunk_id>/
 
-    Chat with a specific Egyptian law using RAG.
+    Full text of a cited law chunk.
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'read'
 
-    Request body:
-    {
-        "query": "What are the worker's rights?",
-        "session_id": 123  // optional
-    }
+    def get(self, request, slug, chunk_id):
+        has_access, error_msg = has_egyptian_law_access(request.user, slug)
+        if not has_access:
+            return Response(
+                {"error": error_msg, "upgrade_required": True},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        try:
+            chunk = EgyptianLawChunk.objects.get(id=chunk_id, law_id=slug)
+        except EgyptianLawChunk.DoesNotExist:
+            return Response(
+                {"error": "Chunk not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response(EgyptianLawChunkSerializer(chunk).data)
+
+
+class EgyptianLawArticleDetailView(APIView):
+    """
+    GET /api/ai/laws/<slug>/articles/<number>/
+
+    Text, page range and chunks of one article of a law, from the article
+    index built at seed time.
     """
     permission_classes = [IsAuthenticated]
-    throttle_scope = 'chat'
+    throttle_scope = 'read'
 
-    @check_message_limit
-    def post(self, request, slug):
-        # Check law access based on user's plan
+    def get(self, request, slug, number):
         has_access, error_msg = has_egyptian_law_access(request.user, slug)
         if not has_access:
             return Response(
@@ -451,90 +790,176 @@ class EgyptianLawChatView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        # Validate request
-        serializer = ChatQuerySerializer(data=request.data)
+        try:
+            article = LawArticle.objects.get(law_id=slug, number=number)
+        except LawArticle.DoesNotExist:
+            return Response(
+                {"error": "Article not found"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response(LawArticleSerializer(article).data)
+
+
+class EgyptianLawSearchView(AsyncAPIView):
+    """
+    POST /api/ai/laws/search/
+
+    Search passages across every law the user's plan gives access to
+    (or a subset of them) with a single vector query.
+
+    Request body:
+    {
+        "query": "notice period for dismissal",
+        "laws": ["labor-law", "civil-code"],  // optional
+        "k": 15  // optional
+    }
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'chat'
+
+    async def post(self, request):
+        serializer = LawSearchSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        # Get law
-        try:
-            law = EgyptianLaw.objects.get(slug=slug)
-        except EgyptianLaw.DoesNotExist:
+        allowed, error_msg = await sync_to_async(accessible_egyptian_law_slugs)(request.user)
+        if error_msg:
             return Response(
-                {"error": "Law not found"},
-                status=status.HTTP_404_NOT_FOUND
+                {"error": error_msg, "upgrade_required": True},
+                status=status.HTTP_403_FORBIDDEN
             )
 
-        if law.status != 'ready':
+        requested = serializer.validated_data.get('laws')
+        if requested:
+            denied = sorted(set(requested) - set(allowed))
+            if denied:
+                return Response(
+                    {"error": f"You do not have access to: {', '.join(denied)}", "upgrade_required": True},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            allowed = requested
+
+        laws = {
+            law.slug: law async for law in EgyptianLaw.objects.filter(slug__in=allowed, status='ready')
+        }
+        if not laws:
             return Response(
-                {"error": f"Law is not ready for chat. Status: {law.status}"},
+                {"error": "None of the selected laws is ready yet"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
         query = serializer.validated_data['query']
-        session_id = serializer.validated_data.get('session_id')
+        try:
+            embedding = await get_embeddings().aembed_query(query)
+            matches = await sync_to_async(search_law_corpus, thread_sensitive=False)(
+                embedding, list(laws), serializer.validated_data['k']
+            )
+        except Exception as e:
+            return Response(
+                {"error": f"Search failed: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        results = []
+        for doc, distance in matches:
+            law = laws.get(doc.metadata.get("law_slug"))
+            results.append({
+                "law_slug": doc.metadata.get("law_slug"),
+                "law_title": law.title_en if law else doc.metadata.get("law_title"),
+                "chunk_id": doc.metadata.get("chunk_id"),
+                "content": doc.page_content,
+                "page": doc.metadata.get("page_number", "N/A"),
+                "end_page": source_page_end(doc),
+                "chunk_index": doc.metadata.get("chunk_index", "N/A"),
+                "score": round(1 - distance, 4),
+            })
+
+        return Response({
+            "query": query,
+            "laws": list(laws),
+            "results": results,
+        })
+
+
+class EgyptianLawChatView(AsyncAPIView):
+    """
+    POST /api/ai/laws/<slug>/chat/
+
+    Chat with a specific Egyptian law using RAG.
+
+    Request body:
+    {
+        "query": "What are the worker's rights?",
+        "session_id": 123  // optional
+    }
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'chat'
+
+    @check_message_limit
+    async def post(self, request, slug):
+        law, error = await get_chat_law(request, slug)
+        if error is not None:
+            return error
+        session, query, error = await start_chat_turn(
+            request, LawChatSession, LawChatMessage, law=law
+        )
+        if error is not None:
+            return error
 
         try:
-            # Get or create chat session
-            if session_id:
-                try:
-                    session = LawChatSession.objects.get(
-                        pk=session_id,
-                        user=request.user,
-                        law=law
-                    )
-                except LawChatSession.DoesNotExist:
-                    return Response(
-                        {"error": "Chat session not found"},
-                        status=status.HTTP_404_NOT_FOUND
-                    )
+            # Article lookups ("نص المادة 52") are answered from the
+            # article index, without embedding, retrieval or the LLM
+            cached = None
+            prompt_tokens = 0
+            article_answer = await alookup_article_answer(law, query)
+            if article_answer is not None:
+                answer, sources = article_answer
             else:
-                session = LawChatSession.objects.create(
-                    user=request.user,
-                    law=law,
-                    title=query[:50] + "..." if len(query) > 50 else query
-                )
+                vector_store = await sync_to_async(
+                    get_law_vector_store, thread_sensitive=False
+                )(law.slug)
 
-            # Save user message
-            LawChatMessage.objects.create(
-                session=session,
-                role='user',
-                content=query
-            )
+                # Embed once: used for the semantic cache lookup and, on a miss,
+                # for retrieval in the RAG chain
+                embedding = await vector_store.embeddings.aembed_query(query)
+                cached = await alookup_law_answer(law, embedding)
 
-            # Get RAG response using Egyptian law specialized chain
-            vector_store = get_law_vector_store(law.slug)
-            rag_chain = get_egyptian_law_rag_chain(vector_store)
-            result = rag_chain.invoke(query)
+                if cached is not None:
+                    answer = cached.answer
+                    sources = cached.sources
+                else:
+                    # Get RAG response using Egyptian law specialized chain
+                    rag_chain = get_egyptian_law_rag_chain(vector_store)
+                    result = await rag_chain.ainvoke({"input": query, "embedding": embedding})
 
-            answer = result.get("answer", "")
+                    answer = result.get("answer", "")
+                    prompt_tokens = result.get("prompt_tokens")
 
-            # Extract source information
-            sources = []
-            retrieved_docs = result.get("retrieved_docs", [])
-            for source_doc in retrieved_docs:
-                sources.append({
-                    "content": source_doc.page_content[:200] + "...",
-                    "page": source_doc.metadata.get("page_number", "N/A"),
-                    "chunk_index": source_doc.metadata.get("chunk_index", "N/A"),
-                })
+                    # Extract source information
+                    sources = format_sources(result.get("retrieved_docs", []))
+
+                    await astore_law_answer(law, query, embedding, answer, sources)
 
             # Save assistant message
-            assistant_message = LawChatMessage.objects.create(
+            assistant_message = await LawChatMessage.objects.acreate(
                 session=session,
                 role='assistant',
                 content=answer,
-                sources=sources
+                sources=sources,
+                prompt_tokens=prompt_tokens
             )
 
             # Update session timestamp
-            session.save()
+            await session.asave()
 
             return Response({
                 "answer": answer,
                 "sources": sources,
                 "session_id": session.id,
                 "message_id": assistant_message.id,
+                "cached": cached is not None,
             })
 
         except Exception as e:
@@ -544,18 +969,48 @@ class EgyptianLawChatView(APIView):
             )
 
 
-class EgyptianLawClauseDetectionView(APIView):
+class EgyptianLawChatStreamView(AsyncAPIView):
+    """
+    POST /api/ai/laws/<slug>/chat/stream/
+
+    Streaming variant of Egyptian law chat using Server-Sent Events.
+    Emits the same events as the document chat stream. Like the blocking
+    view, answers come from the article index or the semantic answer
+    cache when possible, and generated answers are cached.
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'chat'
+
+    @check_message_limit
+    async def post(self, request, slug):
+        law, error = await get_chat_law(request, slug)
+        if error is not None:
+            return error
+        session, query, error = await start_chat_turn(
+            request, LawChatSession, LawChatMessage, law=law
+        )
+        if error is not None:
+            return error
+
+        return sse_response(stream_law_answer(law, query, session))
+
+
+class EgyptianLawClauseDetectionView(AsyncAPIView):
     """
     POST /api/ai/laws/<slug>/clauses/
+    POST /api/ai/laws/<slug>/clauses/?refresh=true
 
     Detect and analyze legal clauses in an Egyptian law.
+    The analysis is stored and served on repeat calls unless refresh is set.
     """
     permission_classes = [IsAuthenticated]
     throttle_scope = 'ai_analysis'
 
-    def post(self, request, slug):
+    async def post(self, request, slug):
         # Check law access based on user's plan
-        has_access, error_msg = has_egyptian_law_access(request.user, slug)
+        has_access, error_msg = await sync_to_async(has_egyptian_law_access)(
+            request.user, slug
+        )
         if not has_access:
             return Response(
                 {"error": error_msg, "upgrade_required": True},
@@ -563,7 +1018,7 @@ class EgyptianLawClauseDetectionView(APIView):
             )
 
         try:
-            law = EgyptianLaw.objects.get(slug=slug)
+            law = await EgyptianLaw.objects.aget(slug=slug)
         except EgyptianLaw.DoesNotExist:
             return Response(
                 {"error": "Law not found"},
@@ -577,21 +1032,16 @@ class EgyptianLawClauseDetectionView(APIView):
             )
 
         try:
-            vector_store = get_law_vector_store(law.slug)
-            # Use Arabic chain for Egyptian laws
-            clause_chain = get_arabic_clauses_chain(vector_store)
-
-            analysis = clause_chain.invoke({
-                "input": "Identify and analyze all key legal provisions in this law. "
-                         "Include articles related to rights, obligations, penalties, "
-                         "procedures, and any other important provisions.",
-                "title": law.title_ar
-            })
+            # Uses the Arabic clause chain for Egyptian laws
+            analysis, cached = await aget_law_analysis(
+                law, 'clauses', refresh=wants_refresh(request)
+            )
 
             return Response({
                 "analysis": analysis,
                 "law_slug": law.slug,
                 "law_title": law.title_en,
+                "cached": cached,
             })
 
         except Exception as e:
@@ -601,18 +1051,22 @@ class EgyptianLawClauseDetectionView(APIView):
             )
 
 
-class EgyptianLawSummaryView(APIView):
+class EgyptianLawSummaryView(AsyncAPIView):
     """
     POST /api/ai/laws/<slug>/summary/
+    POST /api/ai/laws/<slug>/summary/?refresh=true
 
     Generate an executive summary of an Egyptian law.
+    The summary is stored and served on repeat calls unless refresh is set.
     """
     permission_classes = [IsAuthenticated]
     throttle_scope = 'ai_analysis'
 
-    def post(self, request, slug):
+    async def post(self, request, slug):
         # Check law access based on user's plan
-        has_access, error_msg = has_egyptian_law_access(request.user, slug)
+        has_access, error_msg = await sync_to_async(has_egyptian_law_access)(
+            request.user, slug
+        )
         if not has_access:
             return Response(
                 {"error": error_msg, "upgrade_required": True},
@@ -620,7 +1074,7 @@ class EgyptianLawSummaryView(APIView):
             )
 
         try:
-            law = EgyptianLaw.objects.get(slug=slug)
+            law = await EgyptianLaw.objects.aget(slug=slug)
         except EgyptianLaw.DoesNotExist:
             return Response(
                 {"error": "Law not found"},
@@ -634,19 +1088,16 @@ class EgyptianLawSummaryView(APIView):
             )
 
         try:
-            vector_store = get_law_vector_store(law.slug)
-            # Use Arabic chain for Egyptian laws
-            summary_chain = get_arabic_summary_chain(vector_store)
-
-            summary = summary_chain.invoke({
-                "input": "Generate a comprehensive executive summary of this Egyptian law.",
-                "title": law.title_ar
-            })
+            # Uses the Arabic summary chain for Egyptian laws
+            summary, cached = await aget_law_analysis(
+                law, 'summary', refresh=wants_refresh(request)
+            )
 
             return Response({
                 "summary": summary,
                 "law_slug": law.slug,
                 "law_title": law.title_en,
+                "cached": cached,
             })
 
         except Exception as e:
@@ -681,3 +1132,24 @@ class LawChatSessionDetailView(RetrieveDestroyAPIView):
 
     def get_queryset(self):
         return LawChatSession.objects.filter(user=self.request.user)
+
+
+# ============================================
+# Ops Views
+# ============================================
+
+class AICacheStatsView(APIView):
+    """
+    GET /api/ai/ops/cache-stats/
+
+    Report AI cache counters for the worker process serving the request.
+    Admin only.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            "chain_cache": get_chain_cache().stats(),
+            "embedding_cache": get_embeddings().stats(),
+            "semantic_cache": semantic_cache_stats(),
+        })
@@ -38,6 +38,40 @@ CACHES = {
     }
 }
 
+# Embedding cache (query and chunk vectors, shared by all workers)
+EMBEDDING_CACHE_URL = os.getenv("EMBEDDING_CACHE_URL", "redis://redis:6379/2")  # Use DB 2 for embeddings
+
+# Embedding size (text-embedding-3-large: up to 3072). Fewer dimensions shrink
+# the vector table and index; after lowering it run `manage.py reproject_embeddings`.
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", 3072))
+
+# Also store chunk text in the vector table. When False, vectors only keep the
+# chunk row id and searches read the text from the chunk tables; run
+# `manage.py vector_text --drop` / `--restore` to convert existing vectors.
+VECTOR_STORE_CHUNK_TEXT = os.getenv("VECTOR_STORE_CHUNK_TEXT", "True") == "True"
+
+# Vector collections: "collections" keeps one collection per law / document,
+# "unified" stores each corpus type in one collection filtered by metadata
+# (convert existing vectors with `manage.py migrate_vector_corpus`)
+VECTOR_CORPUS_MODE = os.getenv("VECTOR_CORPUS_MODE", "collections")
+
+# HNSW index over the vector table (`manage.py vector_index` creates/maintains it)
+VECTOR_INDEX_ENABLED = os.getenv("VECTOR_INDEX_ENABLED", "True") == "True"  # Search via the index expression
+VECTOR_INDEX_M = int(os.getenv("VECTOR_INDEX_M", 16))
+VECTOR_INDEX_EF_CONSTRUCTION = int(os.getenv("VECTOR_INDEX_EF_CONSTRUCTION", 64))
+VECTOR_INDEX_EF_SEARCH = int(os.getenv("VECTOR_INDEX_EF_SEARCH", 100))  # Must be >= the k/fetch_k searched
+VECTOR_INDEX_BUILD_MEMORY = os.getenv("VECTOR_INDEX_BUILD_MEMORY", "1GB")  # maintenance_work_mem for builds
+
+# Hybrid retrieval: fuse vector search with full-text search over the chunk
+# tables (indexed by migration 0011) in the document and law chat chains.
+# Off by default: when on, chat retrieves HYBRID_RETRIEVAL_K (8) fused chunks
+# instead of RETRIEVAL_K (15) by similarity / MMR
+HYBRID_RETRIEVAL_ENABLED = os.getenv("HYBRID_RETRIEVAL_ENABLED", "False") == "True"
+
+# Max tokens of retrieved context per chat prompt; retrieved chunks are
+# deduplicated and packed best first until the budget is spent
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 4000))
+
 # Celery Configuration
 CELERY_BROKER_URL = "redis://redis:6379/0"  # Use DB 0 for Celery
 CELERY_RESULT_BACKEND = "redis://redis:6379/0"
@@ -48,6 +82,19 @@ CELERY_TIMEZONE = "UTC"
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes max per task
 
+# Semantic answer cache for Egyptian law chat
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "True") == "True"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.95))  # Min cosine similarity
+SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", 7 * 24 * 3600))  # 7 days
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", 500))  # Per law
+
+# Egyptian law seeding (a Celery task queued when a worker starts)
+SEED_LAWS_ON_STARTUP = os.getenv("SEED_LAWS_ON_STARTUP", "True") == "True"
+LAW_SEED_WORKERS = int(os.getenv("SEED_WORKERS", 4))
+SEED_LAW_ANALYSES = os.getenv("SEED_LAW_ANALYSES", "False") == "True"  # Also precompute summaries/clauses
+LAW_SEED_LOCK_TIMEOUT = 10 * 60  # Refreshed by a heartbeat while seeding; frees the lock if the worker dies
+LAW_SEED_TIME_LIMIT = 6 * 60 * 60  # Seeding every law can outlast CELERY_TASK_TIME_LIMIT
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 
 
@@ -75,6 +122,7 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "rest_framework",
+    "adrf",  # async APIViews for the AI endpoints
     "rest_framework.authtoken",
     "rest_framework_simplejwt",
     "rest_framework_simplejwt.token_blacklist",
@@ -24,17 +24,23 @@ python manage.py migrate --noinput
 echo "Collecting static files..."
 python manage.py collectstatic --noinput
 
-# Seed Egyptian laws (idempotent - skips if already seeded)
-echo "Seeding Egyptian laws..."
-python manage.py seed_egyptian_laws
+# Egyptian laws are not seeded here: the Celery worker queues the
+# seed_egyptian_laws task when it starts, and laws become ready in the
+# background (progress at GET /api/ai/laws/status/)
 
 echo "========================================"
 echo "Startup complete! Starting server..."
 echo "========================================"
 
 # Start the server or execute the passed command (for celery worker)
+# The server runs the ASGI app (config/asgi.py) so streaming chat responses
+# are served without holding a worker thread per request.
 if [ "$#" -gt 0 ]; then
     exec "$@"
 else
-    exec python manage.py runserver 0.0.0.0:8000
+    UVICORN_ARGS="--host 0.0.0.0 --port 8000"
+    case "${DEBUG,,}" in
+        true|1|yes) UVICORN_ARGS="$UVICORN_ARGS --reload" ;;
+    esac
+    exec uvicorn config.asgi:application $UVICORN_ARGS
 fi